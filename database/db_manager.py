@@ -207,4 +207,47 @@ class DatabaseManager:
             logger.error(f"Failed to update metrics: {e}")
         finally:
             session.close()
-
+    
+    async def record_api_usage(self, usages: List[Dict]) -> int:
+        """Bulk insert APIUsage rows (api_name, endpoint, success, response_time_ms, estimated_cost, timestamp)"""
+        
+        session = self.get_session()
+        
+        try:
+            session.bulk_insert_mappings(APIUsage, usages)
+            session.commit()
+            return len(usages)
+            
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Failed to record API usage: {e}")
+            return 0
+        finally:
+            session.close()
+    
+    async def get_api_usage_summary(self, since: datetime) -> Dict[str, Dict]:
+        """Requests, cost and average response time per API since a point in time"""
+        
+        session = self.get_session()
+        
+        try:
+            rows = session.query(
+                APIUsage.api_name,
+                func.sum(APIUsage.request_count),
+                func.sum(APIUsage.estimated_cost),
+                func.avg(APIUsage.response_time_ms)
+            ).filter(
+                APIUsage.timestamp >= since
+            ).group_by(APIUsage.api_name).all()
+            
+            return {
+                api_name: {
+                    'requests': int(requests or 0),
+                    'cost': float(cost or 0.0),
+                    'avg_response_time_ms': float(avg_ms) if avg_ms is not None else None
+                }
+                for api_name, requests, cost, avg_ms in rows
+            }
+            
+        finally:
+            session.close()
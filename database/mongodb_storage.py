@@ -5,6 +5,7 @@ Stores 144,000 data points daily from 500 sites
 """
 
 from pymongo import MongoClient, IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from loguru import logger
@@ -82,10 +83,11 @@ class MongoDBManager:
         except Exception as e:
             logger.error(f"Failed to store price scrape: {e}")
     
-    async def store_raw_listing(self, listing: Dict):
-        """Store raw marketplace listing"""
+    @staticmethod
+    def listing_document(listing: Dict) -> Dict:
+        """raw_listings document for a scraped listing"""
         
-        document = {
+        return {
             'title': listing.get('title'),
             'price': listing.get('price'),
             'marketplace': listing.get('marketplace'),
@@ -98,6 +100,23 @@ class MongoDBManager:
             'discovered_at': datetime.utcnow(),
             'processed': False
         }
+    
+    @staticmethod
+    def scrape_document(scrape: Dict) -> Dict:
+        """price_scrapes document for a batch insert"""
+        
+        return {
+            'product_id': scrape.get('product_id'),
+            'marketplace': scrape.get('marketplace'),
+            'price': scrape.get('price'),
+            'scraped_at': datetime.utcnow(),
+            'metadata': scrape.get('metadata', {})
+        }
+    
+    async def store_raw_listing(self, listing: Dict):
+        """Store raw marketplace listing"""
+        
+        document = self.listing_document(listing)
         
         try:
             result = self.raw_listings.insert_one(document)
@@ -115,22 +134,33 @@ class MongoDBManager:
         if not scrapes:
             return
         
-        documents = []
-        for scrape in scrapes:
-            documents.append({
-                'product_id': scrape.get('product_id'),
-                'marketplace': scrape.get('marketplace'),
-                'price': scrape.get('price'),
-                'scraped_at': datetime.utcnow(),
-                'metadata': scrape.get('metadata', {})
-            })
+        documents = [self.scrape_document(scrape) for scrape in scrapes]
         
         try:
-            result = self.price_scrapes.insert_many(documents, ordered=False)
-            logger.info(f"Bulk inserted {len(result.inserted_ids)} price scrapes")
+            inserted = self.insert_batch('price_scrapes', documents)
+            logger.info(f"Bulk inserted {inserted} price scrapes")
         except Exception as e:
             logger.error(f"Bulk insert failed: {e}")
     
+    def insert_batch(self, collection: str, documents: List[Dict]) -> int:
+        """
+        Unordered insert_many, returning how many documents were written
+        
+        With ordered=False one bad document does not stop the rest of the
+        batch, so partial failures report the documents that did land.
+        Blocking; call from a worker thread.
+        """
+        
+        if not documents:
+            return 0
+        
+        try:
+            result = self.db[collection].insert_many(documents, ordered=False)
+            return len(result.inserted_ids)
+        except BulkWriteError as e:
+            logger.warning(f"Bulk insert into {collection} partially failed: {len(e.details.get('writeErrors', []))} errors")
+            return e.details.get('nInserted', 0)
+    
     async def get_price_history(self,
                                product_id: str,
                                marketplace: str,
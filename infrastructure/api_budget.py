@@ -0,0 +1,289 @@
+"""
+API Budget Manager
+Per-API daily and minute quotas, profit-priority admission, and usage recording to the APIUsage table
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+
+class BudgetExceeded(Exception):
+    """A paid lookup was refused: daily quota spent, or budget too tight for its priority"""
+
+
+class APIBudgetManager:
+    """
+    Gatekeeper for paid external calls
+
+    Every call takes a slot for its API. Slots are limited by a per-minute
+    quota; when callers are waiting, they are admitted highest expected
+    profit first rather than first come, first served. Daily request and
+    spend limits are hard. Once less than `reserve_fraction` of an API's
+    daily allowance remains, only lookups with expected profit of at least
+    `tight_min_priority` are admitted, so the last tokens go to the $200
+    listings, not the $3 ones. Each call is written to the APIUsage table
+    in batches. Today's totals are reloaded from it on start.
+    """
+
+    def __init__(self, config: Dict, db=None, clock: Callable[[], float] = time.time):
+        budget_config = config.get('api_budget', {})
+
+        self.enabled = budget_config.get('enabled', True)
+        self.apis: Dict[str, Dict] = budget_config.get('apis', {})
+        self.reserve_fraction = budget_config.get('reserve_fraction', 0.2)
+        self.tight_min_priority = budget_config.get('tight_min_priority', 20.0)
+        self.flush_size = budget_config.get('flush_size', 50)
+        self.flush_interval = budget_config.get('flush_interval_seconds', 30)
+
+        # category -> expected margin on the purchase price
+        self.category_margins = {
+            name: category.get('avg_margin', 0.2)
+            for name, category in config.get('categories', {}).items()
+        }
+
+        self.db = db
+        self.clock = clock
+
+        self._day = self._today()
+        self._daily: Dict[str, Dict[str, float]] = {}
+        # api -> timestamps of calls admitted in the last minute
+        self._minute: Dict[str, List[float]] = {}
+        # api -> heap of (-priority, seq, future)
+        self._waiters: Dict[str, List] = {}
+        self._wake: Dict[str, asyncio.TimerHandle] = {}
+        self._seq = itertools.count()
+
+        self._pending_rows: List[Dict] = []
+        self._last_flush = clock()
+
+        self.stats = {'calls': 0, 'refused': 0, 'waited': 0, 'spend': 0.0, 'viable': 0}
+
+    def _today(self):
+        return datetime.fromtimestamp(self.clock(), timezone.utc).date()
+
+    def _usage(self, api: str) -> Dict[str, float]:
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._daily = {}
+
+        return self._daily.setdefault(api, {'requests': 0, 'spend': 0.0})
+
+    def priority_for(self, price: float, category: str) -> float:
+        """Expected profit of a listing: purchase price times the category's average margin"""
+        return float(price or 0) * self.category_margins.get(category, 0.2)
+
+    def _remaining_fraction(self, api: str) -> float:
+        limits = self.apis.get(api, {})
+        usage = self._usage(api)
+        fractions = [1.0]
+
+        if limits.get('daily_requests'):
+            fractions.append(1 - usage['requests'] / limits['daily_requests'])
+        if limits.get('daily_budget'):
+            fractions.append(1 - usage['spend'] / limits['daily_budget'])
+
+        return min(fractions)
+
+    def _check_daily(self, api: str, priority: float):
+        remaining = self._remaining_fraction(api)
+
+        if remaining <= 0:
+            raise BudgetExceeded(f"{api} daily quota spent")
+
+        if remaining < self.reserve_fraction and priority < self.tight_min_priority:
+            raise BudgetExceeded(f"{api} budget reserved for lookups worth ${self.tight_min_priority:.0f}+")
+
+    def _minute_window(self, api: str) -> List[float]:
+        cutoff = self.clock() - 60
+        window = [stamp for stamp in self._minute.get(api, []) if stamp > cutoff]
+        self._minute[api] = window
+        return window
+
+    def _has_minute_capacity(self, api: str) -> bool:
+        per_minute = self.apis.get(api, {}).get('per_minute')
+        return not per_minute or len(self._minute_window(api)) < per_minute
+
+    async def acquire(self, api: str, priority: float = 0.0):
+        """Wait for a slot for one call to `api`; raises BudgetExceeded if it may not run"""
+
+        if not self.enabled:
+            return
+
+        try:
+            self._check_daily(api, priority)
+        except BudgetExceeded:
+            self.stats['refused'] += 1
+            raise
+
+        waiters = self._waiters.setdefault(api, [])
+
+        if not waiters and self._has_minute_capacity(api):
+            self._minute_window(api).append(self.clock())
+            return
+
+        # Queue behind the minute quota; highest expected profit is admitted first
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(waiters, (-priority, next(self._seq), future))
+        self.stats['waited'] += 1
+        self._schedule_wake(api)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as the caller gave up: hand the slot back
+                self._release_minute_slot(api)
+            raise
+
+        # The quota may have tightened while this call was queued
+        try:
+            self._check_daily(api, priority)
+        except BudgetExceeded:
+            self.stats['refused'] += 1
+            self._release_minute_slot(api)
+            raise
+
+    def _release_minute_slot(self, api: str):
+        window = self._minute.get(api)
+        if window:
+            window.pop()
+        self._admit(api)
+
+    def _schedule_wake(self, api: str):
+        if api in self._wake:
+            return
+
+        window = self._minute_window(api)
+        if self._has_minute_capacity(api) or not window:
+            delay = 0.0
+        else:
+            delay = max(0.0, window[0] + 60 - self.clock())
+        self._wake[api] = asyncio.get_running_loop().call_later(delay, self._on_wake, api)
+
+    def _on_wake(self, api: str):
+        self._wake.pop(api, None)
+        self._admit(api)
+
+    def _admit(self, api: str):
+        waiters = self._waiters.get(api, [])
+
+        while waiters and self._has_minute_capacity(api):
+            _, _, future = heapq.heappop(waiters)
+            if future.done():
+                continue
+            self._minute_window(api).append(self.clock())
+            future.set_result(None)
+
+        if waiters:
+            self._schedule_wake(api)
+
+    def record(self, api: str, endpoint: str = '', success: bool = True,
+               response_time_ms: Optional[int] = None, cost: Optional[float] = None):
+        """Count one external call and queue its APIUsage row"""
+
+        if cost is None:
+            cost = self.apis.get(api, {}).get('cost_per_request', 0.0)
+
+        usage = self._usage(api)
+        usage['requests'] += 1
+        usage['spend'] += cost
+
+        self.stats['calls'] += 1
+        self.stats['spend'] += cost
+
+        self._pending_rows.append({
+            'api_name': api,
+            'endpoint': endpoint,
+            'success': success,
+            'response_time_ms': response_time_ms,
+            'estimated_cost': cost,
+            'timestamp': datetime.utcnow()
+        })
+
+    @asynccontextmanager
+    async def slot(self, api: str, priority: float = 0.0, endpoint: str = ''):
+        """Acquire a slot, then time and record the call made inside the block"""
+
+        await self.acquire(api, priority)
+
+        started = time.perf_counter()
+        success = False
+
+        try:
+            yield
+            success = True
+        finally:
+            self.record(api, endpoint, success, int((time.perf_counter() - started) * 1000))
+            if len(self._pending_rows) >= self.flush_size or self.clock() - self._last_flush >= self.flush_interval:
+                await self.flush()
+
+    async def call(self, api: str, priority: float, func, *args, **kwargs):
+        """Run `func(*args, **kwargs)` inside a budget slot"""
+
+        async with self.slot(api, priority, endpoint=getattr(func, '__name__', '')):
+            return await func(*args, **kwargs)
+
+    def record_viable(self):
+        """Count a viable opportunity, for spend-per-viable reporting"""
+        self.stats['viable'] += 1
+
+    async def flush(self):
+        """Write queued usage rows to the APIUsage table"""
+
+        self._last_flush = self.clock()
+        rows, self._pending_rows = self._pending_rows, []
+
+        if rows and self.db is not None:
+            await self.db.record_api_usage(rows)
+
+    async def load_today(self):
+        """Seed today's per-API totals from the APIUsage table after a restart"""
+
+        if self.db is None:
+            return
+
+        midnight = datetime.fromtimestamp(self.clock(), timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0, tzinfo=None
+        )
+
+        for api, summary in (await self.db.get_api_usage_summary(midnight)).items():
+            usage = self._usage(api)
+            usage['requests'] = summary['requests']
+            usage['spend'] = summary['cost']
+
+        logger.info(f"API budget loaded today's usage for {len(self._daily)} APIs")
+
+    def get_stats(self) -> Dict:
+        """Per-API usage against limits, queue depth, and spend per viable opportunity"""
+
+        apis = {}
+
+        for api in set(self.apis) | set(self._daily):
+            usage = self._usage(api)
+            apis[api] = {
+                'requests_today': usage['requests'],
+                'spend_today': usage['spend'],
+                'remaining_fraction': self._remaining_fraction(api),
+                'last_minute': len(self._minute_window(api)),
+                'queued': len(self._waiters.get(api, []))
+            }
+
+        viable = self.stats['viable']
+
+        return {
+            **self.stats,
+            'spend_per_viable': self.stats['spend'] / viable if viable else None,
+            'apis': apis
+        }
+
+    async def close(self):
+        """Flush outstanding usage rows"""
+        await self.flush()
@@ -5,7 +5,8 @@ Reduces database load and API calls
 
 import redis
 import json
-from typing import Optional, Any
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 from functools import wraps
 import hashlib
 from loguru import logger
@@ -0,0 +1,155 @@
+"""
+Pooled HTTP Client Layer
+Long-lived keep-alive clients shared by every scanner and price lookup
+"""
+
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from loguru import logger
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class HTTPClientPool:
+    """
+    Registry of httpx clients, one per host
+    Reuses TCP/TLS connections across scan cycles instead of
+    opening a new AsyncClient for every scan
+    """
+
+    def __init__(self, config: Dict, transport: Optional[httpx.AsyncBaseTransport] = None):
+        http_config = config.get('http_client', {})
+        timeouts = http_config.get('timeouts', {})
+
+        self.max_connections_per_host = http_config.get('max_connections_per_host', 10)
+        self.max_keepalive_per_host = http_config.get('max_keepalive_per_host', 5)
+        self.keepalive_expiry = http_config.get('keepalive_expiry_seconds', 60)
+        self.timeout = httpx.Timeout(
+            timeouts.get('total', 30),
+            connect=timeouts.get('connect', 10),
+            pool=timeouts.get('pool', 10)
+        )
+        self.headers = http_config.get('headers', {
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+        })
+
+        self.http2 = http_config.get('http2', False)
+        if self.http2 and not HTTP2_AVAILABLE:
+            logger.warning("HTTP/2 requested but 'h2' is not installed, falling back to HTTP/1.1")
+            self.http2 = False
+
+        self.transport = transport
+        self.clients: Dict[str, httpx.AsyncClient] = {}
+        self.stats: Dict[str, Dict] = {}
+
+    def _host_key(self, url: str) -> str:
+        """Normalize a URL to its scheme://host key"""
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}".lower()
+
+    def get_client(self, url: str) -> httpx.AsyncClient:
+        """Get (or lazily create) the pooled client for a URL's host"""
+
+        host = self._host_key(url)
+        client = self.clients.get(host)
+
+        if client is None or client.is_closed:
+            limits = httpx.Limits(
+                max_connections=self.max_connections_per_host,
+                max_keepalive_connections=self.max_keepalive_per_host,
+                keepalive_expiry=self.keepalive_expiry
+            )
+
+            client = httpx.AsyncClient(
+                limits=limits,
+                timeout=self.timeout,
+                headers=self.headers,
+                http2=self.http2,
+                follow_redirects=True,
+                transport=self.transport
+            )
+
+            self.clients[host] = client
+            self.stats.setdefault(host, {
+                'requests': 0,
+                'errors': 0,
+                'connections_opened': 0,
+                'tls_handshakes': 0,
+                'total_time_ms': 0.0
+            })
+
+            logger.debug(f"Created pooled HTTP client for {host}")
+
+        return client
+
+    def _make_trace(self, stats: Dict):
+        """Build an httpcore trace hook that counts new connections"""
+
+        async def trace(event_name: str, info: Dict):
+            if event_name == 'connection.connect_tcp.complete':
+                stats['connections_opened'] += 1
+            elif event_name == 'connection.start_tls.complete':
+                stats['tls_handshakes'] += 1
+
+        return trace
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request through the host's pooled client"""
+
+        client = self.get_client(url)
+        stats = self.stats[self._host_key(url)]
+
+        extensions = kwargs.pop('extensions', None) or {}
+        extensions.setdefault('trace', self._make_trace(stats))
+
+        started = time.perf_counter()
+
+        try:
+            return await client.request(method, url, extensions=extensions, **kwargs)
+        except Exception:
+            stats['errors'] += 1
+            raise
+        finally:
+            stats['requests'] += 1
+            stats['total_time_ms'] += (time.perf_counter() - started) * 1000
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """GET through the pool"""
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        """POST through the pool"""
+        return await self.request('POST', url, **kwargs)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Per-host pool statistics"""
+
+        report = {}
+
+        for host, stats in self.stats.items():
+            requests = stats['requests']
+            report[host] = {
+                **stats,
+                'avg_latency_ms': round(stats['total_time_ms'] / requests, 2) if requests else 0.0,
+                'connection_reuse_rate': (
+                    round(max(0.0, 1 - stats['connections_opened'] / requests), 3) if requests else 0.0
+                )
+            }
+
+        return report
+
+    async def close(self):
+        """Close every pooled client"""
+
+        for host, client in self.clients.items():
+            await client.aclose()
+
+        self.clients.clear()
+        logger.info("HTTP client pool closed")
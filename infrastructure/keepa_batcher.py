@@ -0,0 +1,153 @@
+"""
+Keepa Micro-Batching
+Coalesces concurrent ASIN lookups into batched queries on one long-lived Keepa client
+"""
+
+import asyncio
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+
+# Keepa accepts at most 100 ASINs per product request
+KEEPA_MAX_BATCH = 100
+
+
+class KeepaBatcher:
+    """
+    Micro-batching front end for Keepa product lookups
+
+    Lookups arriving within `window_ms` of each other are sent as one
+    query of up to 100 ASINs, and each caller gets its own product back.
+    The same ASIN requested twice in a window is queried once. The Keepa
+    client is built once (its constructor checks token status) and
+    reused; its blocking calls run on a worker thread.
+    """
+
+    def __init__(self,
+                 config: Dict,
+                 api_key: Optional[str] = None,
+                 client_factory: Optional[Callable[[str], object]] = None):
+        keepa_config = config.get('pricing_sources', {}).get('keepa', {})
+
+        self.api_key = api_key or os.getenv('KEEPA_API_KEY')
+        self.window = keepa_config.get('batch_window_ms', 10) / 1000
+        self.max_batch = min(keepa_config.get('max_batch_size', KEEPA_MAX_BATCH), KEEPA_MAX_BATCH)
+        self.stats_days = keepa_config.get('stats_days', 90)
+        self.client_factory = client_factory
+
+        self._client = None
+        self._client_lock = asyncio.Lock()
+        # ASIN -> futures of every caller waiting on it
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._in_flight = set()
+
+        self.stats = {
+            'lookups': 0,
+            'batches': 0,
+            'asins_queried': 0,
+            'query_seconds': 0.0
+        }
+
+    async def _get_client(self):
+        async with self._client_lock:
+            if self._client is None:
+                factory = self.client_factory
+                if factory is None:
+                    import keepa
+                    factory = keepa.Keepa
+                self._client = await asyncio.to_thread(factory, self.api_key)
+                logger.info("Keepa client initialized")
+
+        return self._client
+
+    async def get_product(self, asin: str) -> Optional[Dict]:
+        """Keepa product for an ASIN, batched with concurrent lookups"""
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        self.stats['lookups'] += 1
+        self._pending.setdefault(asin, []).append(future)
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Send up to max_batch pending ASINs as one query"""
+
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending:
+            return
+
+        asins = list(self._pending)[:self.max_batch]
+        waiters = {asin: self._pending.pop(asin) for asin in asins}
+
+        task = asyncio.get_running_loop().create_task(self._query(waiters))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+        # Anything over the batch limit goes out in the next window
+        if self._pending:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.window, self._flush)
+
+    async def _query(self, waiters: Dict[str, List[asyncio.Future]]):
+        asins = list(waiters)
+        started = time.perf_counter()
+
+        try:
+            client = await self._get_client()
+            products = await asyncio.to_thread(
+                client.query, asins, stats=self.stats_days, progress_bar=False
+            )
+            by_asin = {product.get('asin'): product for product in products or []}
+            error = None
+        except Exception as e:
+            logger.error(f"Keepa batch query for {len(asins)} ASINs failed: {e}")
+            by_asin = {}
+            error = e
+
+        self.stats['batches'] += 1
+        self.stats['asins_queried'] += len(asins)
+        self.stats['query_seconds'] += time.perf_counter() - started
+
+        for asin, futures in waiters.items():
+            for future in futures:
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(by_asin.get(asin))
+
+    def get_stats(self) -> Dict:
+        """Lookups, batches, and how many lookups each Keepa request served"""
+
+        batches = self.stats['batches']
+
+        return {
+            **self.stats,
+            'avg_batch_size': self.stats['asins_queried'] / batches if batches else 0.0,
+            'lookups_per_request': self.stats['lookups'] / batches if batches else 0.0,
+            'avg_query_ms': self.stats['query_seconds'] / batches * 1000 if batches else 0.0,
+            'tokens_left': getattr(self._client, 'tokens_left', None)
+        }
+
+    async def close(self):
+        """Flush outstanding lookups and wait for them"""
+
+        while self._pending:
+            self._flush()
+
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
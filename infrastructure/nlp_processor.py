@@ -4,10 +4,12 @@ For intelligent product matching, description analysis, and chatbot support
 """
 
 import spacy
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 from loguru import logger
 import re
 
+from utils.identifiers import extract_isbn
+
 
 class NLPProcessor:
     """
@@ -134,21 +136,9 @@ class NLPProcessor:
         return similarity
     
     def extract_isbn(self, text: str) -> Optional[str]:
-        """Extract ISBN from text using NLP + regex"""
-        
-        # ISBN-13
-        isbn13_pattern = r'(?:ISBN[-]?13?[:]?\s*)?(?:97[89][-\s]?(?:\d[-\s]?){9}\d)'
-        match = re.search(isbn13_pattern, text, re.IGNORECASE)
-        if match:
-            return re.sub(r'[-\s]', '', match.group())
-        
-        # ISBN-10
-        isbn10_pattern = r'(?:ISBN[-]?10?[:]?\s*)?(?:\d[-\s]?){9}[\dXx]'
-        match = re.search(isbn10_pattern, text, re.IGNORECASE)
-        if match:
-            return re.sub(r'[-\s]', '', match.group())
+        """Extract a check-digit valid ISBN from text, as ISBN-13"""
         
-        return None
+        return extract_isbn(text)
     
     def sentiment_analysis(self, text: str) -> str:
         """
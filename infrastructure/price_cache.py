@@ -0,0 +1,217 @@
+"""
+Two-Tier Price Cache
+In-process LRU in front of Redis with stale-while-revalidate and negative caching
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+
+PriceFetch = Callable[[], Awaitable[Optional[Dict]]]
+
+# How long to stop using Redis after a connection error
+REDIS_RETRY_SECONDS = 30
+
+
+class PriceCache:
+    """
+    Cache for external price lookups
+
+    Entries are fresh for the category's TTL, then served stale for
+    `stale_seconds` more while one background refresh runs. A lookup that
+    finds no price is cached (as None) for `negative_ttl_seconds` so the
+    same unknown ISBN/ASIN is not re-queried every cycle; lookups that
+    raise are never cached. Local hits skip Redis entirely; Redis shares
+    prices across processes and survives restarts.
+    """
+
+    def __init__(self, config: Dict, redis_client=None, clock: Callable[[], float] = time.time):
+        cache_config = config.get('price_cache', {})
+
+        self.ttls = {'default': 1800, **cache_config.get('ttl_seconds', {})}
+        self.stale_seconds = cache_config.get('stale_seconds', 3600)
+        self.negative_ttl = cache_config.get('negative_ttl_seconds', 3600)
+        self.max_entries = cache_config.get('local_max_entries', 10000)
+        self.key_prefix = cache_config.get('redis_key_prefix', 'pricedata')
+
+        self.redis = redis_client
+        self.clock = clock
+
+        # key -> {'value', 'fresh_until', 'stale_until'}
+        self._local: OrderedDict = OrderedDict()
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._redis_down_until = 0.0
+
+        self.stats = {
+            'local_hits': 0,
+            'redis_hits': 0,
+            'stale_hits': 0,
+            'negative_hits': 0,
+            'misses': 0,
+            'refreshes': 0,
+            'refresh_errors': 0
+        }
+
+    def _key(self, source: str, identifier: str) -> str:
+        return f"{self.key_prefix}:{source}:{identifier}"
+
+    def ttl_for(self, category: str) -> int:
+        return self.ttls.get(category, self.ttls['default'])
+
+    async def get(self,
+                  source: str,
+                  identifier: str,
+                  category: str,
+                  fetch: PriceFetch,
+                  negative: bool = True) -> Optional[Dict]:
+        """
+        Cached price data for (source, identifier), calling `fetch` on a miss
+
+        Pass negative=False when `fetch` returns None on errors as well as
+        on "no price", so failures are not remembered.
+        """
+
+        key = self._key(source, identifier)
+        entry, tier = await self._read(key)
+        now = self.clock()
+
+        if entry is not None:
+            self.stats[f'{tier}_hits'] += 1
+
+            if entry['value'] is None:
+                self.stats['negative_hits'] += 1
+            elif now >= entry['fresh_until']:
+                self.stats['stale_hits'] += 1
+                self._schedule_refresh(key, category, fetch, negative)
+
+            return entry['value']
+
+        self.stats['misses'] += 1
+        value = await fetch()
+        await self._store(key, category, value, negative)
+
+        return value
+
+    async def _read(self, key: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """Servable entry for `key` and the tier it came from"""
+
+        now = self.clock()
+
+        entry = self._local.get(key)
+        if entry is not None:
+            if now < entry['stale_until']:
+                self._local.move_to_end(key)
+                return entry, 'local'
+            del self._local[key]
+
+        raw = await self._redis_call('get', key)
+        if raw is None:
+            return None, None
+
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            return None, None
+
+        if now >= entry['stale_until']:
+            return None, None
+
+        self._remember(key, entry)
+
+        return entry, 'redis'
+
+    async def _store(self, key: str, category: str, value: Optional[Dict], negative: bool):
+        if value is None and not negative:
+            return
+
+        now = self.clock()
+
+        if value is None:
+            fresh_until = stale_until = now + self.negative_ttl
+        else:
+            fresh_until = now + self.ttl_for(category)
+            stale_until = fresh_until + self.stale_seconds
+
+        entry = {'value': value, 'fresh_until': fresh_until, 'stale_until': stale_until}
+        self._remember(key, entry)
+
+        await self._redis_call('setex', key, max(1, int(stale_until - now)), json.dumps(entry, default=str))
+
+    def _remember(self, key: str, entry: Dict):
+        self._local[key] = entry
+        self._local.move_to_end(key)
+
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    def _schedule_refresh(self, key: str, category: str, fetch: PriceFetch, negative: bool):
+        if key in self._refreshing:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._refresh(key, category, fetch, negative))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda finished: self._refreshing.pop(key, None))
+
+    async def _refresh(self, key: str, category: str, fetch: PriceFetch, negative: bool):
+        self.stats['refreshes'] += 1
+
+        try:
+            value = await fetch()
+        except Exception as e:
+            # Keep serving the stale entry until it runs out
+            self.stats['refresh_errors'] += 1
+            logger.warning(f"Background price refresh for {key} failed: {e}")
+            return
+
+        await self._store(key, category, value, negative)
+
+    async def _redis_call(self, method: str, *args):
+        if self.redis is None or self.clock() < self._redis_down_until:
+            return None
+
+        try:
+            return await asyncio.to_thread(getattr(self.redis, method), *args)
+        except Exception as e:
+            self._redis_down_until = self.clock() + REDIS_RETRY_SECONDS
+            logger.warning(f"Price cache Redis {method} failed, using local cache only for {REDIS_RETRY_SECONDS}s: {e}")
+            return None
+
+    def get_stats(self) -> Dict:
+        """Hit counts per tier and the share of lookups served without an API call"""
+
+        hits = self.stats['local_hits'] + self.stats['redis_hits']
+        lookups = hits + self.stats['misses']
+
+        return {
+            **self.stats,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'local_entries': len(self._local),
+            'refreshing': len(self._refreshing)
+        }
+
+    async def close(self):
+        """Wait for background refreshes to finish"""
+
+        if self._refreshing:
+            await asyncio.gather(*self._refreshing.values(), return_exceptions=True)
+
+
+def create_price_cache(config: Dict) -> Optional[PriceCache]:
+    """Build the price cache, with the Redis tier if configured"""
+
+    cache_config = config.get('price_cache', {})
+
+    if not cache_config.get('enabled', True):
+        return None
+
+    redis_client = None
+    if cache_config.get('redis', False):
+        from infrastructure.caching import RedisCache
+        redis_client = RedisCache().redis_client
+
+    return PriceCache(config, redis_client=redis_client)
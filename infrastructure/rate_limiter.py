@@ -0,0 +1,118 @@
+"""
+Per-Marketplace Rate Limiting
+Token buckets plus concurrency caps, configured per marketplace
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Tuple
+
+from loguru import logger
+
+
+# Matches the fixed 2 second sleep scanners used before rate limiting
+DEFAULT_RATE_LIMIT = {
+    'requests_per_second': 0.5,
+    'burst': 1,
+    'max_concurrency': 1
+}
+
+
+class TokenBucket:
+    """
+    Classic token bucket
+    Refills at `rate` tokens per second up to `burst` tokens
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> float:
+        """Wait for a token, returns seconds spent waiting"""
+
+        waited = 0.0
+
+        # Waiters queue on the lock so tokens are handed out in FIFO order
+        async with self._lock:
+            while True:
+                self._refill()
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+
+                delay = (1 - self.tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+
+class RateLimiter:
+    """
+    Rate limiting subsystem shared by all scanners
+    Each marketplace gets its own token bucket and concurrency semaphore
+    """
+
+    def __init__(self, config: Dict):
+        self.settings: Dict[str, Dict] = {}
+        self.limits: Dict[str, Tuple[TokenBucket, asyncio.Semaphore]] = {}
+        self.stats: Dict[str, Dict] = {}
+
+        for marketplace, marketplace_config in config.get('marketplaces', {}).items():
+            self.settings[marketplace] = {
+                **DEFAULT_RATE_LIMIT,
+                **(marketplace_config or {}).get('rate_limit', {})
+            }
+
+    def _get_limit(self, marketplace: str) -> Tuple[TokenBucket, asyncio.Semaphore]:
+        """Lazily build the bucket and semaphore for a marketplace"""
+
+        if marketplace not in self.limits:
+            settings = self.settings.get(marketplace, DEFAULT_RATE_LIMIT)
+
+            self.limits[marketplace] = (
+                TokenBucket(settings['requests_per_second'], settings['burst']),
+                asyncio.Semaphore(settings['max_concurrency'])
+            )
+            self.stats[marketplace] = {'requests': 0, 'total_wait_seconds': 0.0}
+
+            logger.debug(
+                f"Rate limit for {marketplace}: {settings['requests_per_second']} req/s, "
+                f"burst {settings['burst']}, concurrency {settings['max_concurrency']}"
+            )
+
+        return self.limits[marketplace]
+
+    @asynccontextmanager
+    async def limit(self, marketplace: str):
+        """
+        Hold a concurrency slot and spend one token for the duration of a request
+
+        Usage:
+            async with rate_limiter.limit('craigslist'):
+                response = await client.get(url)
+        """
+
+        bucket, semaphore = self._get_limit(marketplace)
+
+        async with semaphore:
+            waited = await bucket.acquire()
+
+            stats = self.stats[marketplace]
+            stats['requests'] += 1
+            stats['total_wait_seconds'] += waited
+
+            yield
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Requests and time spent throttled per marketplace"""
+        return {marketplace: dict(stats) for marketplace, stats in self.stats.items()}
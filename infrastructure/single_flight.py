@@ -0,0 +1,72 @@
+"""
+Single-Flight Request Coalescing
+Concurrent lookups of the same (source, identifier) share one in-flight call
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from loguru import logger
+
+
+Key = Tuple[str, str]
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls by key
+
+    The first caller for a (source, identifier) key starts the call;
+    callers arriving while it is in flight await the same result (or
+    exception) instead of issuing their own request. Nothing is cached
+    once the call finishes. The call runs as its own task, so a caller
+    that is cancelled does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Key, asyncio.Task] = {}
+        # source -> counters
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _source_stats(self, source: str) -> Dict[str, int]:
+        return self.stats.setdefault(source, {'calls': 0, 'executions': 0, 'coalesced': 0, 'errors': 0})
+
+    async def do(self, key: Key, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Run `func(*args, **kwargs)` unless a call for `key` is already in flight"""
+
+        stats = self._source_stats(key[0])
+        stats['calls'] += 1
+
+        task = self._calls.get(key)
+
+        if task is None:
+            stats['executions'] += 1
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._calls[key] = task
+            task.add_done_callback(lambda finished: self._finished(key, finished))
+        else:
+            stats['coalesced'] += 1
+            logger.debug(f"Coalesced {key[0]} lookup for {key[1]}")
+
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Key, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+        if not task.cancelled() and task.exception() is not None:
+            self._source_stats(key[0])['errors'] += 1
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Per-source call counts and the share of calls served by another caller's request"""
+
+        report = {}
+
+        for source, stats in self.stats.items():
+            report[source] = {
+                **stats,
+                'coalesce_rate': stats['coalesced'] / stats['calls'] if stats['calls'] else 0.0,
+                'in_flight': sum(1 for key in self._calls if key[0] == source)
+            }
+
+        return report
@@ -3,18 +3,42 @@ API Integrations
 Wrappers for all external APIs
 """
 
+import base64
+import hashlib
+import hmac
 import os
-from typing import Dict, List, Optional
-import httpx
+import secrets
+import time
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
 from loguru import logger
 
+from infrastructure.api_budget import APIBudgetManager
+from infrastructure.http_pool import HTTPClientPool
+from infrastructure.keepa_batcher import KeepaBatcher
+from infrastructure.price_cache import PriceCache
+from infrastructure.single_flight import SingleFlight
+from integrations.base_client import BaseAPIClient
+from integrations.price_resolver import PriceResolver, PriceSource
+
+
+# Key prefix for raw API results in the SingleFlight and PriceCache shared with PriceValidator
+RAW_KEY_PREFIX = 'api:'
+
+
+def _oauth_quote(value) -> str:
+    """RFC 3986 percent-encoding, as OAuth 1.0 signatures require"""
+    return quote(str(value or ''), safe='~')
+
 
 class KeepaAPI:
     """Keepa API for Amazon price tracking"""
     
-    def __init__(self):
+    def __init__(self, batcher: Optional[KeepaBatcher] = None):
         self.api_key = os.getenv('KEEPA_API_KEY')
         self.base_url = "https://api.keepa.com"
+        self.batcher = batcher or KeepaBatcher({}, api_key=self.api_key)
     
     async def get_product(self, asin: str) -> Optional[Dict]:
         """Get product data from Keepa"""
@@ -23,12 +47,7 @@ class KeepaAPI:
             return None
         
         try:
-            import keepa
-            api = keepa.Keepa(self.api_key)
-            products = api.query(asin)
-            
-            if products:
-                return products[0]
+            return await self.batcher.get_product(asin)
             
         except Exception as e:
             logger.error(f"Keepa API error: {e}")
@@ -36,12 +55,12 @@ class KeepaAPI:
         return None
 
 
-class BookScouterAPI:
+class BookScouterAPI(BaseAPIClient):
     """BookScouter API for textbook buyback prices"""
     
-    def __init__(self):
+    def __init__(self, config: Optional[Dict] = None, http_pool: Optional[HTTPClientPool] = None):
+        super().__init__('bookscouter', "https://bookscouter.com/api/v3", config, http_pool)
         self.api_key = os.getenv('BOOKSCOUTER_API_KEY')
-        self.base_url = "https://bookscouter.com/api/v3"
     
     async def get_prices(self, isbn: str) -> Optional[List[Dict]]:
         """Get buyback prices for ISBN"""
@@ -50,15 +69,8 @@ class BookScouterAPI:
             return None
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/prices",
-                    params={'api_key': self.api_key, 'isbn': isbn},
-                    timeout=15
-                )
-                
-                data = response.json()
-                return data.get('prices', [])
+            data = await self.get_json('/prices', params={'api_key': self.api_key, 'isbn': isbn})
+            return data.get('prices', [])
                 
         except Exception as e:
             logger.error(f"BookScouter API error: {e}")
@@ -66,34 +78,48 @@ class BookScouterAPI:
         return None
 
 
-class TCGPlayerAPI:
+class TCGPlayerAPI(BaseAPIClient):
     """TCGPlayer API for trading card prices"""
     
-    def __init__(self):
+    def __init__(self, config: Optional[Dict] = None, http_pool: Optional[HTTPClientPool] = None):
+        super().__init__('tcgplayer', "https://api.tcgplayer.com", config, http_pool)
+        # Client credentials are exchanged for a bearer token that lasts about two weeks
+        self.public_key = os.getenv('TCGPLAYER_PUBLIC_KEY')
+        self.private_key = os.getenv('TCGPLAYER_PRIVATE_KEY')
+        # A pre-issued bearer token, used when no client credentials are configured
         self.api_key = os.getenv('TCGPLAYER_API_KEY')
-        self.base_url = "https://api.tcgplayer.com"
+    
+    async def _fetch_token(self) -> Tuple[str, float]:
+        response = await self.request(
+            'POST',
+            '/token',
+            authorize=False,
+            # Asking for a token again has no side effects
+            retry=True,
+            data={
+                'grant_type': 'client_credentials',
+                'client_id': self.public_key,
+                'client_secret': self.private_key
+            }
+        )
+        response.raise_for_status()
+        data = response.json()
+        
+        return data['access_token'], float(data.get('expires_in', 3600))
+    
+    async def _authorize(self, method: str, url: str, headers: Dict, params: Dict):
+        token = await self.get_token() if self.public_key and self.private_key else self.api_key
+        headers['Authorization'] = f'Bearer {token}'
     
     async def search_card(self, card_name: str, game: str = 'pokemon') -> Optional[List[Dict]]:
         """Search for card pricing"""
         
-        if not self.api_key:
+        if not (self.api_key or (self.public_key and self.private_key)):
             return None
         
-        # TCGPlayer API requires OAuth
-        # This is a simplified placeholder
-        
         try:
-            async with httpx.AsyncClient() as client:
-                headers = {'Authorization': f'Bearer {self.api_key}'}
-                
-                response = await client.get(
-                    f"{self.base_url}/catalog/products",
-                    params={'name': card_name, 'category': game},
-                    headers=headers,
-                    timeout=15
-                )
-                
-                return response.json().get('results', [])
+            data = await self.get_json('/catalog/products', params={'name': card_name, 'category': game})
+            return data.get('results', [])
                 
         except Exception as e:
             logger.error(f"TCGPlayer API error: {e}")
@@ -101,10 +127,11 @@ class TCGPlayerAPI:
         return None
 
 
-class BuyBotProAPI:
+class BuyBotProAPI(BaseAPIClient):
     """BuyBotPro API for Amazon restriction checking"""
     
-    def __init__(self):
+    def __init__(self, config: Optional[Dict] = None, http_pool: Optional[HTTPClientPool] = None):
+        super().__init__('buybot', "https://api.buybotpro.com", config, http_pool)
         self.api_key = os.getenv('BUYBOT_PRO_API_KEY')
     
     async def check_restrictions(self, asin: str) -> Dict:
@@ -114,35 +141,30 @@ class BuyBotProAPI:
             return {'restricted': False, 'checked': False}
         
         try:
-            # BuyBotPro API endpoint
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    "https://api.buybotpro.com/check",
-                    params={'api_key': self.api_key, 'asin': asin},
-                    timeout=10
-                )
-                
-                data = response.json()
-                
-                return {
-                    'restricted': data.get('restricted', False),
-                    'hazmat': data.get('hazmat', False),
-                    'gated': data.get('gated', False),
-                    'checked': True,
-                    'details': data
-                }
+            data = await self.get_json('/check', params={'api_key': self.api_key, 'asin': asin}, timeout=10)
+            
+            return {
+                'restricted': data.get('restricted', False),
+                'hazmat': data.get('hazmat', False),
+                'gated': data.get('gated', False),
+                'checked': True,
+                'details': data
+            }
                 
         except Exception as e:
             logger.error(f"BuyBotPro API error: {e}")
             return {'restricted': False, 'checked': False, 'error': str(e)}
 
 
-class TacticalArbitrageAPI:
+class TacticalArbitrageAPI(BaseAPIClient):
     """Tactical Arbitrage API for automated sourcing"""
     
-    def __init__(self):
+    def __init__(self, config: Optional[Dict] = None, http_pool: Optional[HTTPClientPool] = None):
+        super().__init__('tactical_arbitrage', "https://api.tacticalarbitrage.com", config, http_pool)
         self.api_key = os.getenv('TACTICAL_ARBITRAGE_API_KEY')
-        self.base_url = "https://api.tacticalarbitrage.com"
+    
+    async def _authorize(self, method: str, url: str, headers: Dict, params: Dict):
+        headers['Authorization'] = f'Bearer {self.api_key}'
     
     async def start_scan(self, scan_config: Dict) -> Dict:
         """Start automated product scan"""
@@ -151,38 +173,46 @@ class TacticalArbitrageAPI:
             return {'success': False, 'error': 'API key not configured'}
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/scans",
-                    headers={'Authorization': f'Bearer {self.api_key}'},
-                    json=scan_config,
-                    timeout=30
-                )
-                
-                result = response.json()
-                
-                return {
-                    'success': True,
-                    'scan_id': result.get('scan_id'),
-                    'status': result.get('status')
-                }
+            # A retried POST could start the scan twice
+            result = await self.post_json('/scans', json=scan_config, timeout=30, retry=False)
+            
+            return {
+                'success': True,
+                'scan_id': result.get('scan_id'),
+                'status': result.get('status')
+            }
                 
         except Exception as e:
             logger.error(f"Tactical Arbitrage API error: {e}")
             return {'success': False, 'error': str(e)}
     
+    async def get_results_page(self, scan_id: str, page: int, page_size: int = 100) -> Dict:
+        """
+        One page of a scan's results with the scan's status
+        
+        Pages fill up while the scan runs, so the last page may grow
+        between calls. Errors are raised for the caller's backoff.
+        """
+        
+        data = await self.get_json(
+            f'/scans/{scan_id}/results',
+            endpoint='/scans/{id}/results',
+            params={'page': page, 'per_page': page_size},
+            timeout=30
+        )
+        
+        return {
+            'status': str(data.get('status') or 'running').lower(),
+            'products': data.get('products', []),
+            'total': data.get('total')
+        }
+    
     async def get_results(self, scan_id: str) -> Optional[List[Dict]]:
         """Get scan results"""
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/scans/{scan_id}/results",
-                    headers={'Authorization': f'Bearer {self.api_key}'},
-                    timeout=30
-                )
-                
-                return response.json().get('products', [])
+            data = await self.get_json(f'/scans/{scan_id}/results', endpoint='/scans/{id}/results', timeout=30)
+            return data.get('products', [])
                 
         except Exception as e:
             logger.error(f"Failed to get scan results: {e}")
@@ -190,12 +220,12 @@ class TacticalArbitrageAPI:
         return None
 
 
-class PriceChartingAPI:
+class PriceChartingAPI(BaseAPIClient):
     """PriceCharting API for video game and collectibles pricing"""
     
-    def __init__(self):
+    def __init__(self, config: Optional[Dict] = None, http_pool: Optional[HTTPClientPool] = None):
+        super().__init__('pricecharting', "https://www.pricecharting.com/api", config, http_pool)
         self.api_key = os.getenv('PRICECHARTING_API_KEY')
-        self.base_url = "https://www.pricecharting.com/api"
     
     async def get_price(self, product_name: str, console: Optional[str] = None) -> Optional[Dict]:
         """Get current market price"""
@@ -204,34 +234,27 @@ class PriceChartingAPI:
             return None
         
         try:
-            async with httpx.AsyncClient() as client:
-                params = {
-                    'api_key': self.api_key,
-                    't': 'search',
-                    'q': product_name
-                }
-                
-                if console:
-                    params['console'] = console
-                
-                response = await client.get(
-                    f"{self.base_url}/product",
-                    params=params,
-                    timeout=15
-                )
-                
-                data = response.json()
+            params = {
+                'api_key': self.api_key,
+                't': 'search',
+                'q': product_name
+            }
+            
+            if console:
+                params['console'] = console
+            
+            data = await self.get_json('/product', params=params)
+            
+            if data.get('products'):
+                product = data['products'][0]
                 
-                if data.get('products'):
-                    product = data['products'][0]
-                    
-                    return {
-                        'product_name': product.get('product-name'),
-                        'loose_price': product.get('loose-price'),
-                        'cib_price': product.get('cib-price'),  # Complete in box
-                        'new_price': product.get('new-price'),
-                        'console': product.get('console-name')
-                    }
+                return {
+                    'product_name': product.get('product-name'),
+                    'loose_price': product.get('loose-price'),
+                    'cib_price': product.get('cib-price'),  # Complete in box
+                    'new_price': product.get('new-price'),
+                    'console': product.get('console-name')
+                }
                     
         except Exception as e:
             logger.error(f"PriceCharting API error: {e}")
@@ -239,12 +262,16 @@ class PriceChartingAPI:
         return None
 
 
-class ReverbAPI:
+class ReverbAPI(BaseAPIClient):
     """Reverb API for musical instrument pricing"""
     
-    def __init__(self):
+    def __init__(self, config: Optional[Dict] = None, http_pool: Optional[HTTPClientPool] = None):
+        super().__init__('reverb', "https://api.reverb.com/api", config, http_pool)
         self.api_key = os.getenv('REVERB_API_KEY')
-        self.base_url = "https://api.reverb.com/api"
+    
+    async def _authorize(self, method: str, url: str, headers: Dict, params: Dict):
+        headers['Authorization'] = f'Bearer {self.api_key}'
+        headers['Accept'] = 'application/hal+json'
     
     async def search_listings(self, query: str) -> Optional[List[Dict]]:
         """Search Reverb listings"""
@@ -253,21 +280,8 @@ class ReverbAPI:
             return None
         
         try:
-            async with httpx.AsyncClient() as client:
-                headers = {
-                    'Authorization': f'Bearer {self.api_key}',
-                    'Accept': 'application/hal+json'
-                }
-                
-                response = await client.get(
-                    f"{self.base_url}/listings",
-                    params={'query': query},
-                    headers=headers,
-                    timeout=15
-                )
-                
-                data = response.json()
-                return data.get('listings', [])
+            data = await self.get_json('/listings', params={'query': query})
+            return data.get('listings', [])
                 
         except Exception as e:
             logger.error(f"Reverb API error: {e}")
@@ -278,20 +292,7 @@ class ReverbAPI:
         """Get price guide for instrument"""
         
         try:
-            async with httpx.AsyncClient() as client:
-                headers = {
-                    'Authorization': f'Bearer {self.api_key}',
-                    'Accept': 'application/hal+json'
-                }
-                
-                response = await client.get(
-                    f"{self.base_url}/priceguide",
-                    params={'make': make, 'model': model},
-                    headers=headers,
-                    timeout=15
-                )
-                
-                return response.json()
+            return await self.get_json('/priceguide', params={'make': make, 'model': model})
                 
         except Exception as e:
             logger.error(f"Reverb price guide error: {e}")
@@ -299,32 +300,71 @@ class ReverbAPI:
         return None
 
 
-class BrickLinkAPI:
+class BrickLinkAPI(BaseAPIClient):
     """BrickLink API for LEGO pricing"""
     
-    def __init__(self):
-        self.api_key = os.getenv('BRICKLINK_API_KEY')
-        self.base_url = "https://api.bricklink.com/api/store/v1"
+    def __init__(self, config: Optional[Dict] = None, http_pool: Optional[HTTPClientPool] = None):
+        super().__init__('bricklink', "https://api.bricklink.com/api/store/v1", config, http_pool)
+        # BrickLink signs every request with OAuth 1.0 (HMAC-SHA1)
+        self.consumer_key = os.getenv('BRICKLINK_CONSUMER_KEY') or os.getenv('BRICKLINK_API_KEY')
+        self.consumer_secret = os.getenv('BRICKLINK_CONSUMER_SECRET')
+        self.token_value = os.getenv('BRICKLINK_TOKEN_VALUE')
+        self.token_secret = os.getenv('BRICKLINK_TOKEN_SECRET')
+        self.configured = all((self.consumer_key, self.consumer_secret, self.token_value, self.token_secret))
+        
+        # Only the nonce, timestamp and signature change per request; the rest is built once
+        self._signing_key = f"{_oauth_quote(self.consumer_secret)}&{_oauth_quote(self.token_secret)}".encode()
+        self._oauth_params = {
+            'oauth_consumer_key': self.consumer_key or '',
+            'oauth_token': self.token_value or '',
+            'oauth_signature_method': 'HMAC-SHA1',
+            'oauth_version': '1.0'
+        }
+    
+    async def _authorize(self, method: str, url: str, headers: Dict, params: Dict):
+        oauth = {
+            **self._oauth_params,
+            'oauth_timestamp': str(int(time.time())),
+            'oauth_nonce': secrets.token_hex(16)
+        }
+        
+        pairs = sorted((_oauth_quote(key), _oauth_quote(value)) for key, value in {**params, **oauth}.items())
+        base_string = '&'.join((
+            method.upper(),
+            _oauth_quote(url),
+            _oauth_quote('&'.join(f"{key}={value}" for key, value in pairs))
+        ))
+        digest = hmac.new(self._signing_key, base_string.encode(), hashlib.sha1).digest()
+        oauth['oauth_signature'] = base64.b64encode(digest).decode()
+        
+        headers['Authorization'] = 'OAuth ' + ', '.join(
+            f'{key}="{_oauth_quote(value)}"' for key, value in oauth.items()
+        )
     
     async def get_set_price(self, set_number: str) -> Optional[Dict]:
-        """Get LEGO set pricing"""
+        """Get LEGO set pricing (average sold price, new condition, last six months)"""
         
-        if not self.api_key:
+        if not self.configured:
             return None
         
-        # BrickLink uses OAuth 1.0
-        # This is a simplified placeholder
+        # BrickLink item numbers carry a variant suffix; plain set numbers mean the first variant
+        item_number = str(set_number) if '-' in str(set_number) else f"{set_number}-1"
         
         try:
-            logger.info(f"Fetching BrickLink price for set {set_number}")
-            
-            # Implementation requires OAuth signing
-            # Return placeholder
+            data = await self.get_json(
+                f'/items/SET/{item_number}/price',
+                endpoint='/items/SET/{no}/price',
+                params={'guide_type': 'sold', 'new_or_used': 'N'}
+            )
+            guide = data.get('data') or {}
+            avg_price = guide.get('avg_price')
             
             return {
                 'set_number': set_number,
-                'avg_price': None,
-                'checked': False
+                'avg_price': float(avg_price) if avg_price is not None else None,
+                'quantity_sold': guide.get('total_quantity'),
+                'currency': guide.get('currency_code'),
+                'checked': True
             }
             
         except Exception as e:
@@ -336,49 +376,131 @@ class BrickLinkAPI:
 class APIManager:
     """Central manager for all API integrations"""
     
-    def __init__(self):
-        self.keepa = KeepaAPI()
-        self.bookscouter = BookScouterAPI()
-        self.tcgplayer = TCGPlayerAPI()
-        self.buybot = BuyBotProAPI()
-        self.tactical_arbitrage = TacticalArbitrageAPI()
-        self.pricecharting = PriceChartingAPI()
-        self.reverb = ReverbAPI()
-        self.bricklink = BrickLinkAPI()
+    def __init__(self,
+                 keepa: Optional[KeepaBatcher] = None,
+                 single_flight: Optional[SingleFlight] = None,
+                 price_cache: Optional[PriceCache] = None,
+                 resolver: Optional[PriceResolver] = None,
+                 budget: Optional[APIBudgetManager] = None,
+                 config: Optional[Dict] = None,
+                 http_pool: Optional[HTTPClientPool] = None):
+        config = config or {}
+        self.keepa = KeepaAPI(keepa)
+        self.single_flight = single_flight or SingleFlight()
+        self.price_cache = price_cache
+        self.resolver = resolver or PriceResolver()
+        self.budget = budget or APIBudgetManager({})
+        
+        # Every HTTP integration shares one keep-alive pool
+        self.http_pool = http_pool or HTTPClientPool(config)
+        self._owns_pool = http_pool is None
+        self.bookscouter = BookScouterAPI(config, self.http_pool)
+        self.tcgplayer = TCGPlayerAPI(config, self.http_pool)
+        self.buybot = BuyBotProAPI(config, self.http_pool)
+        self.tactical_arbitrage = TacticalArbitrageAPI(config, self.http_pool)
+        self.pricecharting = PriceChartingAPI(config, self.http_pool)
+        self.reverb = ReverbAPI(config, self.http_pool)
+        self.bricklink = BrickLinkAPI(config, self.http_pool)
+    
+    @property
+    def clients(self) -> Dict[str, BaseAPIClient]:
+        """HTTP integrations by name"""
+        
+        return {
+            client.name: client
+            for client in (
+                self.bookscouter, self.tcgplayer, self.buybot, self.tactical_arbitrage,
+                self.pricecharting, self.reverb, self.bricklink
+            )
+        }
+    
+    def get_client_stats(self) -> Dict[str, Dict]:
+        """Per-integration endpoint latency and retry stats, for integrations that have been called"""
+        
+        return {name: client.get_stats() for name, client in self.clients.items() if client.endpoint_stats}
+    
+    async def close(self):
+        """Close the connection pool if this manager created it"""
+        
+        if self._owns_pool:
+            await self.http_pool.close()
     
     async def get_price_data(self, product: Dict, category: str) -> Optional[Dict]:
-        """Get pricing data from appropriate API based on category"""
+        """Get pricing data from every API that can price this product, concurrently"""
+        
+        # Quota goes to the most promising products first when APIs are contended
+        priority = self.budget.priority_for(product.get('price', 0), category)
+        
+        sources = [
+            PriceSource(
+                name=source,
+                fetch=partial(self._fetch_price, source, identifier, category, priority, call, args),
+                # A hedged attempt bypasses the cache and single-flight layers, which would hand back the slow call
+                hedge=partial(self.budget.call, source, priority, call, *args)
+            )
+            for source, identifier, call, args in self._price_lookups(product, category)
+        ]
+        
+        return await self.resolver.resolve(sources)
+    
+    async def _fetch_price(self,
+                           source: str,
+                           identifier: str,
+                           category: str,
+                           priority: float,
+                           call,
+                           args: Tuple) -> Optional[Dict]:
+        """One source's price data through the cache, single-flight and budget layers"""
+        
+        def fetch():
+            # Concurrent requests for the same product share one API call. The validator
+            # shares this SingleFlight but gets normalized results, so these raw ones are
+            # keyed apart from its own
+            return self.single_flight.do(
+                (f"{RAW_KEY_PREFIX}{source}", identifier), self.budget.call, source, priority, call, *args
+            )
+        
+        if self.price_cache is None:
+            return await fetch()
+        
+        # These clients return None on errors too, so "no price" is not cached
+        return await self.price_cache.get(f"{RAW_KEY_PREFIX}{source}", identifier, category, fetch, negative=False)
+    
+    def _price_lookups(self, product: Dict, category: str) -> List[Tuple]:
+        """(source, identifier, coroutine function, args) for each API that can price this product, best first"""
+        
+        lookups = []
         
         if category == 'books':
             isbn = product.get('isbn')
             if isbn:
-                return await self.bookscouter.get_prices(isbn)
+                lookups.append(('bookscouter', isbn, self.bookscouter.get_prices, (isbn,)))
         
         elif category == 'trading_cards':
             card_name = product.get('name')
             if card_name:
-                return await self.tcgplayer.search_card(card_name)
+                lookups.append(('tcgplayer', card_name.lower(), self.tcgplayer.search_card, (card_name,)))
         
         elif category == 'video_games':
             game_name = product.get('name')
             if game_name:
-                return await self.pricecharting.get_price(game_name)
+                lookups.append(('pricecharting', game_name.lower(), self.pricecharting.get_price, (game_name,)))
         
         elif category == 'musical_instruments':
             make = product.get('make')
             model = product.get('model')
             if make and model:
-                return await self.reverb.get_price_guide(make, model)
+                lookups.append(('reverb', f"{make} {model}".lower(), self.reverb.get_price_guide, (make, model)))
         
         elif category == 'lego':
             set_number = product.get('set_number')
             if set_number:
-                return await self.bricklink.get_set_price(set_number)
+                lookups.append(('bricklink', str(set_number), self.bricklink.get_set_price, (set_number,)))
         
-        # Default to Amazon via Keepa
+        # Amazon via Keepa, alongside the category source when there is one
         asin = product.get('asin')
         if asin:
-            return await self.keepa.get_product(asin)
+            lookups.append(('keepa', asin, self.keepa.get_product, (asin,)))
         
-        return None
+        return lookups
 
@@ -0,0 +1,301 @@
+"""
+Shared Integration Client
+Pooled connections, cached auth, retries and per-endpoint latency histograms for external APIs
+"""
+
+import asyncio
+import bisect
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+import httpx
+from loguru import logger
+
+from infrastructure.http_pool import HTTPClientPool
+
+
+# Upper bounds (ms) of the latency histogram buckets; one more bucket holds anything slower
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Throttling and transient server errors are retried; other statuses go straight back
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Methods safe to resend when an attempt may already have reached the server
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+DEFAULT_CLIENT_SETTINGS = {
+    'max_concurrency': 4,
+    'max_retries': 3,
+    'backoff_base_seconds': 0.5,
+    'backoff_max_seconds': 30,
+    'max_retry_after_seconds': 60,
+    'token_refresh_margin_seconds': 300,
+    'timeout_seconds': 15
+}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class BaseAPIClient:
+    """
+    Base for the pricing and sourcing API wrappers
+
+    Requests go through the shared keep-alive HTTPClientPool instead of a
+    new AsyncClient per call, and at most `max_concurrency` are in flight
+    per integration. For idempotent methods, 429s, 5xx responses and
+    transport errors are retried up to `max_retries` times with
+    full-jitter exponential backoff, or after the server's Retry-After
+    when it sends one (a Retry-After longer than `max_retry_after_seconds`
+    is not waited for); other methods are sent once unless the caller
+    passes `retry=True`. Clients with expiring tokens implement
+    `_fetch_token`; the token is cached and refreshed
+    `token_refresh_margin_seconds` before it expires, and once more if the
+    API answers 401. Latency is recorded per endpoint as a histogram.
+    """
+
+    def __init__(self,
+                 name: str,
+                 base_url: str,
+                 config: Optional[Dict] = None,
+                 http_pool: Optional[HTTPClientPool] = None):
+        clients_config = (config or {}).get('api_clients', {})
+
+        self.name = name
+        self.base_url = base_url
+        self.settings = {
+            **DEFAULT_CLIENT_SETTINGS,
+            **clients_config.get('defaults', {}),
+            **clients_config.get(name, {})
+        }
+        self.timeout = self.settings['timeout_seconds']
+
+        self.http_pool = http_pool or HTTPClientPool(config or {})
+        self._owns_pool = http_pool is None
+        self._slots = asyncio.Semaphore(self.settings['max_concurrency'])
+
+        self._token: Optional[str] = None
+        self._token_expires = 0.0
+        self._token_lock = asyncio.Lock()
+
+        self.endpoint_stats: Dict[str, Dict] = {}
+        self.stats = {'token_refreshes': 0}
+
+    async def _fetch_token(self) -> Tuple[str, float]:
+        """A new (token, lifetime in seconds); clients with expiring tokens override this"""
+        raise NotImplementedError(f"{self.name} does not use access tokens")
+
+    def _token_valid(self) -> bool:
+        margin = self.settings['token_refresh_margin_seconds']
+        return self._token is not None and time.monotonic() < self._token_expires - margin
+
+    async def get_token(self) -> str:
+        """The cached access token, refreshed shortly before it expires"""
+
+        if self._token_valid():
+            return self._token
+
+        # Concurrent requests wait for one refresh instead of each fetching a token
+        async with self._token_lock:
+            if not self._token_valid():
+                token, lifetime = await self._fetch_token()
+                self._token = token
+                self._token_expires = time.monotonic() + lifetime
+                self.stats['token_refreshes'] += 1
+                logger.debug(f"{self.name} access token refreshed, valid for {lifetime:.0f}s")
+
+        return self._token
+
+    def invalidate_token(self):
+        self._token = None
+        self._token_expires = 0.0
+
+    async def _authorize(self, method: str, url: str, headers: Dict, params: Dict):
+        """Add credentials to an outgoing request; the default sends none"""
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> Optional[float]:
+        """Seconds before retry `attempt` (0-based), or None to give up"""
+
+        if attempt >= self.settings['max_retries']:
+            return None
+
+        base = self.settings['backoff_base_seconds']
+        retry_after = parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+
+        if retry_after is not None:
+            if retry_after > self.settings['max_retry_after_seconds']:
+                return None
+            # Never earlier than asked; the jitter keeps throttled callers from returning in lockstep
+            return retry_after + random.uniform(0, base)
+
+        return random.uniform(0, min(self.settings['backoff_max_seconds'], base * 2 ** attempt))
+
+    def _endpoint_stats(self, endpoint: str) -> Dict:
+        return self.endpoint_stats.setdefault(endpoint, {
+            'requests': 0,
+            'errors': 0,
+            'retries': 0,
+            'total_ms': 0.0,
+            'histogram': [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        })
+
+    def _record(self, endpoint: str, elapsed_ms: float, failed: bool):
+        stats = self._endpoint_stats(endpoint)
+        stats['requests'] += 1
+        stats['total_ms'] += elapsed_ms
+        stats['histogram'][bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        if failed:
+            stats['errors'] += 1
+
+    async def request(self,
+                      method: str,
+                      path: str,
+                      endpoint: Optional[str] = None,
+                      authorize: bool = True,
+                      retry: Optional[bool] = None,
+                      **kwargs) -> httpx.Response:
+        """
+        Send a request to `base_url + path`, retrying throttled and failed attempts
+
+        `endpoint` names the route for latency stats (defaults to `path`; pass
+        a template for paths containing IDs). `retry` defaults to True for
+        idempotent methods only; a POST that may have been acted on is not
+        resent unless the caller knows it is safe. Returns the last
+        response, which may still be an error status once retries run out;
+        a transport error is raised after the last attempt.
+        """
+
+        if retry is None:
+            retry = method.upper() in IDEMPOTENT_METHODS
+
+        endpoint = endpoint or path
+        url = f"{self.base_url}{path}"
+        headers = kwargs.pop('headers', None) or {}
+        params = kwargs.pop('params', None) or {}
+        kwargs.setdefault('timeout', self.timeout)
+
+        attempt = 0
+        token_retried = False
+
+        while True:
+            request_headers = dict(headers)
+            request_params = dict(params)
+            if authorize:
+                await self._authorize(method, url, request_headers, request_params)
+
+            response = None
+            error: Optional[Exception] = None
+            started = time.perf_counter()
+
+            async with self._slots:
+                try:
+                    response = await self.http_pool.request(
+                        method, url, headers=request_headers, params=request_params, **kwargs
+                    )
+                except httpx.TransportError as e:
+                    error = e
+
+            self._record(endpoint, (time.perf_counter() - started) * 1000, error is not None or response.status_code >= 400)
+
+            # A token revoked before its expiry gets one fresh token
+            if response is not None and response.status_code == 401 and self._token is not None and not token_retried:
+                token_retried = True
+                self.invalidate_token()
+                continue
+
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                return response
+
+            delay = self._retry_delay(attempt, response) if retry else None
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+
+            attempt += 1
+            self._endpoint_stats(endpoint)['retries'] += 1
+            reason = error or f"HTTP {response.status_code}"
+            logger.debug(f"{self.name} {endpoint}: {reason}, retry {attempt} in {delay:.2f}s")
+
+            # Back off outside the concurrency slot so other requests can use it
+            await asyncio.sleep(delay)
+
+    async def get_json(self, path: str, endpoint: Optional[str] = None, **kwargs):
+        """GET and decode JSON, raising for an error status"""
+
+        response = await self.request('GET', path, endpoint, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    async def post_json(self, path: str, endpoint: Optional[str] = None, **kwargs):
+        """POST and decode JSON, raising for an error status"""
+
+        response = await self.request('POST', path, endpoint, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    def _percentile_ms(histogram, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given fraction of requests (None if beyond the last)"""
+
+        total = sum(histogram)
+        if not total:
+            return None
+
+        target = fraction * total
+        seen = 0
+
+        for bound, count in zip(LATENCY_BUCKETS_MS, histogram):
+            seen += count
+            if seen >= target:
+                return float(bound)
+
+        return None
+
+    def get_stats(self) -> Dict:
+        """Per-endpoint requests, errors, retries and latency histogram"""
+
+        endpoints = {}
+
+        for endpoint, stats in self.endpoint_stats.items():
+            histogram = stats['histogram']
+            labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+            endpoints[endpoint] = {
+                'requests': stats['requests'],
+                'errors': stats['errors'],
+                'retries': stats['retries'],
+                'avg_ms': stats['total_ms'] / stats['requests'] if stats['requests'] else 0.0,
+                'p50_ms': self._percentile_ms(histogram, 0.5),
+                'p95_ms': self._percentile_ms(histogram, 0.95),
+                'histogram': dict(zip(labels, histogram))
+            }
+
+        return {**self.stats, 'endpoints': endpoints}
+
+    async def close(self):
+        """Close the connection pool if this client created it"""
+
+        if self._owns_pool:
+            await self.http_pool.close()
@@ -0,0 +1,201 @@
+"""
+Hedged Price Resolution
+Queries every eligible pricing source at once under per-source timeouts and a per-opportunity deadline
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from loguru import logger
+
+
+@dataclass
+class PriceSource:
+    """One pricing source eligible for a product, in priority order"""
+    name: str
+    # Normal lookup (through the cache and single-flight layers)
+    fetch: Callable[[], Awaitable[Any]]
+    # Direct call used for a hedged second attempt; None disables hedging for this source
+    hedge: Optional[Callable[[], Awaitable[Any]]] = None
+
+
+class PriceResolver:
+    """
+    Concurrent fan-out across pricing integrations
+
+    All eligible sources start together. Each attempt is bounded by the
+    source's timeout, and the whole resolution by `deadline_seconds`. Once
+    a source has enough latency samples, an attempt still running after
+    its p95 gets one hedged duplicate, and whichever finishes first
+    counts. In `first` mode the first usable answer wins and the rest are
+    cancelled. In `merge` mode every source gets until the deadline, and
+    the highest-priority answer is returned with all answers under
+    'sources'.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        resolver_config = (config or {}).get('price_resolver', {})
+
+        self.mode = resolver_config.get('mode', 'first')
+        self.deadline = resolver_config.get('deadline_seconds', 8.0)
+        self.timeouts = {'default': 5.0, **resolver_config.get('source_timeout_seconds', {})}
+        self.hedging = resolver_config.get('hedge', True)
+        self.hedge_percentile = resolver_config.get('hedge_percentile', 0.95)
+        self.min_samples = resolver_config.get('hedge_min_samples', 20)
+        self.window = resolver_config.get('latency_window', 200)
+
+        # source -> recent successful latencies (seconds)
+        self.latencies: Dict[str, deque] = {}
+        self.source_stats: Dict[str, Dict[str, int]] = {}
+        self.stats = {'resolutions': 0, 'resolved': 0, 'deadline_exceeded': 0}
+
+    def _source_stats(self, name: str) -> Dict[str, int]:
+        return self.source_stats.setdefault(
+            name, {'calls': 0, 'answers': 0, 'empty': 0, 'timeouts': 0, 'errors': 0, 'hedges': 0, 'hedge_wins': 0}
+        )
+
+    def timeout_for(self, name: str) -> float:
+        return self.timeouts.get(name, self.timeouts['default'])
+
+    def hedge_delay(self, name: str) -> Optional[float]:
+        """Seconds before a running attempt is hedged, or None without enough samples"""
+
+        samples = self.latencies.get(name)
+        if not self.hedging or not samples or len(samples) < self.min_samples:
+            return None
+
+        ordered = sorted(samples)
+
+        return ordered[min(len(ordered) - 1, int(self.hedge_percentile * len(ordered)))]
+
+    def _record_latency(self, name: str, seconds: float):
+        self.latencies.setdefault(name, deque(maxlen=self.window)).append(seconds)
+
+    async def _timed(self, name: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.perf_counter()
+        result = await asyncio.wait_for(call(), self.timeout_for(name))
+        self._record_latency(name, time.perf_counter() - started)
+        return result
+
+    async def _query(self, source: PriceSource) -> Any:
+        """One source's answer, hedged after its p95 latency"""
+
+        stats = self._source_stats(source.name)
+        stats['calls'] += 1
+
+        primary = asyncio.ensure_future(self._timed(source.name, source.fetch))
+        attempts = [primary]
+
+        try:
+            delay = self.hedge_delay(source.name) if source.hedge else None
+
+            if delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done:
+                    stats['hedges'] += 1
+                    attempts.append(asyncio.ensure_future(self._timed(source.name, source.hedge)))
+
+            # First attempt to succeed wins; only fail once every attempt has
+            pending = set(attempts)
+            error: Optional[BaseException] = None
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None:
+                        if attempt is not primary:
+                            stats['hedge_wins'] += 1
+                        return attempt.result()
+                    error = attempt.exception()
+
+            raise error
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+            await asyncio.gather(*attempts, return_exceptions=True)
+
+    async def _answer(self, source: PriceSource) -> Any:
+        """Source answer, with timeouts and errors logged and returned as None"""
+
+        stats = self._source_stats(source.name)
+
+        try:
+            result = await self._query(source)
+        except asyncio.TimeoutError:
+            stats['timeouts'] += 1
+            logger.warning(f"{source.name} price lookup timed out after {self.timeout_for(source.name)}s")
+            return None
+        except Exception as e:
+            stats['errors'] += 1
+            logger.error(f"{source.name} price lookup failed: {e}")
+            return None
+
+        stats['answers' if result else 'empty'] += 1
+
+        return result
+
+    async def resolve(self, sources: List[PriceSource]) -> Optional[Dict]:
+        """Best answer across `sources` (highest priority first) within the deadline"""
+
+        if not sources:
+            return None
+
+        self.stats['resolutions'] += 1
+
+        tasks = {asyncio.ensure_future(self._answer(source)): source for source in sources}
+        answers: Dict[str, Any] = {}
+        pending = set(tasks)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+
+        try:
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    self.stats['deadline_exceeded'] += 1
+                    break
+
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    result = task.result()
+                    if result:
+                        answers[tasks[task].name] = result
+
+                if answers and self.mode == 'first':
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        if not answers:
+            return None
+
+        self.stats['resolved'] += 1
+
+        best = next(source.name for source in sources if source.name in answers)
+        result = answers[best]
+
+        if self.mode == 'merge' and isinstance(result, dict):
+            return {**result, 'source': result.get('source', best), 'sources': answers}
+
+        return result
+
+    def get_stats(self) -> Dict:
+        """Resolution counts and per-source outcomes with p50/p95 latency"""
+
+        sources = {}
+
+        for name, stats in self.source_stats.items():
+            ordered = sorted(self.latencies.get(name, ()))
+            sources[name] = {
+                **stats,
+                'p50_ms': ordered[len(ordered) // 2] * 1000 if ordered else None,
+                'p95_ms': ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000 if ordered else None
+            }
+
+        return {**self.stats, 'sources': sources}
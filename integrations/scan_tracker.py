@@ -0,0 +1,317 @@
+"""
+Tactical Arbitrage Scan Tracking
+Polls outstanding bulk scans in the background and streams their results page by page
+"""
+
+import asyncio
+import json
+import random
+import sqlite3
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+
+# Scan statuses that mean no more results are coming
+COMPLETED_STATUSES = {'completed', 'complete', 'finished', 'done'}
+FAILED_STATUSES = {'failed', 'error', 'cancelled', 'canceled'}
+
+
+class TacticalScanTracker:
+    """
+    Background tracker for Tactical Arbitrage scans
+
+    Each outstanding scan gets its own polling task. A poll reads the
+    scan's current results page; new products are put on the `results`
+    queue as listings straight away, a full page moves the cursor to the
+    next page with no wait, and otherwise the next poll backs off
+    exponentially (with jitter) from `poll_initial_seconds` up to
+    `poll_max_seconds`, dropping back to the initial interval whenever
+    new products turn up. Scans are tracked in SQLite with their page
+    cursor, so after a restart `resume` picks every unfinished scan up
+    where it left off. Products are emitted before the cursor is saved,
+    so a crash can repeat the last page; the deduplicator drops repeats.
+    """
+
+    def __init__(self, config: Dict, api, clock: Callable[[], float] = time.time):
+        tracker_config = config.get('tactical_arbitrage', {})
+
+        self.api = api
+        self.clock = clock
+        self.page_size = tracker_config.get('page_size', 100)
+        self.poll_initial = tracker_config.get('poll_initial_seconds', 5)
+        self.poll_max = tracker_config.get('poll_max_seconds', 300)
+        self.poll_backoff = tracker_config.get('poll_backoff', 2.0)
+        self.max_age = tracker_config.get('max_scan_hours', 6) * 3600
+        self.max_errors = tracker_config.get('max_consecutive_errors', 10)
+        self.submit_interval = tracker_config.get('submit_interval_minutes', 360) * 60
+        self.scans: List[Dict] = tracker_config.get('scans', [])
+
+        # Bounded so a burst of pages waits for validation instead of piling up in memory
+        self.results: asyncio.Queue = asyncio.Queue(maxsize=tracker_config.get('queue_size', 1000))
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+        path = tracker_config.get('sqlite_path', 'data/tactical_scans.db')
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS tactical_scans (
+                scan_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                category TEXT NOT NULL,
+                scan_config TEXT NOT NULL,
+                status TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                page_offset INTEGER NOT NULL,
+                emitted INTEGER NOT NULL,
+                started_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+
+        self.stats = {
+            'submitted': 0,
+            'start_failures': 0,
+            'resumed': 0,
+            'polls': 0,
+            'pages': 0,
+            'products': 0,
+            'errors': 0,
+            'completed': 0,
+            'failed': 0,
+            'expired': 0
+        }
+
+    def _save(self, job: Dict, status: str = 'tracking'):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO tactical_scans VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job['scan_id'], job['name'], job['category'], json.dumps(job['scan_config']), status,
+                 job['page'], job['page_offset'], job['emitted'], job['started_at'], self.clock())
+            )
+
+    async def submit(self, scan_config: Dict, category: str, name: str = '') -> Optional[str]:
+        """Start a scan and track it in the background; returns the scan id"""
+
+        started_at = self.clock()
+        result = await self.api.start_scan(scan_config)
+
+        job = {
+            'scan_id': str(result.get('scan_id') or ''),
+            'name': name or category,
+            'category': category,
+            'scan_config': scan_config,
+            'page': 1,
+            'page_offset': 0,
+            'emitted': 0,
+            'started_at': started_at
+        }
+
+        if not result.get('success') or not result.get('scan_id'):
+            logger.error(f"Tactical Arbitrage scan {job['name']} not started: {result.get('error')}")
+            # Recorded so submit_due waits out the interval instead of retrying every pass
+            job['scan_id'] = f"unstarted:{job['name']}:{started_at}"
+            self._save(job, 'failed')
+            self.stats['start_failures'] += 1
+            return None
+
+        self._save(job)
+        self.stats['submitted'] += 1
+        self._track(job)
+
+        logger.info(f"Tracking Tactical Arbitrage scan {job['scan_id']} ({job['name']})")
+
+        return job['scan_id']
+
+    async def submit_due(self) -> int:
+        """Submit each configured scan whose interval has elapsed and that is not still running"""
+
+        submitted = 0
+
+        for scan in self.scans:
+            name = scan.get('name') or scan['category']
+            running, last_started = self.conn.execute(
+                "SELECT SUM(status = 'tracking'), MAX(started_at) FROM tactical_scans WHERE name = ?", (name,)
+            ).fetchone()
+
+            if running or (last_started and self.clock() - last_started < self.submit_interval):
+                continue
+
+            if await self.submit(scan.get('config', {}), scan['category'], name):
+                submitted += 1
+
+        return submitted
+
+    def resume(self) -> int:
+        """Restart polling for every scan still being tracked (after a restart)"""
+
+        rows = self.conn.execute(
+            "SELECT scan_id, name, category, scan_config, page, page_offset, emitted, started_at "
+            "FROM tactical_scans WHERE status = 'tracking'"
+        ).fetchall()
+
+        resumed = 0
+
+        for scan_id, name, category, scan_config, page, page_offset, emitted, started_at in rows:
+            if scan_id in self._tasks:
+                continue
+
+            self._track({
+                'scan_id': scan_id,
+                'name': name,
+                'category': category,
+                'scan_config': json.loads(scan_config),
+                'page': page,
+                'page_offset': page_offset,
+                'emitted': emitted,
+                'started_at': started_at
+            })
+            resumed += 1
+
+        self.stats['resumed'] += resumed
+        if resumed:
+            logger.info(f"Resumed tracking {resumed} Tactical Arbitrage scans")
+
+        return resumed
+
+    def _track(self, job: Dict):
+        task = asyncio.create_task(self._poll(job))
+        self._tasks[job['scan_id']] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job['scan_id'], None))
+
+    def _jittered(self, delay: float) -> float:
+        return random.uniform(delay / 2, delay)
+
+    async def _poll(self, job: Dict):
+        """Poll one scan until it finishes, fails or runs past max_scan_hours"""
+
+        delay = self.poll_initial
+        errors = 0
+
+        while True:
+            if self.clock() - job['started_at'] > self.max_age:
+                self._finish(job, 'expired')
+                return
+
+            try:
+                data = await self.api.get_results_page(job['scan_id'], job['page'], self.page_size)
+            except Exception as e:
+                errors += 1
+                self.stats['errors'] += 1
+                if errors >= self.max_errors:
+                    logger.error(f"Giving up on Tactical Arbitrage scan {job['scan_id']} after {errors} errors: {e}")
+                    self._finish(job, 'failed')
+                    return
+
+                await asyncio.sleep(self._jittered(delay))
+                delay = min(delay * self.poll_backoff, self.poll_max)
+                continue
+
+            errors = 0
+            self.stats['polls'] += 1
+
+            products = data.get('products') or []
+            new = products[job['page_offset']:]
+
+            for product in new:
+                await self.results.put(self._listing(job, product))
+
+            job['page_offset'] = max(job['page_offset'], len(products))
+            job['emitted'] += len(new)
+            self.stats['products'] += len(new)
+
+            # A full page will not change; read the next one straight away
+            if len(products) >= self.page_size:
+                job['page'] += 1
+                job['page_offset'] = 0
+                self.stats['pages'] += 1
+                self._save(job)
+                delay = self.poll_initial
+                continue
+
+            status = data.get('status', 'running')
+
+            if status in COMPLETED_STATUSES:
+                self._finish(job, 'completed')
+                return
+            if status in FAILED_STATUSES:
+                self._finish(job, 'failed')
+                return
+
+            if new:
+                self._save(job)
+                delay = self.poll_initial
+
+            await asyncio.sleep(self._jittered(delay))
+            delay = min(delay * self.poll_backoff, self.poll_max)
+
+    def _finish(self, job: Dict, status: str):
+        self._save(job, status)
+        self.stats[status] += 1
+        logger.info(f"Tactical Arbitrage scan {job['scan_id']} {status} with {job['emitted']} products")
+
+    def _listing(self, job: Dict, product: Dict) -> Dict:
+        """A scan result shaped like a marketplace listing for the validation pipeline"""
+
+        identifier = product.get('isbn') if job['category'] == 'books' else product.get('upc')
+        url = product.get('source_url') or product.get('url', '')
+
+        listing = {
+            'marketplace': 'tactical_arbitrage',
+            'listing_id': str(product.get('id') or url or f"{job['scan_id']}:{product.get('asin')}"),
+            'title': product.get('title') or product.get('name', ''),
+            'price': float(product.get('source_price') or product.get('price') or 0),
+            'url': url,
+            'asin': product.get('asin'),
+            'source_store': product.get('source'),
+            'condition': 'New',
+            'category': job['category'],
+            'search_keyword': job['name'],
+            'scan_id': job['scan_id'],
+            'discovered_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+        }
+
+        if identifier:
+            listing['identifier'] = identifier
+
+        return listing
+
+    async def get_batch(self, timeout: float) -> List[Dict]:
+        """Every listing streamed so far, waiting up to `timeout` seconds for the first"""
+
+        try:
+            batch = [await asyncio.wait_for(self.results.get(), timeout)]
+        except asyncio.TimeoutError:
+            return []
+
+        while not self.results.empty():
+            batch.append(self.results.get_nowait())
+
+        return batch
+
+    def get_stats(self) -> Dict:
+        """Scan and result counts, plus scans currently being polled"""
+        return {**self.stats, 'tracking': len(self._tasks), 'queued': self.results.qsize()}
+
+    async def close(self):
+        """Stop polling; unfinished scans stay tracked for the next `resume`"""
+
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.conn.close()
+
+
+def create_tactical_scan_tracker(config: Dict, api) -> Optional[TacticalScanTracker]:
+    """Build the scan tracker, or None when Tactical Arbitrage scanning is disabled"""
+
+    if not config.get('tactical_arbitrage', {}).get('enabled', False):
+        return None
+
+    return TacticalScanTracker(config, api)
@@ -9,19 +9,26 @@ from pathlib import Path
 from loguru import logger
 from datetime import datetime
 import sys
-from typing import Dict
+from typing import Dict, List, Optional
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from core.ai_engine import AIReasoningEngine, ArbitrageOpportunity
 from monitoring.market_scanner import MarketScanner, PriceValidator
+from monitoring.deduplication import ListingDeduplicator
+from monitoring.scan_scheduler import CategoryScheduler
+from tasks.celery_tasks import dispatch_scan_shards
+from tasks.result_channel import create_result_channel
 from communication.seller_communicator import SellerCommunicator, NegotiationManager
 from purchasing.purchase_engine import PurchaseEngine
 from selling.listing_manager import ListingManager
 from support.customer_support import CustomerSupportAI
 from integrations.api_integrations import APIManager
+from integrations.scan_tracker import create_tactical_scan_tracker
+from integrations.price_resolver import PriceResolver
 from database.db_manager import DatabaseManager
+from infrastructure.api_budget import APIBudgetManager
 
 
 class ArbitrageSystem:
@@ -47,13 +54,38 @@ class ArbitrageSystem:
         # Initialize core components
         self.ai_engine = AIReasoningEngine(self.config)
         self.market_scanner = MarketScanner(self.config)
-        self.price_validator = PriceValidator(self.config)
+        self.deduplicator = ListingDeduplicator(self.config)
+        self.scheduler = CategoryScheduler(self.config)
+        
+        # Distributed mode: scans are sharded onto Celery workers
+        self.distributed = self.config.get('distributed_scanning', {}).get('enabled', False)
+        self.result_channel = create_result_channel(self.config) if self.distributed else None
+        
+        # Paid lookups share per-API quotas and are recorded to the api_usage table
+        self.api_budget = APIBudgetManager(self.config, db=self.db)
+        self.price_validator = PriceValidator(
+            self.config, http_pool=self.market_scanner.http_pool, budget=self.api_budget
+        )
+        # Streamed listings are validated concurrently, up to this many at once
+        self.validation_slots = asyncio.Semaphore(
+            self.config.get('scanning', {}).get('max_concurrent_validations', 8)
+        )
         self.communicator = SellerCommunicator(self.config)
         self.negotiation_manager = NegotiationManager(self.ai_engine, self.communicator, self.config)
         self.purchase_engine = PurchaseEngine(self.config)
         self.listing_manager = ListingManager(self.ai_engine, self.config)
         self.customer_support = CustomerSupportAI(self.ai_engine, self.config)
-        self.api_manager = APIManager()
+        self.api_manager = APIManager(
+            keepa=self.price_validator.keepa,
+            single_flight=self.price_validator.single_flight,
+            price_cache=self.price_validator.price_cache,
+            resolver=PriceResolver(self.config),
+            budget=self.api_budget,
+            config=self.config,
+            http_pool=self.market_scanner.http_pool
+        )
+        # Bulk Tactical Arbitrage scans are polled in the background and streamed into validation
+        self.scan_tracker = create_tactical_scan_tracker(self.config, self.api_manager.tactical_arbitrage)
         
         logger.info("All modules initialized successfully")
         
@@ -96,7 +128,26 @@ class ArbitrageSystem:
             self.support_monitoring_loop()
         ]
         
-        await asyncio.gather(*tasks)
+        # Scan shards run on Celery workers; their listings come back here
+        if self.distributed:
+            tasks.append(self.distributed_results_loop())
+        
+        if self.scan_tracker is not None:
+            tasks.append(self.tactical_arbitrage_loop())
+        
+        # Start parse workers before the first scan burst
+        await self.market_scanner.parse_pool.warm_up()
+        await self.api_budget.load_today()
+        
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            await self.market_scanner.close()
+            if self.price_validator.price_cache is not None:
+                await self.price_validator.price_cache.close()
+            await self.api_budget.close()
+            if self.scan_tracker is not None:
+                await self.scan_tracker.close()
     
     async def market_monitoring_loop(self):
         """Main loop for monitoring marketplaces"""
@@ -105,24 +156,172 @@ class ArbitrageSystem:
         
         while self.running:
             try:
-                # Scan all categories
-                opportunities = await self.market_scanner.scan_all_categories()
+                # Scan only the categories whose interval has elapsed
+                due = self.scheduler.due_categories()
                 
-                self.stats['opportunities_found'] += len(opportunities)
+                if due and self.distributed:
+                    await self.dispatch_due_categories(due)
                 
-                logger.info(f"Found {len(opportunities)} potential opportunities")
-                
-                # Process each opportunity
-                for opp_data in opportunities:
-                    await self.process_opportunity(opp_data)
+                elif due:
+                    found = await self.stream_due_categories(due)
+                    
+                    logger.info(f"Found {found} potential opportunities in {', '.join(due)}")
                 
-                # Wait before next scan
-                await asyncio.sleep(600)  # 10 minutes
+                # Wait until the next category is due
+                await asyncio.sleep(self.scheduler.seconds_until_next())
                 
             except Exception as e:
                 logger.error(f"Market monitoring error: {e}")
                 await asyncio.sleep(60)
     
+    async def stream_due_categories(self, due: List[str]) -> int:
+        """
+        Scan due categories and process listings as they arrive
+        
+        Each listing goes through deduplication and into validation as
+        soon as its marketplace query returns, instead of after every
+        category finishes. Scans still running when the cycle budget runs
+        out (or when the cycle fails) are cancelled and their categories
+        stay due for the next cycle; listings already handed to validation
+        are still processed. Due categories all scan at once, so priority
+        orders them but does not decide which survive the budget.
+        """
+        
+        categories = self.config.get('categories', {})
+        finished = set()
+        processing = set()
+        found = 0
+        
+        def on_category_done(name: str, error: Optional[BaseException]):
+            finished.add(name)
+            self.scheduler.mark_scanned(name)
+            
+            if error is not None:
+                logger.error(f"Category scan failed for {name}: {error}")
+        
+        stream = self.market_scanner.stream_categories(
+            {name: categories[name] for name in due}, on_category_done
+        )
+        
+        try:
+            async with asyncio.timeout(self.scheduler.cycle_budget):
+                async for opp_data in stream:
+                    if self._accept_listing(opp_data, processing):
+                        found += 1
+        
+        except TimeoutError:
+            logger.warning(f"Cycle budget exhausted after {self.scheduler.cycle_budget}s")
+        
+        finally:
+            await stream.aclose()
+            
+            # Closing the stream cancelled the unfinished scans; leave their categories due
+            for name in due:
+                if name not in finished:
+                    self.scheduler.defer(name)
+                    logger.warning(f"Deferring unfinished category: {name}")
+            
+            if processing:
+                await asyncio.gather(*processing, return_exceptions=True)
+        
+        return found
+    
+    async def dispatch_due_categories(self, due: List[str]):
+        """
+        Queue due categories as (marketplace, category, location) Celery shards
+        
+        Categories count as scanned once dispatched; workers publish their
+        listings to the result channel, which distributed_results_loop reads.
+        If dispatching fails (broker down) they are deferred, still due.
+        """
+        
+        try:
+            shards = self.market_scanner.shards(due)
+            await asyncio.to_thread(dispatch_scan_shards, shards)
+        except Exception:
+            for name in due:
+                self.scheduler.defer(name)
+            raise
+        
+        for name in due:
+            self.scheduler.mark_scanned(name)
+        
+        logger.info(f"Dispatched {len(shards)} scan shards for {', '.join(due)}")
+    
+    async def distributed_results_loop(self):
+        """Process listings published by distributed scan workers"""
+        
+        logger.info("Distributed scan results loop started")
+        
+        processing = set()
+        
+        while self.running:
+            try:
+                message = await asyncio.to_thread(self.result_channel.get, 5.0)
+                if message is None:
+                    continue
+                
+                found = sum(self._accept_listing(opp_data, processing) for opp_data in message['listings'])
+                
+                shard = message['shard']
+                logger.info(
+                    f"Shard {shard['marketplace']}/{shard['category']}/{shard.get('location') or '-'}: "
+                    f"{found} potential opportunities"
+                )
+                
+            except Exception as e:
+                logger.error(f"Distributed results error: {e}")
+                await asyncio.sleep(5)
+        
+        if processing:
+            await asyncio.gather(*processing)
+    
+    async def tactical_arbitrage_loop(self):
+        """Submit scheduled Tactical Arbitrage scans and process their results as pages arrive"""
+        
+        logger.info("Tactical Arbitrage loop started")
+        
+        # Scans still running when the system last stopped carry on from their saved page
+        self.scan_tracker.resume()
+        
+        processing = set()
+        
+        while self.running:
+            try:
+                await self.scan_tracker.submit_due()
+                
+                # Whatever has streamed in, waiting a few seconds at most
+                for opp_data in await self.scan_tracker.get_batch(5.0):
+                    self._accept_listing(opp_data, processing)
+                
+            except Exception as e:
+                logger.error(f"Tactical Arbitrage loop error: {e}")
+                await asyncio.sleep(5)
+        
+        if processing:
+            await asyncio.gather(*processing)
+    
+    def _accept_listing(self, opp_data: Dict, processing: set) -> bool:
+        """Deduplicate a listing and start processing it, tracking the task in `processing`"""
+        
+        # Drop cross-posted and keyword-overlap duplicates before paid lookups
+        if self.deduplicator.is_duplicate(opp_data):
+            return False
+        
+        self.stats['opportunities_found'] += 1
+        
+        task = asyncio.create_task(self._process_streamed(opp_data))
+        processing.add(task)
+        task.add_done_callback(processing.discard)
+        
+        return True
+    
+    async def _process_streamed(self, opp_data: Dict):
+        """Process one streamed listing, bounded by the validation concurrency limit"""
+        
+        async with self.validation_slots:
+            await self.process_opportunity(opp_data)
+    
     async def process_opportunity(self, opp_data: Dict):
         """Process a discovered opportunity"""
         
@@ -136,6 +335,14 @@ class ArbitrageSystem:
                 logger.debug(f"Opportunity not viable: {opp_data['title'][:50]}")
                 return
             
+            self.api_budget.record_viable()
+            
+            keyword_planner = self.market_scanner.keyword_planner
+            if keyword_planner is not None:
+                keyword_planner.record_viable(
+                    opp_data['marketplace'], opp_data.get('search_keyword'), validation['estimated_profit']
+                )
+            
             # Create opportunity object
             opportunity = ArbitrageOpportunity(
                 source_marketplace=opp_data['marketplace'],
@@ -311,6 +518,90 @@ class ArbitrageSystem:
         logger.info(f"Listings Created: {self.stats['listings_created']}")
         logger.info(f"Sales Completed: {self.stats['sales_completed']}")
         logger.info(f"Total Profit: ${self.stats['total_profit']:.2f}")
+        
+        for category, lag in self.scheduler.get_lag_report().items():
+            logger.info(
+                f"Category {category}: {lag['scans']} scans, "
+                f"last lag {lag['last_lag_seconds']:.0f}s, max lag {lag['max_lag_seconds']:.0f}s"
+            )
+        
+        for host, pool_stats in self.market_scanner.get_http_stats().items():
+            logger.info(
+                f"HTTP {host}: {pool_stats['requests']} requests, "
+                f"{pool_stats['connections_opened']} connections, "
+                f"{pool_stats['avg_latency_ms']}ms avg"
+            )
+        
+        for source, flight_stats in self.price_validator.single_flight.get_stats().items():
+            logger.info(
+                f"Lookups {source}: {flight_stats['calls']} calls, {flight_stats['executions']} requests, "
+                f"{flight_stats['coalesce_rate']:.0%} coalesced"
+            )
+        
+        if self.price_validator.price_cache is not None:
+            cache_stats = self.price_validator.price_cache.get_stats()
+            logger.info(
+                f"Price cache: {cache_stats['hit_rate']:.0%} hit rate "
+                f"({cache_stats['local_hits']} local, {cache_stats['redis_hits']} redis, "
+                f"{cache_stats['stale_hits']} stale, {cache_stats['negative_hits']} negative), "
+                f"{cache_stats['misses']} misses"
+            )
+        
+        if self.price_validator.catalog is not None:
+            catalog_stats = self.price_validator.catalog.get_stats()
+            logger.info(
+                f"Catalog: {catalog_stats['identifier_hits'] + catalog_stats['title_hits']} of "
+                f"{catalog_stats['lookups']} resolved, {catalog_stats['ambiguous']} ambiguous, "
+                f"{catalog_stats['avg_lookup_us']:.0f}us avg"
+            )
+        
+        for source, source_stats in self.api_manager.resolver.get_stats()['sources'].items():
+            logger.info(
+                f"Pricing {source}: {source_stats['answers']} answers, {source_stats['timeouts']} timeouts, "
+                f"{source_stats['hedges']} hedged ({source_stats['hedge_wins']} won), p95 {source_stats['p95_ms']}ms"
+            )
+        
+        for name, client_stats in self.api_manager.get_client_stats().items():
+            for endpoint, endpoint_stats in client_stats['endpoints'].items():
+                logger.info(
+                    f"API {name} {endpoint}: {endpoint_stats['requests']} requests, "
+                    f"{endpoint_stats['errors']} errors, {endpoint_stats['retries']} retries, "
+                    f"p50 {endpoint_stats['p50_ms']}ms, p95 {endpoint_stats['p95_ms']}ms"
+                )
+        
+        if self.scan_tracker is not None:
+            scan_stats = self.scan_tracker.get_stats()
+            logger.info(
+                f"Tactical Arbitrage: {scan_stats['tracking']} scans tracking, {scan_stats['completed']} completed, "
+                f"{scan_stats['failed'] + scan_stats['expired']} failed or expired, "
+                f"{scan_stats['products']} products streamed"
+            )
+        
+        budget_stats = self.api_budget.get_stats()
+        spend_per_viable = budget_stats['spend_per_viable']
+        logger.info(
+            f"API spend: ${budget_stats['spend']:.2f} on {budget_stats['calls']} calls, "
+            f"{budget_stats['refused']} refused, "
+            f"{'$%.2f' % spend_per_viable if spend_per_viable is not None else 'n/a'} per viable opportunity"
+        )
+        for api, api_stats in budget_stats['apis'].items():
+            logger.info(
+                f"API {api}: {api_stats['requests_today']} requests today, ${api_stats['spend_today']:.2f}, "
+                f"{api_stats['remaining_fraction']:.0%} of daily allowance left, {api_stats['queued']} queued"
+            )
+        
+        keepa_stats = self.price_validator.keepa.get_stats()
+        logger.info(
+            f"Keepa: {keepa_stats['lookups']} lookups in {keepa_stats['batches']} requests, "
+            f"{keepa_stats['avg_batch_size']:.1f} ASINs/request, {keepa_stats['tokens_left']} tokens left"
+        )
+        
+        parse_stats = self.market_scanner.get_parse_stats()
+        logger.info(
+            f"Parsing: {parse_stats['pages']} pages, {parse_stats['records']} records "
+            f"on {parse_stats['workers']} workers, {parse_stats['avg_page_ms']:.1f}ms avg"
+        )
+        
         logger.info("=" * 80)
 
 
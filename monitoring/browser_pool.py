@@ -0,0 +1,190 @@
+"""
+Headless Browser Pool
+Warm, reusable Selenium Chrome sessions leased per query on worker threads
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Set
+
+from loguru import logger
+from selenium import webdriver
+from selenium.common.exceptions import (
+    NoSuchElementException, TimeoutException, WebDriverException
+)
+
+
+class BrowserSession:
+    """A pooled Chrome driver and how many queries it has served"""
+
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+        self.uses = 0
+
+
+class BrowserPool:
+    """
+    Bounded pool of warm headless Chrome sessions
+
+    Selenium is synchronous, so every driver call runs on a dedicated
+    worker thread and the event loop never blocks. Sessions are launched
+    lazily, reused across queries and recycled after `max_uses` leases
+    or when the driver crashes. A thread cannot be interrupted, so a
+    cancelled lease keeps its slot until the worker thread is done with
+    the driver.
+    """
+
+    def __init__(self, config: Dict):
+        pool_config = config.get('browser_pool', {})
+
+        self.size = pool_config.get('size', 2)
+        self.max_uses = pool_config.get('max_uses', 50)
+        self.page_load_timeout = pool_config.get('page_load_timeout', 30)
+
+        self.executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix='browser')
+        self._slots: Optional[asyncio.Queue] = None
+        self._pending_releases: Set[asyncio.Task] = set()
+
+        self.stats = {
+            'launched': 0,
+            'leases': 0,
+            'recycled': 0,
+            'crashed': 0
+        }
+
+    def _get_slots(self) -> asyncio.Queue:
+        """Slots hold an idle session, or None when the browser is not launched yet"""
+
+        if self._slots is None:
+            self._slots = asyncio.Queue()
+            for _ in range(self.size):
+                self._slots.put_nowait(None)
+
+        return self._slots
+
+    def _launch(self) -> webdriver.Chrome:
+        """Start a headless Chrome (runs on a worker thread)"""
+
+        options = webdriver.ChromeOptions()
+        options.add_argument('--headless')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--blink-settings=imagesEnabled=false')
+
+        driver = webdriver.Chrome(options=options)
+        driver.set_page_load_timeout(self.page_load_timeout)
+
+        return driver
+
+    def _quit(self, session: BrowserSession):
+        """Shut a driver down, ignoring errors from already-dead sessions"""
+
+        try:
+            session.driver.quit()
+        except Exception as e:
+            logger.debug(f"Error quitting browser session: {e}")
+
+    async def _run_in_thread(self, func: Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def run(self, func: Callable, *args):
+        """
+        Lease a session and run `func(driver, *args)` on a worker thread
+
+        Usage:
+            results = await pool.run(scrape_keyword, 'lego set')
+        """
+
+        slots = self._get_slots()
+        session = await slots.get()
+        recycle = False
+        handed_off = False
+        work: Optional[asyncio.Future] = None
+
+        try:
+            if session is None:
+                work = self._submit(self._launch)
+                session = BrowserSession(await asyncio.shield(work))
+                self.stats['launched'] += 1
+
+            session.uses += 1
+            self.stats['leases'] += 1
+
+            work = self._submit(func, session.driver, *args)
+            return await asyncio.shield(work)
+
+        except (TimeoutException, NoSuchElementException):
+            # Page-level failures, the browser itself is still healthy
+            raise
+
+        except WebDriverException:
+            recycle = True
+            self.stats['crashed'] += 1
+            raise
+
+        except asyncio.CancelledError:
+            if work is not None and not work.done():
+                # The worker thread is still driving the browser; release the slot once it finishes
+                release = asyncio.ensure_future(self._release_when_done(slots, session, work))
+                self._pending_releases.add(release)
+                release.add_done_callback(self._pending_releases.discard)
+                handed_off = True
+            raise
+
+        finally:
+            if not handed_off:
+                await self._release(slots, session, recycle)
+
+    def _submit(self, func: Callable, *args) -> asyncio.Future:
+        return asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def _release(self, slots: asyncio.Queue, session: Optional[BrowserSession], recycle: bool = False):
+        """Return a slot to the pool, quitting its session first when it is due for recycling"""
+
+        if session is not None and (recycle or session.uses >= self.max_uses):
+            await self._run_in_thread(self._quit, session)
+            self.stats['recycled'] += 1
+            session = None
+
+        slots.put_nowait(session)
+
+    async def _release_when_done(self, slots: asyncio.Queue, session: Optional[BrowserSession], work: asyncio.Future):
+        """Hold a cancelled lease until its worker thread lets go of the driver"""
+
+        recycle = False
+
+        try:
+            result = await work
+            if session is None:
+                # The cancelled lease was launching the browser; keep it warm for the next one
+                session = BrowserSession(result)
+                self.stats['launched'] += 1
+        except WebDriverException:
+            recycle = True
+            self.stats['crashed'] += 1
+        except Exception as e:
+            logger.debug(f"Cancelled browser query failed: {e}")
+
+        await self._release(slots, session, recycle)
+
+    def get_stats(self) -> Dict:
+        """Pool usage counters"""
+        return dict(self.stats)
+
+    async def close(self):
+        """Quit every idle session and stop the worker threads"""
+
+        # Let cancelled queries finish so their sessions are quit too
+        if self._pending_releases:
+            await asyncio.gather(*self._pending_releases, return_exceptions=True)
+
+        if self._slots is not None:
+            while not self._slots.empty():
+                session = self._slots.get_nowait()
+                if session is not None:
+                    await self._run_in_thread(self._quit, session)
+            self._slots = None
+
+        self.executor.shutdown(wait=False)
+        logger.info("Browser pool closed")
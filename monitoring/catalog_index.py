@@ -0,0 +1,253 @@
+"""
+Local Product Catalog Index
+Resolves marketplace titles and barcodes to ASINs offline, before any paid lookup
+"""
+
+import csv
+import json
+import math
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from monitoring.deduplication import title_tokens
+from utils.identifiers import normalize_isbn
+
+
+# Identifier columns a catalog row may carry
+IDENTIFIER_FIELDS = ('asin', 'upc', 'isbn', 'set_number')
+
+# Small catalogs never skip a token for being common
+MIN_POSTINGS_CAP = 100
+
+
+class CatalogIndex:
+    """
+    In-memory catalog with exact identifier maps and a token inverted index
+
+    Each product's title, brand and model are tokenized (the same way the
+    deduplicator does it) and every token maps to the products containing
+    it, weighted by IDF so model numbers count for far more than words
+    like "set". A title lookup scores only the products sharing one of its
+    rarer tokens, by the share of each product's token weight found in the
+    title; seller filler ("sealed", "must go") costs nothing. The best
+    match is accepted only when it clears `min_score` and beats the
+    runner-up by `min_lead`, so an ambiguous title is left unresolved
+    instead of being priced against the wrong product.
+    """
+
+    def __init__(self, config: Dict, products: Optional[Iterable[Dict]] = None):
+        catalog_config = config.get('catalog', {})
+
+        self.min_score = catalog_config.get('min_score', 0.5)
+        self.min_lead = catalog_config.get('min_lead', 0.1)
+        self.max_token_share = catalog_config.get('max_token_share', 0.2)
+
+        self.products: List[Dict] = []
+        self.identifiers: Dict[str, Dict[str, int]] = {field: {} for field in IDENTIFIER_FIELDS}
+        # token -> sorted ids of products containing it
+        self.postings: Dict[str, np.ndarray] = {}
+        self.idf: Dict[str, float] = {}
+        self.product_weights = np.zeros(0)
+        self.product_categories = np.zeros(0, dtype=object)
+        # token -> membership mask over all products, for tokens too common to generate candidates
+        self._common_masks: Dict[str, np.ndarray] = {}
+
+        self.stats = {
+            'lookups': 0,
+            'identifier_hits': 0,
+            'title_hits': 0,
+            'ambiguous': 0,
+            'misses': 0,
+            'lookup_seconds': 0.0
+        }
+
+        if products is not None:
+            self.build(products)
+
+    @staticmethod
+    def _normalize(field: str, value) -> Optional[str]:
+        value = str(value or '').strip()
+        if not value:
+            return None
+
+        if field == 'isbn':
+            return normalize_isbn(value)
+        if field == 'asin':
+            return value.upper()
+
+        return value
+
+    def build(self, products: Iterable[Dict]):
+        """Index a catalog, replacing anything already loaded"""
+
+        self.products = []
+        self.identifiers = {field: {} for field in IDENTIFIER_FIELDS}
+        self._common_masks = {}
+        product_tokens = []
+        postings: Dict[str, List[int]] = {}
+
+        for product in products:
+            product_id = len(self.products)
+            self.products.append(product)
+
+            for field in IDENTIFIER_FIELDS:
+                value = self._normalize(field, product.get(field))
+                if value:
+                    self.identifiers[field].setdefault(value, product_id)
+
+            text = ' '.join(str(product.get(field) or '') for field in ('brand', 'model', 'title'))
+            tokens = set(title_tokens(text))
+            product_tokens.append(tokens)
+
+            for token in tokens:
+                postings.setdefault(token, []).append(product_id)
+
+        count = max(len(self.products), 1)
+        self.postings = {token: np.asarray(ids, dtype=np.int64) for token, ids in postings.items()}
+        self.idf = {token: math.log(1 + count / len(ids)) for token, ids in postings.items()}
+        self.product_weights = np.array([sum(self.idf[token] for token in tokens) for tokens in product_tokens])
+        self.product_categories = np.array([product.get('category') or '' for product in self.products], dtype=object)
+
+        logger.info(f"Catalog index built: {len(self.products)} products, {len(self.postings)} tokens")
+
+    def load(self, path: str):
+        """Load a JSON-lines or CSV catalog file"""
+
+        with open(path, newline='', encoding='utf-8') as f:
+            if path.endswith('.csv'):
+                products = list(csv.DictReader(f))
+            else:
+                products = [json.loads(line) for line in f if line.strip()]
+
+        self.build(products)
+
+    def get(self, field: str, value: str) -> Optional[Dict]:
+        """Product with an exact identifier (asin, upc, isbn or set_number)"""
+
+        value = self._normalize(field, value)
+        product_id = self.identifiers.get(field, {}).get(value) if value else None
+
+        return self.products[product_id] if product_id is not None else None
+
+    def search(self, title: str, category: Optional[str] = None, limit: int = 2) -> List[Tuple[float, Dict]]:
+        """Best-scoring products for a title, as (score, product)"""
+
+        tokens = set(title_tokens(title))
+        if not tokens:
+            return []
+
+        max_postings = max(MIN_POSTINGS_CAP, int(self.max_token_share * len(self.products)))
+
+        rare = []
+        common = []
+        for token in tokens:
+            ids = self.postings.get(token)
+            if ids is None:
+                continue
+            # Very common tokens would pull in most of the catalog as candidates
+            (common if len(ids) > max_postings else rare).append(token)
+
+        if not rare:
+            return []
+
+        # Shared token weight per candidate, summed over the rare tokens' postings
+        ids = np.concatenate([self.postings[token] for token in rare])
+        weights = np.repeat([self.idf[token] for token in rare], [len(self.postings[token]) for token in rare])
+        candidates, inverse = np.unique(ids, return_inverse=True)
+        shared = np.bincount(inverse, weights=weights)
+
+        # Common tokens did not generate candidates but still count towards the score
+        for token in common:
+            shared += self.idf[token] * self._common_mask(token)[candidates]
+
+        scores = shared / self.product_weights[candidates]
+
+        if category:
+            categories = self.product_categories[candidates]
+            scores[(categories != category) & (categories != '')] = 0.0
+
+        top = np.argsort(-scores, kind='stable')[:limit]
+
+        return [(float(scores[i]), self.products[candidates[i]]) for i in top if scores[i] > 0]
+
+    def _common_mask(self, token: str) -> np.ndarray:
+        mask = self._common_masks.get(token)
+        if mask is None:
+            mask = np.zeros(len(self.products), dtype=bool)
+            mask[self.postings[token]] = True
+            self._common_masks[token] = mask
+
+        return mask
+
+    def match(self, title: str, category: Optional[str] = None) -> Optional[Dict]:
+        """The product a title confidently refers to, or None"""
+
+        started = time.perf_counter()
+        self.stats['lookups'] += 1
+
+        results = self.search(title, category)
+        product = None
+
+        if results and results[0][0] >= self.min_score:
+            runner_up = results[1][0] if len(results) > 1 else 0.0
+            if results[0][0] - runner_up >= self.min_lead:
+                product = results[0][1]
+                self.stats['title_hits'] += 1
+            else:
+                self.stats['ambiguous'] += 1
+        else:
+            self.stats['misses'] += 1
+
+        self.stats['lookup_seconds'] += time.perf_counter() - started
+
+        return product
+
+    def resolve(self,
+                title: str,
+                category: Optional[str] = None,
+                identifier: Optional[str] = None,
+                field: str = 'upc') -> Optional[Dict]:
+        """Product for a listing: by its identifier (in `field`) when it has one, else by title"""
+
+        if identifier:
+            product = self.get(field, identifier)
+            if product is not None:
+                self.stats['lookups'] += 1
+                self.stats['identifier_hits'] += 1
+                return product
+
+        return self.match(title, category)
+
+    def get_stats(self) -> Dict:
+        """Lookup outcomes and average title lookup time"""
+
+        lookups = self.stats['lookups']
+
+        return {
+            **self.stats,
+            'products': len(self.products),
+            'avg_lookup_us': self.stats['lookup_seconds'] / lookups * 1e6 if lookups else 0.0
+        }
+
+
+def create_catalog_index(config: Dict) -> Optional[CatalogIndex]:
+    """Load the catalog index, or None when it is disabled or the file is missing"""
+
+    catalog_config = config.get('catalog', {})
+
+    if not catalog_config.get('enabled', False):
+        return None
+
+    path = catalog_config.get('path', 'data/catalog.jsonl')
+    if not os.path.exists(path):
+        logger.warning(f"Catalog file {path} not found; titles will not be resolved to ASINs")
+        return None
+
+    index = CatalogIndex(config)
+    index.load(path)
+
+    return index
@@ -3,12 +3,17 @@ Category-Specific Keywords and Search Terms
 Optimized based on the arbitrage report's recommendations
 """
 
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from monitoring.keyword_matcher import KeywordMatcher
 
 
 class CategoryKeywords:
     """Keywords and search strategies for each category"""
     
+    # Built from the tables below on first use
+    _matcher: Optional[KeywordMatcher] = None
+    
     # Books & Textbooks
     BOOKS = {
         'primary': [
@@ -189,7 +194,8 @@ class CategoryKeywords:
         if not category_data:
             return [category]
         
-        keywords = category_data.get('primary', [])
+        # Copy so the class-level term lists are never mutated
+        keywords = list(category_data.get('primary', []))
         keywords.extend(category_data.get('brands', []))
         
         # Add seasonal keywords if applicable
@@ -210,12 +216,35 @@ class CategoryKeywords:
         category_data = getattr(cls, category.upper(), {})
         return category_data.get('exclude', [])
     
+    @classmethod
+    def categories(cls) -> Dict[str, Dict]:
+        """All category term tables, keyed by lowercase category name"""
+        
+        return {
+            name.lower(): value
+            for name, value in vars(cls).items()
+            if name.isupper() and isinstance(value, dict)
+        }
+    
+    @classmethod
+    def matcher(cls) -> KeywordMatcher:
+        """Shared exclusion matcher over every category's terms, built on first use"""
+        
+        if cls._matcher is None:
+            cls._matcher = KeywordMatcher(cls.categories())
+        
+        return cls._matcher
+    
     @classmethod
     def should_exclude(cls, title: str, category: str) -> bool:
         """Check if listing should be excluded based on keywords"""
         
-        exclude_terms = cls.get_exclude_terms(category)
-        title_lower = title.lower()
+        matcher = cls._matcher or cls.matcher()
         
-        return any(term in title_lower for term in exclude_terms)
-
+        return matcher.is_excluded(title, category.lower())
+    
+    @classmethod
+    def exclusion_reasons(cls, title: str, category: str) -> List[str]:
+        """Exclusion terms found in a title, in title order"""
+        
+        return cls.matcher().exclusion_reasons(title, category.lower())
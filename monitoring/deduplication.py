@@ -0,0 +1,213 @@
+"""
+Cross-Marketplace Listing Deduplication
+Drops cross-posted and keyword-overlap duplicates before price validation
+"""
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from loguru import logger
+
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    'ref', 'referrer', 'referral_code', 'fbclid', 'gclid', 'mc_cid', 'mc_eid',
+    'tracking', 'source', 'src', 'share', 'ref_id', '_from', 'lst'
+}
+
+STOPWORDS = {
+    'a', 'an', 'and', 'the', 'for', 'with', 'of', 'in', 'on', 'to', 'new',
+    'used', 'great', 'condition', 'good', 'excellent', 'like', 'obo', 'sale'
+}
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+SIMHASH_BITS = 64
+BANDS = 4
+BAND_BITS = SIMHASH_BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a listing URL: no tracking params, fragment, www or trailing slash"""
+
+    if not url:
+        return ''
+
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+
+    for prefix in ('www.', 'm.', 'mobile.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith('utm_')
+    )
+
+    path = parts.path.rstrip('/') or '/'
+
+    return urlunsplit(('https', host, path, urlencode(query), ''))
+
+
+def title_tokens(title: str) -> List[str]:
+    """Lowercased title words without filler terms"""
+    return [token for token in TOKEN_PATTERN.findall(title.lower()) if token not in STOPWORDS]
+
+
+def simhash(tokens: List[str]) -> int:
+    """64-bit SimHash over title words and word bigrams"""
+
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    weights = [0] * SIMHASH_BITS
+
+    for feature in features:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), 'big')
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if digest >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class ListingDeduplicator:
+    """
+    Bounded in-memory index of recently seen listings
+
+    A listing is a duplicate when its canonical URL was already seen at
+    the same price, or when an earlier listing has a near-identical title fingerprint
+    (SimHash within `hamming_threshold` bits) and a price within
+    `price_tolerance`. Fingerprints are split into bands so candidate
+    lookup is a few dict hits instead of a scan of the whole index. A
+    known URL at a new price is a re-priced listing: its old entry is
+    replaced and it goes on to validation.
+    """
+
+    def __init__(self, config: Dict):
+        dedup_config = config.get('deduplication', {})
+
+        self.max_entries = dedup_config.get('max_entries', 50000)
+        self.hamming_threshold = dedup_config.get('hamming_threshold', 3)
+        self.price_tolerance = dedup_config.get('price_tolerance', 0.10)
+        self.ttl_seconds = dedup_config.get('ttl_hours', 24) * 3600
+
+        # entry id -> (fingerprint, price, seen_at, canonical_url)
+        self.entries: 'OrderedDict[int, Tuple[int, float, float, str]]' = OrderedDict()
+        self.urls: Dict[str, int] = {}
+        self.bands: List[Dict[int, Set[int]]] = [{} for _ in range(BANDS)]
+        self._next_id = 0
+
+        self.stats = {
+            'checked': 0,
+            'url_duplicates': 0,
+            'repriced': 0,
+            'near_duplicates': 0
+        }
+
+    def _band_keys(self, fingerprint: int) -> List[int]:
+        return [(fingerprint >> (band * BAND_BITS)) & BAND_MASK for band in range(BANDS)]
+
+    def _evict(self, entry_id: int):
+        fingerprint, _, _, url = self.entries.pop(entry_id)
+
+        if url and self.urls.get(url) == entry_id:
+            del self.urls[url]
+
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            bucket = self.bands[band].get(key)
+            if bucket:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self.bands[band][key]
+
+    def _evict_expired(self, now: float):
+        while self.entries:
+            oldest_id, (_, _, seen_at, _) = next(iter(self.entries.items()))
+            if now - seen_at < self.ttl_seconds and len(self.entries) < self.max_entries:
+                break
+            self._evict(oldest_id)
+
+    def _find_near_duplicate(self, fingerprint: int, price: float) -> Optional[int]:
+        """Find an indexed listing with a close fingerprint and price"""
+
+        # With 4 bands and a threshold below 4 bits, any match shares at least one band
+        candidates = set()
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            candidates |= self.bands[band].get(key, set())
+
+        for entry_id in candidates:
+            other_fingerprint, other_price, _, _ = self.entries[entry_id]
+
+            if hamming_distance(fingerprint, other_fingerprint) > self.hamming_threshold:
+                continue
+
+            if abs(price - other_price) <= self.price_tolerance * max(price, other_price, 1.0):
+                return entry_id
+
+        return None
+
+    def is_duplicate(self, listing: Dict) -> bool:
+        """Check a listing against the index, indexing it when it is new"""
+
+        now = time.monotonic()
+        self._evict_expired(now)
+        self.stats['checked'] += 1
+
+        url = normalize_url(listing.get('url', ''))
+        price = float(listing.get('price') or 0)
+
+        if url and url in self.urls:
+            entry_id = self.urls[url]
+            if abs(self.entries[entry_id][1] - price) < 0.01:
+                self.stats['url_duplicates'] += 1
+                return True
+
+            # Re-priced: index it at the new price instead of matching its own old entry
+            self._evict(entry_id)
+            self.stats['repriced'] += 1
+
+        tokens = title_tokens(listing.get('title', ''))
+        fingerprint = simhash(tokens) if tokens else 0
+
+        if tokens and self._find_near_duplicate(fingerprint, price) is not None:
+            self.stats['near_duplicates'] += 1
+            return True
+
+        entry_id = self._next_id
+        self._next_id += 1
+
+        self.entries[entry_id] = (fingerprint, price, now, url)
+        if url:
+            self.urls[url] = entry_id
+        if tokens:
+            for band, key in enumerate(self._band_keys(fingerprint)):
+                self.bands[band].setdefault(key, set()).add(entry_id)
+
+        return False
+
+    def deduplicate(self, listings: List[Dict]) -> List[Dict]:
+        """Return listings with duplicates (within the batch and against history) removed"""
+
+        unique = [listing for listing in listings if not self.is_duplicate(listing)]
+
+        if len(unique) < len(listings):
+            logger.info(f"Deduplication removed {len(listings) - len(unique)} of {len(listings)} listings")
+
+        return unique
+
+    def get_stats(self) -> Dict:
+        """Deduplication counters and index size"""
+        return {**self.stats, 'indexed': len(self.entries)}
@@ -0,0 +1,217 @@
+"""
+HTML Parser Backends
+Pluggable search-result parsers: selectolax, lxml or BeautifulSoup
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Union
+
+from bs4 import BeautifulSoup, SoupStrainer
+from loguru import logger
+
+try:
+    import lxml.html
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+
+Markup = Union[str, bytes]
+
+
+def parse_price(price_text: Optional[str]) -> Optional[float]:
+    """'$1,250' -> 1250.0, None when there is no usable price"""
+
+    if not price_text:
+        return None
+
+    try:
+        return float(price_text.strip().replace('$', '').replace(',', ''))
+    except ValueError:
+        return None
+
+
+class ListingParser(ABC):
+    """
+    Base class for search-result parsers
+
+    Parsers return compact records (listing_id, title, price, url, hood)
+    in page order. Parsing stops at `stop_at` (a post id already seen)
+    or after `limit` rows, so already-processed rows are never walked.
+    """
+
+    name = ''
+
+    @abstractmethod
+    def parse_craigslist(self, markup: Markup, limit: int = 30, stop_at: Optional[str] = None) -> List[Dict]:
+        """Parse a Craigslist search results page"""
+        pass
+
+    def _record(self, post_id, title, price_text, url, hood) -> Optional[Dict]:
+        price = parse_price(price_text)
+
+        if not title or price is None:
+            return None
+
+        return {
+            'listing_id': post_id,
+            'title': title.strip(),
+            'price': price,
+            'url': url or '',
+            'hood': (hood or '').strip()
+        }
+
+
+class SoupParser(ListingParser):
+    """BeautifulSoup with a strainer so only result rows are built into a tree"""
+
+    name = 'bs4'
+
+    def __init__(self):
+        self.strainer = SoupStrainer('li', class_='result-row')
+
+    def parse_craigslist(self, markup: Markup, limit: int = 30, stop_at: Optional[str] = None) -> List[Dict]:
+        soup = BeautifulSoup(markup, 'html.parser', parse_only=self.strainer)
+        records = []
+
+        for row in soup.find_all('li', class_='result-row', limit=limit):
+            post_id = row.get('data-pid')
+            if stop_at and post_id == stop_at:
+                break
+
+            title_elem = row.find('a', class_='result-title')
+            price_elem = row.find(class_='result-price')
+            hood_elem = row.find(class_='result-hood')
+
+            record = self._record(
+                post_id,
+                title_elem.get_text() if title_elem else None,
+                price_elem.get_text() if price_elem else None,
+                title_elem.get('href', '') if title_elem else '',
+                hood_elem.get_text() if hood_elem else ''
+            )
+            if record:
+                records.append(record)
+
+        return records
+
+
+class LxmlParser(ListingParser):
+    """lxml with precompiled XPath expressions"""
+
+    name = 'lxml'
+
+    def __init__(self):
+        if not LXML_AVAILABLE:
+            raise ImportError("lxml is not installed")
+
+        has_class = "contains(concat(' ', normalize-space(@class), ' '), ' {} ')"
+
+        self.rows = etree.XPath(f"//li[{has_class.format('result-row')}]")
+        self.title = etree.XPath(f".//a[{has_class.format('result-title')}]")
+        self.price = etree.XPath(f".//*[{has_class.format('result-price')}]/text()")
+        self.hood = etree.XPath(f".//*[{has_class.format('result-hood')}]/text()")
+
+    def parse_craigslist(self, markup: Markup, limit: int = 30, stop_at: Optional[str] = None) -> List[Dict]:
+        if not markup:
+            return []
+
+        document = lxml.html.fromstring(markup)
+        records = []
+
+        for row in self.rows(document)[:limit]:
+            post_id = row.get('data-pid')
+            if stop_at and post_id == stop_at:
+                break
+
+            titles = self.title(row)
+            prices = self.price(row)
+            hoods = self.hood(row)
+
+            record = self._record(
+                post_id,
+                titles[0].text_content() if titles else None,
+                prices[0] if prices else None,
+                titles[0].get('href', '') if titles else '',
+                hoods[0] if hoods else ''
+            )
+            if record:
+                records.append(record)
+
+        return records
+
+
+class SelectolaxParser(ListingParser):
+    """selectolax on the lexbor C parser, with CSS selectors"""
+
+    name = 'selectolax'
+
+    def __init__(self):
+        if not SELECTOLAX_AVAILABLE:
+            raise ImportError("selectolax is not installed")
+
+    def parse_craigslist(self, markup: Markup, limit: int = 30, stop_at: Optional[str] = None) -> List[Dict]:
+        tree = LexborHTMLParser(markup)
+        records = []
+
+        for row in tree.css('li.result-row')[:limit]:
+            post_id = row.attributes.get('data-pid')
+            if stop_at and post_id == stop_at:
+                break
+
+            title_elem = row.css_first('a.result-title')
+            price_elem = row.css_first('.result-price')
+            hood_elem = row.css_first('.result-hood')
+
+            record = self._record(
+                post_id,
+                title_elem.text() if title_elem else None,
+                price_elem.text() if price_elem else None,
+                title_elem.attributes.get('href', '') if title_elem else '',
+                hood_elem.text() if hood_elem else ''
+            )
+            if record:
+                records.append(record)
+
+        return records
+
+
+PARSER_BACKENDS = {
+    'selectolax': SelectolaxParser,
+    'lxml': LxmlParser,
+    'bs4': SoupParser
+}
+
+
+def available_backends() -> List[str]:
+    """Backends whose libraries are installed, fastest first"""
+
+    available = []
+
+    if SELECTOLAX_AVAILABLE:
+        available.append('selectolax')
+    if LXML_AVAILABLE:
+        available.append('lxml')
+    available.append('bs4')
+
+    return available
+
+
+def get_parser(config: Dict) -> ListingParser:
+    """Build the configured parser, falling back to the fastest installed backend"""
+
+    backend = config.get('scanning', {}).get('parser_backend', 'auto')
+
+    if backend not in available_backends():
+        if backend != 'auto':
+            logger.warning(f"Parser backend '{backend}' unavailable, falling back")
+        backend = available_backends()[0]
+
+    return PARSER_BACKENDS[backend]()
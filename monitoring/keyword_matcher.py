@@ -0,0 +1,40 @@
+"""
+Keyword Matcher
+Per-category exclusion terms, normalized once and shared by every listing check
+"""
+
+from typing import Dict, List, Tuple
+
+
+class KeywordMatcher:
+    """
+    Precompiled exclusion terms for all categories
+
+    `categories` maps a category name to its term lists; each category's
+    `exclude` terms are lowercased and deduplicated once, up front.
+    Exclusion terms match anywhere in the title, so 'water damaged' is
+    caught by 'water damage'. Categories have only a handful of
+    exclusions, so plain `in` tests (which run in C) beat walking a
+    multi-pattern automaton in Python.
+    """
+
+    def __init__(self, categories: Dict[str, Dict]):
+        self.exclusions: Dict[str, Tuple[str, ...]] = {
+            category: tuple(dict.fromkeys(term.lower() for term in data.get('exclude', [])))
+            for category, data in categories.items()
+        }
+
+    def is_excluded(self, title: str, category: str) -> bool:
+        """Whether the title contains any of `category`'s exclusion terms"""
+
+        text = title.lower()
+
+        return any(term in text for term in self.exclusions.get(category, ()))
+
+    def exclusion_reasons(self, title: str, category: str) -> List[str]:
+        """Exclusion terms for `category` found in the title, in title order"""
+
+        text = title.lower()
+        found = [term for term in self.exclusions.get(category, ()) if term in text]
+
+        return sorted(found, key=text.find)
@@ -0,0 +1,265 @@
+"""
+Keyword Yield Tracking
+Per (marketplace, keyword) query statistics and a bandit planner that prunes unproductive searches
+"""
+
+import math
+import random
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+COUNTERS = ('queries', 'new_listings', 'viable', 'expected_profit')
+
+# Stored counters and pending increments are each decayed to the later of their times, then summed
+MERGE_COUNTERS = ', '.join(
+    f"{counter} = {counter} * decay(excluded.updated_at - updated_at)"
+    f" + excluded.{counter} * decay(updated_at - excluded.updated_at)"
+    for counter in COUNTERS
+)
+
+UPSERT = f"""
+    INSERT INTO keyword_yield (marketplace, keyword, {', '.join(COUNTERS)}, updated_at)
+    VALUES (?, ?, {', '.join('?' * len(COUNTERS))}, ?)
+    ON CONFLICT (marketplace, keyword) DO UPDATE SET {MERGE_COUNTERS}, updated_at = MAX(updated_at, excluded.updated_at)
+"""
+
+
+class KeywordYieldTracker:
+    """
+    Query yield per (marketplace, keyword), persisted in SQLite
+
+    Counts scans, new listings, viable opportunities and expected profit
+    for every search keyword on every marketplace. Counts decay with a
+    configurable half-life so a keyword that stopped producing deals loses
+    its standing.
+
+    `plan` is a Thompson-sampling bandit: each keyword's chance of yielding
+    a viable deal per query is drawn from a Beta posterior and weighted by
+    its average expected profit. Keywords with fewer than `min_trials`
+    scans are always queried; of the rest, only the best `keep_fraction`
+    are, so low-yield keywords are skipped most cycles but still
+    re-tested now and then. Planned keywords come back best first, so productive
+    searches queue first on the rate limiter.
+
+    Counters change in memory; the increments are added to the stored
+    rows in one transaction at most every `flush_interval_seconds` (and on
+    close), so the scan loop does not wait on a SQLite commit per
+    increment, and scan workers sharing the database add to each other's
+    counts instead of overwriting them.
+    """
+
+    def __init__(self, config: Dict, rng: Optional[random.Random] = None):
+        planner_config = config.get('keyword_planner', {})
+
+        self.min_trials = planner_config.get('min_trials', 5)
+        self.keep_fraction = planner_config.get('keep_fraction', 0.5)
+        self.min_keywords = planner_config.get('min_keywords', 2)
+        self.half_life_seconds = planner_config.get('half_life_days', 14) * 86400
+        self.default_profit = planner_config.get('default_profit', 20.0)
+        self.listing_weight = planner_config.get('listing_weight', 0.01)
+        self.flush_interval = planner_config.get('flush_interval_seconds', 30)
+        self.rng = rng or random.Random()
+
+        path = planner_config.get('sqlite_path', 'data/keyword_yield.db')
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(path)
+        self.conn.create_function('decay', 1, self._decay_factor, deterministic=True)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS keyword_yield (
+                marketplace TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                queries REAL NOT NULL,
+                new_listings REAL NOT NULL,
+                viable REAL NOT NULL,
+                expected_profit REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (marketplace, keyword)
+            )
+        """)
+
+        # (marketplace, keyword) -> counters plus updated_at (epoch seconds)
+        self.stats: Dict[Tuple[str, str], Dict[str, float]] = {}
+        # Increments not yet added to the stored rows, in the same shape
+        self._pending: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self._last_flush = time.monotonic()
+
+        self._load()
+
+        logger.info(f"Keyword yield tracker loaded {len(self.stats)} keyword stats")
+
+    def _decay(self, entry: Dict[str, float], now: float):
+        """Decay an entry's counters to `now`"""
+
+        factor = self._decay_factor(now - entry['updated_at'])
+        if factor < 1.0:
+            for counter in COUNTERS:
+                entry[counter] *= factor
+            entry['updated_at'] = now
+
+    def _decay_factor(self, elapsed: float) -> float:
+        """Decay over `elapsed` seconds (none for negative spans); registered as decay() for SQL"""
+
+        if elapsed <= 0 or not self.half_life_seconds:
+            return 1.0
+
+        return 0.5 ** (elapsed / self.half_life_seconds)
+
+    def _entry(self, marketplace: str, keyword: str, now: float) -> Dict[str, float]:
+        """Counters for a keyword, decayed to `now`"""
+
+        entry = self.stats.get((marketplace, keyword))
+
+        if entry is None:
+            entry = {counter: 0.0 for counter in COUNTERS}
+            entry['updated_at'] = now
+            self.stats[(marketplace, keyword)] = entry
+            return entry
+
+        self._decay(entry, now)
+
+        return entry
+
+    def _record(self, marketplace: str, keyword: str, **increments: float):
+        now = time.time()
+        entry = self._entry(marketplace, keyword, now)
+
+        pending = self._pending.get((marketplace, keyword))
+        if pending is None:
+            pending = self._pending[(marketplace, keyword)] = {counter: 0.0 for counter in COUNTERS}
+            pending['updated_at'] = now
+        else:
+            self._decay(pending, now)
+
+        for counter, amount in increments.items():
+            entry[counter] += amount
+            pending[counter] += amount
+
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Add every pending increment to the stored counters in one transaction
+
+        Other processes (scan workers) add to the same rows, so the stored
+        counters are decayed and added to rather than replaced; the merged
+        rows are then read back as this tracker's view.
+        """
+
+        self._last_flush = time.monotonic()
+
+        if not self._pending:
+            return
+
+        rows = [
+            (marketplace, keyword, *(pending[counter] for counter in COUNTERS), pending['updated_at'])
+            for (marketplace, keyword), pending in self._pending.items()
+        ]
+        self._pending.clear()
+
+        with self.conn:
+            self.conn.executemany(UPSERT, rows)
+
+        self._load()
+
+    def _load(self):
+        self.stats = {
+            (row[0], row[1]): dict(zip(COUNTERS + ('updated_at',), row[2:]))
+            for row in self.conn.execute(f"SELECT marketplace, keyword, {', '.join(COUNTERS)}, updated_at FROM keyword_yield")
+        }
+
+    def record_scan(self, marketplace: str, keywords: List[str], listings: List[Dict]):
+        """Count one query per keyword and the new listings each one returned"""
+
+        found = {keyword: 0 for keyword in keywords}
+
+        for listing in listings:
+            keyword = listing.get('search_keyword')
+            if keyword in found:
+                found[keyword] += 1
+
+        for keyword, new_listings in found.items():
+            self._record(marketplace, keyword, queries=1, new_listings=new_listings)
+
+    def record_viable(self, marketplace: str, keyword: Optional[str], expected_profit: float):
+        """A listing from this keyword passed price validation"""
+
+        if keyword:
+            self._record(marketplace, keyword, viable=1, expected_profit=max(expected_profit, 0.0))
+
+    def _sample_value(self, entry: Dict[str, float]) -> float:
+        """Sampled expected profit per query"""
+
+        queries = entry['queries']
+        viable = min(entry['viable'], queries)
+
+        viable_rate = self.rng.betavariate(1 + viable, 1 + queries - viable)
+        profit = entry['expected_profit'] / entry['viable'] if entry['viable'] >= 1 else self.default_profit
+        listing_rate = entry['new_listings'] / queries if queries else 0.0
+
+        return viable_rate * profit + self.listing_weight * listing_rate
+
+    def plan(self, marketplace: str, keywords: List[str]) -> List[str]:
+        """Keywords to query this cycle, most promising first"""
+
+        now = time.time()
+        untried = []
+        scored = []
+
+        for keyword in keywords:
+            entry = self._entry(marketplace, keyword, now)
+
+            if entry['queries'] < self.min_trials:
+                untried.append(keyword)
+            else:
+                scored.append((self._sample_value(entry), keyword))
+
+        scored.sort(reverse=True)
+
+        keep = max(self.min_keywords - len(untried), math.ceil(self.keep_fraction * len(scored)))
+        planned = [keyword for _, keyword in scored[:keep]]
+
+        skipped = len(scored) - len(planned)
+        if skipped:
+            logger.debug(f"{marketplace}: skipping {skipped} low-yield keywords this cycle")
+
+        return planned + untried
+
+    def get_report(self, marketplace: Optional[str] = None) -> List[Dict]:
+        """Per-keyword yield, best viable rate first"""
+
+        report = []
+
+        for (entry_marketplace, keyword), entry in self.stats.items():
+            if marketplace and entry_marketplace != marketplace:
+                continue
+
+            queries = entry['queries']
+            report.append({
+                'marketplace': entry_marketplace,
+                'keyword': keyword,
+                **{counter: round(entry[counter], 2) for counter in COUNTERS},
+                'viable_rate': entry['viable'] / queries if queries else 0.0
+            })
+
+        return sorted(report, key=lambda row: -row['viable_rate'])
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+def create_keyword_yield_tracker(config: Dict) -> Optional[KeywordYieldTracker]:
+    """Build the keyword planner, or None when it is disabled"""
+
+    if not config.get('keyword_planner', {}).get('enabled', False):
+        return None
+
+    return KeywordYieldTracker(config)
@@ -5,24 +5,63 @@ Monitors marketplaces for arbitrage opportunities
 
 import os
 import asyncio
+import threading
+from contextvars import ContextVar
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Optional
 from abc import ABC, abstractmethod
-import httpx
 from bs4 import BeautifulSoup
 from loguru import logger
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from infrastructure.api_budget import APIBudgetManager, BudgetExceeded
+from infrastructure.http_pool import HTTPClientPool
+from infrastructure.keepa_batcher import KeepaBatcher
+from infrastructure.price_cache import PriceCache, create_price_cache
+from infrastructure.single_flight import SingleFlight
+from infrastructure.rate_limiter import RateLimiter
+from monitoring.browser_pool import BrowserPool
+from monitoring.catalog_index import CatalogIndex, create_catalog_index
+from monitoring.category_keywords import CategoryKeywords
+from monitoring.html_parsers import get_parser
+from monitoring.keyword_yield import create_keyword_yield_tracker
+from monitoring.parse_pool import ParsePool
+from monitoring.watermarks import WatermarkStore, create_watermark_store
+from utils.fees import FeeEngine
+from utils.identifiers import extract_identifier, identifier_type
+
+
+# Set per marketplace scan by MarketScanner.stream_categories; each query's
+# listings are handed to it as soon as that query finishes
+result_sink: ContextVar[Optional[Callable[[List[Dict]], None]]] = ContextVar('result_sink', default=None)
+
+# Marks the end of one category in the streaming queue
+_CATEGORY_DONE = object()
+
 
 class MarketplaceScanner(ABC):
     """Base class for marketplace scanners"""
     
-    def __init__(self, config: Dict):
+    # Key under `marketplaces` in settings.yaml, used for rate limits
+    marketplace = ''
+    
+    def __init__(self,
+                 config: Dict,
+                 http_pool: Optional[HTTPClientPool] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 watermarks: Optional[WatermarkStore] = None,
+                 parse_pool: Optional[ParsePool] = None):
         self.config = config
         self.name = self.__class__.__name__
+        self.http_pool = http_pool or HTTPClientPool(config)
+        self.rate_limiter = rate_limiter or RateLimiter(config)
+        self.parser = get_parser(config)
+        # None disables incremental scanning
+        self.watermarks = watermarks
+        # None parses inline on the event loop
+        self.parse_pool = parse_pool
         
     @abstractmethod
     async def scan(self, category: str, keywords: List[str]) -> List[Dict]:
@@ -36,182 +75,278 @@ class MarketplaceScanner(ABC):
             if item.get('price', float('inf')) <= max_price:
                 filtered.append(item)
         return filtered
+    
+    def only_new(self, results: List[Dict]) -> List[Dict]:
+        """Drop listings already sent downstream at the same price"""
+        
+        if self.watermarks is None:
+            return results
+        
+        return self.watermarks.filter_new(self.marketplace, results)
+    
+    def shard_locations(self) -> List[Optional[str]]:
+        """Locations a scan can be split into for distributed scanning; [None] when not location-based"""
+        return [None]
+    
+    async def close(self):
+        """Release scanner-specific resources"""
+        pass
+    
+    async def _gather_queries(self, queries: List) -> List[Dict]:
+        """Run query coroutines concurrently and flatten their results"""
+        
+        sink = result_sink.get()
+        
+        async def run(query):
+            query_results = await query
+            if sink is not None and query_results:
+                sink(query_results)
+            return query_results
+        
+        results = []
+        
+        for query_results in await asyncio.gather(*[run(query) for query in queries]):
+            results.extend(query_results)
+        
+        return results
 
 
 class FacebookMarketplaceScanner(MarketplaceScanner):
     """Scanner for Facebook Marketplace"""
     
+    marketplace = 'facebook_marketplace'
+    
+    PRODUCT_CARD = "[data-testid='marketplace-product-card']"
+    
+    def __init__(self,
+                 config: Dict,
+                 http_pool: Optional[HTTPClientPool] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 watermarks: Optional[WatermarkStore] = None,
+                 parse_pool: Optional[ParsePool] = None,
+                 browser_pool: Optional[BrowserPool] = None):
+        super().__init__(config, http_pool, rate_limiter, watermarks, parse_pool)
+        self.browser_pool = browser_pool or BrowserPool(config)
+    
     async def scan(self, category: str, keywords: List[str]) -> List[Dict]:
         """Scan Facebook Marketplace"""
         logger.info(f"Scanning Facebook Marketplace for {category}")
         
-        results = []
-        
         # Note: Facebook requires authentication and has anti-scraping measures
         # This is a simplified implementation
         
-        for keyword in keywords:
-            try:
-                # Use selenium for dynamic content
-                options = webdriver.ChromeOptions()
-                options.add_argument('--headless')
-                options.add_argument('--no-sandbox')
-                options.add_argument('--disable-dev-shm-usage')
-                
-                driver = webdriver.Chrome(options=options)
+        results = await self._gather_queries([
+            self._scan_query(category, keyword) for keyword in keywords
+        ])
                 
-                # Construct search URL
-                base_url = "https://www.facebook.com/marketplace"
-                location = self.config.get('location', {}).get('zipcode', '02101')
-                search_url = f"{base_url}/category/search/?query={keyword}&exact=false"
-                
-                driver.get(search_url)
-                await asyncio.sleep(3)  # Wait for dynamic content
+        logger.info(f"Found {len(results)} items on Facebook Marketplace")
+        return results
+    
+    async def close(self):
+        """Quit pooled browser sessions"""
+        await self.browser_pool.close()
+    
+    async def _scan_query(self, category: str, keyword: str) -> List[Dict]:
+        """Run one keyword search on a leased browser session"""
+        
+        try:
+            async with self.rate_limiter.limit(self.marketplace):
+                results = await self.browser_pool.run(self._scrape_keyword, category, keyword)
+            
+            return self.only_new(results)
                 
-                # Parse listings
-                # Note: Facebook's structure changes frequently
-                listings = driver.find_elements(By.CSS_SELECTOR, "[data-testid='marketplace-product-card']")
+        except Exception as e:
+            logger.error(f"Facebook scan error for '{keyword}': {e}")
+            return []
+    
+    def _scrape_keyword(self, driver, category: str, keyword: str) -> List[Dict]:
+        """Load and parse one search page (runs on a browser worker thread)"""
+        
+        results = []
+        
+        # Construct search URL
+        base_url = "https://www.facebook.com/marketplace"
+        location = self.config.get('location', {}).get('zipcode', '02101')
+        search_url = f"{base_url}/category/search/?query={keyword}&exact=false"
+        
+        driver.get(search_url)
+        
+        # Wait for dynamic content
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, self.PRODUCT_CARD))
+        )
+        
+        # Parse listings
+        # Note: Facebook's structure changes frequently
+        listings = driver.find_elements(By.CSS_SELECTOR, self.PRODUCT_CARD)
+        
+        for listing in listings[:20]:  # Limit to first 20
+            try:
+                title_elem = listing.find_element(By.CSS_SELECTOR, "span")
+                price_elem = listing.find_element(By.CSS_SELECTOR, "[class*='price']")
                 
-                for listing in listings[:20]:  # Limit to first 20
-                    try:
-                        title_elem = listing.find_element(By.CSS_SELECTOR, "span")
-                        price_elem = listing.find_element(By.CSS_SELECTOR, "[class*='price']")
-                        
-                        title = title_elem.text
-                        price_text = price_elem.text.replace('$', '').replace(',', '')
-                        price = float(price_text) if price_text else 0
-                        
-                        results.append({
-                            'marketplace': 'facebook_marketplace',
-                            'title': title,
-                            'price': price,
-                            'url': listing.get_attribute('href'),
-                            'category': category,
-                            'discovered_at': datetime.utcnow().isoformat()
-                        })
-                        
-                    except Exception as e:
-                        logger.debug(f"Error parsing listing: {e}")
-                        continue
+                title = title_elem.text
+                price_text = price_elem.text.replace('$', '').replace(',', '')
+                price = float(price_text) if price_text else 0
                 
-                driver.quit()
+                results.append({
+                    'marketplace': 'facebook_marketplace',
+                    'title': title,
+                    'price': price,
+                    'url': listing.get_attribute('href'),
+                    'category': category,
+                    'search_keyword': keyword,
+                    'discovered_at': datetime.utcnow().isoformat()
+                })
                 
             except Exception as e:
-                logger.error(f"Facebook scan error for '{keyword}': {e}")
-                
-        logger.info(f"Found {len(results)} items on Facebook Marketplace")
+                logger.debug(f"Error parsing listing: {e}")
+                continue
+        
         return results
 
 
 class CraigslistScanner(MarketplaceScanner):
     """Scanner for Craigslist"""
     
-    async def scan(self, category: str, keywords: List[str]) -> List[Dict]:
-        """Scan Craigslist"""
+    marketplace = 'craigslist'
+    
+    async def scan(self, category: str, keywords: List[str], locations: Optional[List[str]] = None) -> List[Dict]:
+        """Scan Craigslist, in every configured location unless `locations` is given"""
         logger.info(f"Scanning Craigslist for {category}")
         
-        results = []
-        locations = self.config.get('craigslist_locations', ['boston', 'worcester'])
-        
-        async with httpx.AsyncClient() as client:
-            for location in locations:
-                for keyword in keywords:
-                    try:
-                        # Construct search URL
-                        url = f"https://{location}.craigslist.org/search/sss"
-                        params = {
-                            'query': keyword,
-                            'sort': 'date',
-                            'hasPic': 1
-                        }
-                        
-                        response = await client.get(url, params=params, timeout=30)
-                        soup = BeautifulSoup(response.text, 'html.parser')
-                        
-                        # Parse results
-                        listings = soup.select('.result-row')
-                        
-                        for listing in listings[:30]:
-                            try:
-                                title_elem = listing.select_one('.result-title')
-                                price_elem = listing.select_one('.result-price')
-                                
-                                if not title_elem or not price_elem:
-                                    continue
-                                
-                                title = title_elem.text.strip()
-                                price_text = price_elem.text.replace('$', '').replace(',', '')
-                                price = float(price_text)
-                                url = title_elem.get('href', '')
-                                
-                                # Get posting details
-                                location_elem = listing.select_one('.result-hood')
-                                location_text = location_elem.text.strip() if location_elem else ''
-                                
-                                results.append({
-                                    'marketplace': 'craigslist',
-                                    'title': title,
-                                    'price': price,
-                                    'url': url,
-                                    'location': f"{location} {location_text}",
-                                    'category': category,
-                                    'discovered_at': datetime.utcnow().isoformat()
-                                })
-                                
-                            except Exception as e:
-                                logger.debug(f"Error parsing Craigslist listing: {e}")
-                                continue
-                                
-                    except Exception as e:
-                        logger.error(f"Craigslist scan error for '{keyword}' in {location}: {e}")
-                    
-                    await asyncio.sleep(2)  # Rate limiting
+        locations = locations or self.shard_locations()
+        
+        # Fan out every location/keyword query; the rate limiter keeps us in budget
+        results = await self._gather_queries([
+            self._scan_query(category, keyword, location)
+            for location in locations
+            for keyword in keywords
+        ])
         
         logger.info(f"Found {len(results)} items on Craigslist")
         return results
+    
+    def shard_locations(self) -> List[Optional[str]]:
+        """Configured Craigslist sites"""
+        return self.config.get('craigslist_locations', ['boston', 'worcester'])
+    
+    async def _scan_query(self, category: str, keyword: str, location: str) -> List[Dict]:
+        """Run a single keyword search in one Craigslist location"""
+        
+        results = []
+        
+        try:
+            # Construct search URL
+            url = f"https://{location}.craigslist.org/search/sss"
+            params = {
+                'query': keyword,
+                'sort': 'date',
+                'hasPic': 1
+            }
+            
+            async with self.rate_limiter.limit(self.marketplace):
+                response = await self.http_pool.get(url, params=params)
+            
+            # Results are sorted newest first, so everything from the
+            # previous cycle's newest post onwards was already processed
+            watermark = None
+            if self.watermarks is not None:
+                watermark = self.watermarks.get_watermark(self.marketplace, keyword, location)
+            
+            if self.parse_pool is not None:
+                records = await self.parse_pool.parse_craigslist(
+                    response.content, category, limit=30, stop_at=watermark
+                )
+            else:
+                records = self.parser.parse_craigslist(response.content, limit=30, stop_at=watermark)
+            newest_id = records[0]['listing_id'] if records else None
+            
+            for record in records:
+                listing = {
+                    'marketplace': 'craigslist',
+                    'listing_id': record['listing_id'],
+                    'title': record['title'],
+                    'price': record['price'],
+                    'url': record['url'],
+                    'location': f"{location} {record['hood']}",
+                    'category': category,
+                    'search_keyword': keyword,
+                    'discovered_at': datetime.utcnow().isoformat()
+                }
+                
+                # Fields precomputed by the parse workers
+                for field in ('identifier', 'brand', 'model'):
+                    if field in record:
+                        listing[field] = record[field]
+                
+                results.append(listing)
+            
+            if self.watermarks is not None and newest_id:
+                self.watermarks.set_watermark(self.marketplace, keyword, location, newest_id)
+                    
+        except Exception as e:
+            logger.error(f"Craigslist scan error for '{keyword}' in {location}: {e}")
+        
+        return self.only_new(results)
 
 
 class OfferUpScanner(MarketplaceScanner):
     """Scanner for OfferUp"""
     
+    marketplace = 'offerup'
+    
     async def scan(self, category: str, keywords: List[str]) -> List[Dict]:
         """Scan OfferUp"""
         logger.info(f"Scanning OfferUp for {category}")
         
-        results = []
-        
         # OfferUp requires mobile app API or web scraping with authentication
         # This is a placeholder implementation
         
-        async with httpx.AsyncClient() as client:
-            for keyword in keywords:
-                try:
-                    url = "https://offerup.com/search/"
-                    params = {
-                        'q': keyword,
-                        'radius': 50
-                    }
-                    
-                    response = await client.get(url, params=params, timeout=30)
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Parse results (structure varies)
-                    # This is a simplified version
-                    
-                    logger.debug(f"OfferUp scan for '{keyword}' completed")
-                    
-                except Exception as e:
-                    logger.error(f"OfferUp scan error: {e}")
-                    
-                await asyncio.sleep(2)
+        results = await self._gather_queries([
+            self._scan_query(category, keyword) for keyword in keywords
+        ])
         
         logger.info(f"Found {len(results)} items on OfferUp")
         return results
+    
+    async def _scan_query(self, category: str, keyword: str) -> List[Dict]:
+        """Run a single OfferUp keyword search"""
+        
+        results = []
+        
+        try:
+            url = "https://offerup.com/search/"
+            params = {
+                'q': keyword,
+                'radius': 50
+            }
+            
+            async with self.rate_limiter.limit(self.marketplace):
+                response = await self.http_pool.get(url, params=params)
+            
+            soup = BeautifulSoup(response.text, 'html.parser')
+            
+            # Parse results (structure varies)
+            # This is a simplified version
+            
+            logger.debug(f"OfferUp scan for '{keyword}' completed")
+            
+        except Exception as e:
+            logger.error(f"OfferUp scan error: {e}")
+        
+        return results
 
 
 class EbayScanner(MarketplaceScanner):
     """Scanner for eBay (for sourcing deals)"""
     
+    marketplace = 'ebay'
+    
+    # An ebaysdk Connection keeps request and response state on itself, so
+    # concurrent queries each use their own worker thread's connection
+    _connections = threading.local()
+    
     async def scan(self, category: str, keywords: List[str]) -> List[Dict]:
         """Scan eBay for deals"""
         logger.info(f"Scanning eBay for {category}")
@@ -222,91 +357,128 @@ class EbayScanner(MarketplaceScanner):
         # This requires eBay API credentials
         
         try:
+            import ebaysdk.finding  # noqa: F401
+            
+            results = await self._gather_queries([
+                self._scan_query(category, keyword) for keyword in keywords
+            ])
+                
+        except ImportError:
+            logger.warning("eBay SDK not configured, skipping eBay scan")
+        except Exception as e:
+            logger.error(f"eBay scanner error: {e}")
+        
+        logger.info(f"Found {len(results)} items on eBay")
+        return results
+    
+    def _connection(self):
+        """This worker thread's Finding API connection"""
+        
+        api = getattr(self._connections, 'finding', None)
+        
+        if api is None:
             from ebaysdk.finding import Connection as Finding
             
             api = Finding(
                 appid=os.getenv('EBAY_APP_ID'),
                 config_file=None
             )
+            self._connections.finding = api
+        
+        return api
+    
+    def _find_items(self, keyword: str) -> List[Dict]:
+        """Blocking findItemsAdvanced call; the response is read before the connection is reused"""
+        
+        response = self._connection().execute('findItemsAdvanced', {
+            'keywords': keyword,
+            'sortOrder': 'EndTimeSoonest',
+            'itemFilter': [
+                {'name': 'ListingType', 'value': 'FixedPrice'},
+                {'name': 'Condition', 'value': 'Used'}
+            ]
+        })
+        
+        return response.dict().get('searchResult', {}).get('item', [])
+    
+    async def _scan_query(self, category: str, keyword: str) -> List[Dict]:
+        """Run a single eBay Finding API search"""
+        
+        results = []
+        
+        try:
+            # ebaysdk is synchronous, so run it off the event loop
+            async with self.rate_limiter.limit(self.marketplace):
+                items = await asyncio.to_thread(self._find_items, keyword)
             
-            for keyword in keywords:
-                try:
-                    response = api.execute('findItemsAdvanced', {
-                        'keywords': keyword,
-                        'sortOrder': 'EndTimeSoonest',
-                        'itemFilter': [
-                            {'name': 'ListingType', 'value': 'FixedPrice'},
-                            {'name': 'Condition', 'value': 'Used'}
-                        ]
-                    })
-                    
-                    items = response.dict().get('searchResult', {}).get('item', [])
-                    
-                    for item in items[:20]:
-                        price_data = item.get('sellingStatus', {}).get('currentPrice', {})
-                        price = float(price_data.get('value', 0))
-                        
-                        results.append({
-                            'marketplace': 'ebay',
-                            'title': item.get('title', ''),
-                            'price': price,
-                            'url': item.get('viewItemURL', ''),
-                            'item_id': item.get('itemId', ''),
-                            'condition': item.get('condition', {}).get('conditionDisplayName', 'Used'),
-                            'category': category,
-                            'discovered_at': datetime.utcnow().isoformat()
-                        })
-                        
-                except Exception as e:
-                    logger.error(f"eBay API error for '{keyword}': {e}")
-                    
-                await asyncio.sleep(1)
+            for item in items[:20]:
+                price_data = item.get('sellingStatus', {}).get('currentPrice', {})
+                price = float(price_data.get('value', 0))
+                
+                results.append({
+                    'marketplace': 'ebay',
+                    'listing_id': item.get('itemId', ''),
+                    'title': item.get('title', ''),
+                    'price': price,
+                    'url': item.get('viewItemURL', ''),
+                    'item_id': item.get('itemId', ''),
+                    'condition': item.get('condition', {}).get('conditionDisplayName', 'Used'),
+                    'category': category,
+                    'search_keyword': keyword,
+                    'discovered_at': datetime.utcnow().isoformat()
+                })
                 
-        except ImportError:
-            logger.warning("eBay SDK not configured, skipping eBay scan")
         except Exception as e:
-            logger.error(f"eBay scanner error: {e}")
+            logger.error(f"eBay API error for '{keyword}': {e}")
         
-        logger.info(f"Found {len(results)} items on eBay")
-        return results
+        return self.only_new(results)
 
 
 class MercariScanner(MarketplaceScanner):
     """Scanner for Mercari"""
     
+    marketplace = 'mercari'
+    
     async def scan(self, category: str, keywords: List[str]) -> List[Dict]:
         """Scan Mercari"""
         logger.info(f"Scanning Mercari for {category}")
         
+        results = await self._gather_queries([
+            self._scan_query(category, keyword) for keyword in keywords
+        ])
+        
+        logger.info(f"Found {len(results)} items on Mercari")
+        return results
+    
+    async def _scan_query(self, category: str, keyword: str) -> List[Dict]:
+        """Run a single Mercari keyword search"""
+        
         results = []
         
-        async with httpx.AsyncClient() as client:
-            for keyword in keywords:
-                try:
-                    url = "https://www.mercari.com/search/"
-                    params = {
-                        'keyword': keyword,
-                        'status': 'on_sale'
-                    }
-                    
-                    headers = {
-                        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-                    }
-                    
-                    response = await client.get(url, params=params, headers=headers, timeout=30)
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Mercari uses React, may need API endpoint or Selenium
-                    # This is a placeholder
-                    
-                    logger.debug(f"Mercari scan for '{keyword}' completed")
-                    
-                except Exception as e:
-                    logger.error(f"Mercari scan error: {e}")
-                    
-                await asyncio.sleep(2)
+        try:
+            url = "https://www.mercari.com/search/"
+            params = {
+                'keyword': keyword,
+                'status': 'on_sale'
+            }
+            
+            headers = {
+                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+            }
+            
+            async with self.rate_limiter.limit(self.marketplace):
+                response = await self.http_pool.get(url, params=params, headers=headers)
+            
+            soup = BeautifulSoup(response.text, 'html.parser')
+            
+            # Mercari uses React, may need API endpoint or Selenium
+            # This is a placeholder
+            
+            logger.debug(f"Mercari scan for '{keyword}' completed")
+            
+        except Exception as e:
+            logger.error(f"Mercari scan error: {e}")
         
-        logger.info(f"Found {len(results)} items on Mercari")
         return results
 
 
@@ -317,6 +489,11 @@ class MarketScanner:
     
     def __init__(self, config: Dict):
         self.config = config
+        self.http_pool = HTTPClientPool(config)
+        self.rate_limiter = RateLimiter(config)
+        self.watermarks = create_watermark_store(config)
+        self.parse_pool = ParsePool(config)
+        self.keyword_planner = create_keyword_yield_tracker(config)
         self.scanners = self._initialize_scanners()
         
     def _initialize_scanners(self) -> Dict[str, MarketplaceScanner]:
@@ -325,20 +502,23 @@ class MarketScanner:
         
         marketplace_config = self.config.get('marketplaces', {})
         
+        # Shared connection pool, rate limits, watermarks and parse workers
+        shared = (self.config, self.http_pool, self.rate_limiter, self.watermarks, self.parse_pool)
+        
         if marketplace_config.get('facebook_marketplace', {}).get('enabled'):
-            scanners['facebook'] = FacebookMarketplaceScanner(self.config)
+            scanners['facebook'] = FacebookMarketplaceScanner(*shared)
             
         if marketplace_config.get('craigslist', {}).get('enabled'):
-            scanners['craigslist'] = CraigslistScanner(self.config)
+            scanners['craigslist'] = CraigslistScanner(*shared)
             
         if marketplace_config.get('offerup', {}).get('enabled'):
-            scanners['offerup'] = OfferUpScanner(self.config)
+            scanners['offerup'] = OfferUpScanner(*shared)
             
         if marketplace_config.get('ebay', {}).get('enabled'):
-            scanners['ebay'] = EbayScanner(self.config)
+            scanners['ebay'] = EbayScanner(*shared)
             
         if marketplace_config.get('mercari', {}).get('enabled'):
-            scanners['mercari'] = MercariScanner(self.config)
+            scanners['mercari'] = MercariScanner(*shared)
         
         logger.info(f"Initialized {len(scanners)} marketplace scanners")
         return scanners
@@ -349,36 +529,183 @@ class MarketScanner:
         
         categories = self.config.get('categories', {})
         
-        for category_name, category_config in categories.items():
-            if not category_config.get('enabled', False):
-                continue
-                
-            keywords = self._get_category_keywords(category_name)
-            max_price = category_config.get('max_purchase_price', 500)
-            
-            logger.info(f"Scanning category: {category_name}")
+        # Every category/marketplace/keyword query is issued at once;
+        # the shared rate limiter keeps each site within its budget
+        tasks = [
+            self.scan_category(category_name, category_config)
+            for category_name, category_config in categories.items()
+            if category_config.get('enabled', False)
+        ]
+        
+        for results in await asyncio.gather(*tasks):
+            all_results.extend(results)
+        
+        logger.info(f"Total opportunities found: {len(all_results)}")
+        return all_results
+    
+    async def stream_categories(self,
+                                categories: Dict[str, Dict],
+                                on_category_done: Optional[Callable[[str, Optional[BaseException]], None]] = None
+                                ) -> AsyncIterator[Dict]:
+        """
+        Yield listings as soon as each marketplace query returns
+        
+        Categories are scanned concurrently, and listings (already price
+        filtered) are yielded query by query instead of after the slowest
+        marketplace finishes. `on_category_done(name, error)` is called as
+        each category completes. Closing the generator early cancels the
+        scans still running; their categories are not reported as done.
+        """
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def run_category(name: str, category_config: Dict):
+            error = None
             
-            # Scan each marketplace
-            tasks = []
-            for scanner_name, scanner in self.scanners.items():
-                task = scanner.scan(category_name, keywords)
-                tasks.append(task)
+            try:
+                await self.scan_category(name, category_config, sink=queue.put_nowait)
+            except Exception as e:
+                error = e
             
-            # Run scans concurrently
-            results_per_marketplace = await asyncio.gather(*tasks, return_exceptions=True)
+            if on_category_done is not None:
+                on_category_done(name, error)
             
-            # Combine results
-            for results in results_per_marketplace:
-                if isinstance(results, Exception):
-                    logger.error(f"Scanner failed: {results}")
+            queue.put_nowait(_CATEGORY_DONE)
+        
+        tasks = [
+            asyncio.create_task(run_category(name, category_config))
+            for name, category_config in categories.items()
+        ]
+        remaining = len(tasks)
+        
+        try:
+            while remaining:
+                batch = await queue.get()
+                
+                if batch is _CATEGORY_DONE:
+                    remaining -= 1
                     continue
-                    
-                # Filter by price
-                filtered = scanner.filter_results(results, max_price)
-                all_results.extend(filtered)
+                
+                for listing in batch:
+                    yield listing
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def scan_category(self,
+                            category_name: str,
+                            category_config: Dict,
+                            sink: Optional[Callable[[List[Dict]], None]] = None) -> List[Dict]:
+        """Scan one category across all marketplaces, optionally streaming listings to `sink`"""
+        category_results = []
+        
+        keywords = self._get_category_keywords(category_name)
+        max_price = category_config.get('max_purchase_price', 500)
+        
+        logger.info(f"Scanning category: {category_name}")
+        
+        # Scan each marketplace
+        tasks = []
+        for scanner_name, scanner in self.scanners.items():
+            task = self._scan_marketplace(scanner, category_name, keywords, max_price, sink)
+            tasks.append(task)
+        
+        # Run scans concurrently
+        results_per_marketplace = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # Combine results
+        for scanner, results in zip(self.scanners.values(), results_per_marketplace):
+            if isinstance(results, Exception):
+                logger.error(f"Scanner failed: {results}")
+                continue
+                
+            # Filter by price and category exclusion terms
+            filtered = self._filter_listings(scanner, results, category_name, max_price)
+            category_results.extend(filtered)
         
-        logger.info(f"Total opportunities found: {len(all_results)}")
-        return all_results
+        return category_results
+    
+    async def _scan_marketplace(self,
+                                scanner: MarketplaceScanner,
+                                category_name: str,
+                                keywords: List[str],
+                                max_price: float,
+                                sink: Optional[Callable[[List[Dict]], None]],
+                                location: Optional[str] = None) -> List[Dict]:
+        """Run one scanner, streaming each query's price-filtered listings to `sink`"""
+        
+        # Skip keywords that have stopped producing deals on this marketplace
+        if self.keyword_planner is not None:
+            keywords = self.keyword_planner.plan(scanner.marketplace, keywords)
+        
+        # gather() runs this in its own task, so the sink is scoped to this scan
+        if sink is not None:
+            result_sink.set(lambda listings: sink(
+                self._filter_listings(scanner, listings, category_name, max_price)
+            ))
+        
+        # Location-sharded scans only cover their own location
+        scan_kwargs = {'locations': [location]} if location else {}
+        
+        results = await scanner.scan(category_name, keywords, **scan_kwargs)
+        
+        if self.keyword_planner is not None:
+            self.keyword_planner.record_scan(scanner.marketplace, keywords, results)
+        
+        return results
+    
+    def get_scanner(self, marketplace: str) -> Optional[MarketplaceScanner]:
+        """The enabled scanner for a `marketplaces` config key"""
+        
+        for scanner in self.scanners.values():
+            if scanner.marketplace == marketplace:
+                return scanner
+        
+        return None
+    
+    def shards(self, category_names: List[str]) -> List[Dict]:
+        """Split a scan of these categories into (marketplace, category, location) units"""
+        
+        return [
+            {'marketplace': scanner.marketplace, 'category': category_name, 'location': location}
+            for category_name in category_names
+            for scanner in self.scanners.values()
+            for location in scanner.shard_locations()
+        ]
+    
+    async def scan_shard(self,
+                         marketplace: str,
+                         category_name: str,
+                         location: Optional[str] = None) -> List[Dict]:
+        """Scan one (marketplace, category, location) shard, price and exclusion filtered"""
+        
+        scanner = self.get_scanner(marketplace)
+        if scanner is None:
+            logger.warning(f"Scanner for {marketplace} is not enabled on this node")
+            return []
+        
+        category_config = self.config.get('categories', {}).get(category_name, {})
+        keywords = self._get_category_keywords(category_name)
+        max_price = category_config.get('max_purchase_price', 500)
+        
+        results = await self._scan_marketplace(scanner, category_name, keywords, max_price, None, location)
+        
+        return self._filter_listings(scanner, results, category_name, max_price)
+    
+    def _filter_listings(self,
+                         scanner: MarketplaceScanner,
+                         listings: List[Dict],
+                         category_name: str,
+                         max_price: float) -> List[Dict]:
+        """Drop listings over the category's max price or matching its exclusion terms"""
+        
+        filtered = scanner.filter_results(listings, max_price)
+        
+        return [
+            listing for listing in filtered
+            if not CategoryKeywords.should_exclude(listing.get('title', ''), category_name)
+        ]
     
     def _get_category_keywords(self, category: str) -> List[str]:
         """Get search keywords for a category"""
@@ -427,6 +754,34 @@ class MarketScanner:
         }
         
         return keyword_map.get(category, [category])
+    
+    def get_http_stats(self) -> Dict[str, Dict]:
+        """Per-host connection pool statistics"""
+        return self.http_pool.get_stats()
+    
+    def get_rate_limit_stats(self) -> Dict[str, Dict]:
+        """Per-marketplace throttling statistics"""
+        return self.rate_limiter.get_stats()
+    
+    def get_parse_stats(self) -> Dict:
+        """Parse worker pool statistics"""
+        return self.parse_pool.get_stats()
+    
+    async def close(self):
+        """Release pooled connections, browser sessions and parse workers"""
+        
+        for scanner in self.scanners.values():
+            await scanner.close()
+        
+        await self.parse_pool.close()
+        
+        if self.watermarks is not None:
+            self.watermarks.close()
+        
+        if self.keyword_planner is not None:
+            self.keyword_planner.close()
+        
+        await self.http_pool.close()
 
 
 class PriceValidator:
@@ -434,9 +789,28 @@ class PriceValidator:
     Validates pricing using APIs like Keepa, CamelCamelCamel, etc.
     """
     
-    def __init__(self, config: Dict):
+    def __init__(self,
+                 config: Dict,
+                 http_pool: Optional[HTTPClientPool] = None,
+                 keepa: Optional[KeepaBatcher] = None,
+                 single_flight: Optional[SingleFlight] = None,
+                 price_cache: Optional[PriceCache] = None,
+                 catalog: Optional[CatalogIndex] = None,
+                 budget: Optional[APIBudgetManager] = None):
         self.config = config
         self.keepa_key = os.getenv('KEEPA_API_KEY')
+        self.bookscouter_key = os.getenv('BOOKSCOUTER_API_KEY')
+        self.http_pool = http_pool or HTTPClientPool(config)
+        # Concurrent ASIN lookups share batched queries on one Keepa client
+        self.keepa = keepa or KeepaBatcher(config, api_key=self.keepa_key)
+        # The same ISBN/ASIN seen on several marketplaces at once is looked up once
+        self.single_flight = single_flight or SingleFlight()
+        # Recent prices (and identifiers with no price) skip the API entirely
+        self.price_cache = price_cache or create_price_cache(config)
+        self.fee_engine = FeeEngine(config)
+        self.catalog = catalog or create_catalog_index(config)
+        # Paid lookups wait for quota, most promising listings first
+        self.budget = budget or APIBudgetManager(config)
         
     async def get_amazon_price(self, asin: str) -> Optional[Dict]:
         """Get current Amazon price and history using Keepa"""
@@ -446,16 +820,9 @@ class PriceValidator:
             return None
         
         try:
-            import keepa
+            product = await self.keepa.get_product(asin)
             
-            api = keepa.Keepa(self.keepa_key)
-            
-            # Request product info
-            products = api.query(asin)
-            
-            if products and len(products) > 0:
-                product = products[0]
-                
+            if product:
                 # Extract pricing data
                 current_price = product.get('stats', {}).get('current', [None, None, None])[0]
                 avg_30day = product.get('stats', {}).get('avg30', [None, None, None])[0]
@@ -477,44 +844,48 @@ class PriceValidator:
                 }
                 
         except Exception as e:
+            # Raised rather than returned as None so the failure is not cached as "no price"
             logger.error(f"Keepa API error for ASIN {asin}: {e}")
+            raise
         
         return None
     
     async def get_book_prices(self, isbn: str) -> Optional[Dict]:
         """Get book buyback prices from BookScouter"""
         
-        api_key = os.getenv('BOOKSCOUTER_API_KEY')
+        api_key = self.bookscouter_key
         if not api_key:
             logger.warning("BookScouter API key not configured")
             return None
         
         try:
-            async with httpx.AsyncClient() as client:
-                url = f"https://bookscouter.com/api/v3/prices"
-                params = {
-                    'api_key': api_key,
-                    'isbn': isbn
-                }
+            url = f"https://bookscouter.com/api/v3/prices"
+            params = {
+                'api_key': api_key,
+                'isbn': isbn
+            }
+            
+            response = await self.http_pool.get(url, params=params, timeout=15)
+            # Throttling and server errors raise, so they are not cached as "no price"
+            response.raise_for_status()
+            data = response.json()
                 
-                response = await client.get(url, params=params, timeout=15)
-                data = response.json()
+            # Get highest buyback price
+            prices = data.get('prices', [])
+            if prices:
+                highest = max(prices, key=lambda x: x.get('price', 0))
+                
+                return {
+                    'isbn': isbn,
+                    'highest_buyback': highest.get('price'),
+                    'vendor': highest.get('vendor_name'),
+                    'total_vendors': len(prices),
+                    'source': 'bookscouter'
+                }
                 
-                # Get highest buyback price
-                prices = data.get('prices', [])
-                if prices:
-                    highest = max(prices, key=lambda x: x.get('price', 0))
-                    
-                    return {
-                        'isbn': isbn,
-                        'highest_buyback': highest.get('price'),
-                        'vendor': highest.get('vendor_name'),
-                        'total_vendors': len(prices),
-                        'source': 'bookscouter'
-                    }
-                    
         except Exception as e:
             logger.error(f"BookScouter API error for ISBN {isbn}: {e}")
+            raise
         
         return None
     
@@ -528,20 +899,31 @@ class PriceValidator:
         # Extract product identifier
         identifier = self._extract_identifier(source_listing, category)
         
-        if not identifier:
+        # Books need an ISBN; anything else can still resolve to an ASIN by title
+        if not identifier and category == 'books':
             logger.debug("Could not extract product identifier")
             return None
         
+        priority = self.budget.priority_for(source_listing.get('price', 0), category)
+        
         # Get pricing data based on category
-        if category == 'books':
-            price_data = await self.get_book_prices(identifier)
-        else:
-            # Try to find ASIN for Amazon
-            asin = await self._find_asin(source_listing['title'], category)
-            if asin:
-                price_data = await self.get_amazon_price(asin)
+        try:
+            if category == 'books':
+                price_data = await self._lookup_price('bookscouter', identifier, category, self.get_book_prices, priority)
             else:
-                price_data = None
+                # Sourcing tools already matched the ASIN; marketplace listings are resolved by title
+                asin = source_listing.get('asin') or await self._find_asin(
+                    source_listing['title'], category, identifier=identifier
+                )
+                if asin:
+                    price_data = await self._lookup_price('keepa', asin, category, self.get_amazon_price, priority)
+                else:
+                    price_data = None
+        except BudgetExceeded as e:
+            logger.debug(f"Skipped price lookup: {e}")
+            return None
+        except Exception:
+            return None
         
         if not price_data:
             return None
@@ -549,34 +931,59 @@ class PriceValidator:
         # Calculate profitability
         return self._calculate_profitability(source_listing, price_data, category)
     
+    async def _lookup_price(self,
+                            source: str,
+                            identifier: str,
+                            category: str,
+                            lookup: Callable[[str], Awaitable[Optional[Dict]]],
+                            priority: float = 0.0) -> Optional[Dict]:
+        """Price data from the cache, or from one shared, budgeted call to `lookup`"""
+        
+        # Without a key there is nothing to look up, and nothing worth caching as "no price"
+        if not self._configured(source):
+            logger.debug(f"{source} API key not configured; skipping price lookup")
+            return None
+        
+        key = (source, identifier)
+        
+        def fetch():
+            return self.single_flight.do(key, self.budget.call, source, priority, lookup, identifier)
+        
+        if self.price_cache is None:
+            return await fetch()
+        
+        return await self.price_cache.get(source, identifier, category, fetch)
+    
+    def _configured(self, source: str) -> bool:
+        """Whether the API behind a price source has a key"""
+        
+        keys = {'keepa': self.keepa_key, 'bookscouter': self.bookscouter_key}
+        
+        return bool(keys.get(source, True))
+    
     def _extract_identifier(self, listing: Dict, category: str) -> Optional[str]:
         """Extract product identifier (ISBN, UPC, etc.) from listing"""
         
-        title = listing.get('title', '').lower()
-        description = listing.get('description', '').lower()
-        
-        # ISBN extraction for books
-        if category == 'books':
-            import re
-            isbn_pattern = r'(?:ISBN[-]?(?:13|10)?[:]?[\s]?)?((?:97[89][-]?)?[0-9]{9}[0-9Xx])'
-            match = re.search(isbn_pattern, title + ' ' + description)
-            if match:
-                return match.group(1).replace('-', '')
+        # Listings parsed in the worker pool arrive with the identifier already extracted
+        if 'identifier' in listing:
+            return listing['identifier']
         
-        # UPC extraction
-        upc_pattern = r'\b[0-9]{12}\b'
-        import re
-        match = re.search(upc_pattern, title + ' ' + description)
-        if match:
-            return match.group(0)
+        title = listing.get('title', '')
+        description = listing.get('description', '')
         
-        return None
+        return extract_identifier(title + ' ' + description, category)
     
-    async def _find_asin(self, product_title: str, category: str) -> Optional[str]:
-        """Find Amazon ASIN for a product"""
-        # This would use Amazon Product Advertising API or scraping
-        # Placeholder implementation
-        return None
+    async def _find_asin(self, product_title: str, category: str, identifier: Optional[str] = None) -> Optional[str]:
+        """Find Amazon ASIN for a product in the local catalog"""
+        
+        if self.catalog is None:
+            return None
+        
+        # Only titles that resolve confidently go on to a paid price lookup
+        field = identifier_type(identifier, category) if identifier else 'upc'
+        product = self.catalog.resolve(product_title, category, identifier=identifier, field=field)
+        
+        return product.get('asin') if product else None
     
     def _calculate_profitability(self, 
                                 source: Dict,
@@ -587,30 +994,16 @@ class PriceValidator:
         source_price = source.get('price', 0)
         target_price = price_data.get('current_price') or price_data.get('highest_buyback', 0)
         
-        # Estimate fees (simplified)
-        if category == 'books':
-            # Amazon FBA fees for books
-            fees = 1.80 + (target_price * 0.15)  # Referral fee
-        else:
-            # General Amazon fees
-            fees = target_price * 0.15  # 15% referral
-            fees += 3.00  # FBA fulfillment estimate
-        
-        shipping_estimate = 5.00  # Estimate
-        
-        total_costs = source_price + fees + shipping_estimate
-        profit = target_price - total_costs
-        margin = profit / target_price if target_price > 0 else 0
-        roi = profit / source_price if source_price > 0 else 0
+        result = self.fee_engine.evaluate_one(source_price, target_price, category=category)
         
         return {
             'source_price': source_price,
             'target_price': target_price,
-            'estimated_fees': fees,
-            'estimated_shipping': shipping_estimate,
-            'estimated_profit': profit,
-            'profit_margin': margin,
-            'roi': roi,
-            'viable': margin >= 0.20 and profit >= 10  # Min $10 profit, 20% margin
+            'estimated_fees': result['fees'],
+            'estimated_shipping': result['shipping'],
+            'estimated_profit': result['profit'],
+            'profit_margin': result['margin'],
+            'roi': result['roi'],
+            'viable': result['viable']
         }
 
@@ -0,0 +1,159 @@
+"""
+Parse Worker Pool
+Runs HTML parsing and listing extraction in worker processes, off the event loop
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from monitoring.html_parsers import Markup, get_parser
+from utils.identifiers import extract_identifiers
+
+
+# Per-process state, built once by the pool initializer
+_parser = None
+_nlp = None
+
+
+def _init_worker(config: Dict, extract_product_info: bool):
+    """Warm a worker: build the parser (and NLP model) before the first page arrives"""
+
+    global _parser, _nlp
+
+    _parser = get_parser(config)
+
+    if extract_product_info:
+        try:
+            from infrastructure.nlp_processor import NLPProcessor
+            _nlp = NLPProcessor()
+        except ImportError:
+            _nlp = None
+
+
+def parse_craigslist_page(markup: Markup, category: str, limit: int = 30,
+                          stop_at: Optional[str] = None) -> List[Dict]:
+    """
+    Parse one Craigslist results page into compact listing records
+
+    Records carry the lookup identifier (ISBN/UPC) and, when NLP is
+    enabled, brand and model, so none of that work happens on the loop.
+    """
+
+    global _parser
+
+    if _parser is None:
+        _parser = get_parser({})
+
+    records = _parser.parse_craigslist(markup, limit=limit, stop_at=stop_at)
+
+    identifiers = extract_identifiers([record['title'] for record in records], category)
+
+    for record, identifier in zip(records, identifiers):
+        record['identifier'] = identifier
+
+        if _nlp is not None:
+            info = _nlp.extract_product_info(record['title'])
+            record['brand'] = info.get('brand')
+            record['model'] = info.get('model')
+
+    return records
+
+
+class ParsePool:
+    """
+    Process pool for CPU-bound page parsing
+
+    Scanners hand over raw response bytes and get compact records back.
+    Workers are started with an initializer that builds the parser once,
+    so per-page cost is only the parse itself. With `enabled: false` the
+    same functions run inline on the calling thread.
+    """
+
+    def __init__(self, config: Dict):
+        pool_config = config.get('parse_pool', {})
+
+        self.enabled = pool_config.get('enabled', True)
+        self.workers = pool_config.get('workers') or os.cpu_count() or 1
+        self.extract_product_info = pool_config.get('extract_product_info', False)
+        self.start_method = pool_config.get('start_method', 'spawn')
+        self.config = config
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        self.stats = {
+            'pages': 0,
+            'records': 0,
+            'parse_seconds': 0.0
+        }
+
+        if not self.enabled:
+            _init_worker(config, self.extract_product_info)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=_init_worker,
+                initargs=(self.config, self.extract_product_info)
+            )
+            logger.info(f"Started parse pool with {self.workers} workers")
+
+        return self._executor
+
+    async def warm_up(self):
+        """Start every worker now instead of on the first scan burst"""
+
+        if not self.enabled:
+            return
+
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+
+        await asyncio.gather(*[
+            loop.run_in_executor(executor, os.getpid) for _ in range(self.workers)
+        ])
+
+    async def parse_craigslist(self, markup: Markup, category: str, limit: int = 30,
+                               stop_at: Optional[str] = None) -> List[Dict]:
+        """Parse a Craigslist results page in a worker process"""
+
+        started = time.perf_counter()
+
+        if self.enabled:
+            loop = asyncio.get_running_loop()
+            records = await loop.run_in_executor(
+                self._get_executor(), parse_craigslist_page, markup, category, limit, stop_at
+            )
+        else:
+            records = parse_craigslist_page(markup, category, limit, stop_at)
+
+        self.stats['pages'] += 1
+        self.stats['records'] += len(records)
+        self.stats['parse_seconds'] += time.perf_counter() - started
+
+        return records
+
+    def get_stats(self) -> Dict:
+        """Pages and records parsed, and average time per page including transfer"""
+
+        pages = self.stats['pages']
+
+        return {
+            **self.stats,
+            'workers': self.workers if self.enabled else 0,
+            'avg_page_ms': self.stats['parse_seconds'] / pages * 1000 if pages else 0.0
+        }
+
+    async def close(self):
+        """Shut the worker processes down"""
+
+        if self._executor is not None:
+            await asyncio.to_thread(self._executor.shutdown, True, cancel_futures=True)
+            self._executor = None
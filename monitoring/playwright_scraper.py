@@ -3,29 +3,72 @@ Playwright Integration for Dynamic Content Scraping
 Handles modern SPAs (React/Vue) like Facebook Marketplace, OfferUp
 """
 
-from playwright.async_api import async_playwright, Page, Browser
-from typing import List, Dict
+from playwright.async_api import async_playwright, Page, Browser, BrowserContext, Route
+from contextlib import asynccontextmanager
+from typing import List, Dict, Optional, Tuple
 from loguru import logger
 import asyncio
 from datetime import datetime
 
 
+# Resource types that add bandwidth and render time but no listing data
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font'}
+
+# Third-party analytics and ad hosts that never carry listing data
+TRACKER_DOMAINS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+    'facebook.net/tr', 'connect.facebook.net', 'hotjar.com',
+    'segment.io', 'segment.com', 'newrelic.com', 'nr-data.net',
+    'branch.io', 'amplitude.com', 'mixpanel.com', 'sentry.io'
+)
+
+
 class PlaywrightScraper:
     """
     High-performance scraper for JavaScript-heavy sites
     Preferred over Selenium for modern automation
+    
+    Search scraping leases pages from a pool of warm browser contexts
+    that block images, fonts, media and trackers; `pool_size` is also
+    the number of keywords rendered in parallel tabs.
     """
     
-    def __init__(self, headless: bool = True):
+    def __init__(self,
+                 headless: bool = True,
+                 pool_size: int = 4,
+                 block_resources: bool = True):
         self.headless = headless
+        self.pool_size = pool_size
+        self.block_resources = block_resources
+        self.playwright = None
         self.browser: Browser = None
+        self._page_pool: Optional[asyncio.Queue] = None
+        # Parallel first leases must not each launch a browser
+        self._init_lock = asyncio.Lock()
+        self.stats = {
+            'pages_scraped': 0,
+            'requests_blocked': 0,
+            'contexts_created': 0
+        }
+    
+    @classmethod
+    def from_config(cls, config: Dict, headless: bool = True) -> 'PlaywrightScraper':
+        """Build a scraper from the `playwright` section of settings.yaml"""
+        
+        playwright_config = config.get('playwright', {})
+        
+        return cls(
+            headless=headless,
+            pool_size=playwright_config.get('pool_size', 4),
+            block_resources=playwright_config.get('block_resources', True)
+        )
     
     async def initialize(self):
         """Initialize Playwright browser"""
         
-        playwright = await async_playwright().start()
+        self.playwright = await async_playwright().start()
         
-        self.browser = await playwright.chromium.launch(
+        self.browser = await self.playwright.chromium.launch(
             headless=self.headless,
             args=[
                 '--disable-blink-features=AutomationControlled',
@@ -36,152 +79,253 @@ class PlaywrightScraper:
         
         logger.info("Playwright browser initialized")
     
-    async def scrape_facebook_marketplace(self,
-                                         keyword: str,
-                                         location: str,
-                                         max_results: int = 50) -> List[Dict]:
-        """
-        Scrape Facebook Marketplace with full JavaScript rendering
-        """
+    async def _ensure_browser(self):
+        """Launch the browser once, however many callers need it at the same time"""
         
-        if not self.browser:
-            await self.initialize()
+        if self.browser:
+            return
         
-        logger.info(f"Scraping Facebook Marketplace for '{keyword}' in {location}")
+        async with self._init_lock:
+            if not self.browser:
+                await self.initialize()
+    
+    async def _block_unneeded(self, route: Route):
+        """Abort requests for heavy resources and third-party trackers"""
+        
+        request = route.request
+        
+        if (request.resource_type in BLOCKED_RESOURCE_TYPES
+                or any(domain in request.url for domain in TRACKER_DOMAINS)):
+            self.stats['requests_blocked'] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    async def _new_pooled_page(self) -> Tuple[BrowserContext, Page]:
+        """Create a context/page pair for the pool"""
         
         context = await self.browser.new_context(
             viewport={'width': 1920, 'height': 1080},
             user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         )
         
+        if self.block_resources:
+            await context.route('**/*', self._block_unneeded)
+        
         page = await context.new_page()
+        self.stats['contexts_created'] += 1
+        
+        return context, page
+    
+    @asynccontextmanager
+    async def lease_page(self):
+        """
+        Lease a warm page from the pool
+        
+        Pages are returned to the pool after use; a page whose block raised
+        or that was closed is replaced with a fresh context so one broken tab
+        cannot leak state. Callers let scrape errors propagate out of the
+        block for that reason.
+        """
+        
+        await self._ensure_browser()
+        
+        if self._page_pool is None:
+            self._page_pool = asyncio.Queue()
+            for _ in range(self.pool_size):
+                self._page_pool.put_nowait(None)
+        
+        entry = await self._page_pool.get()
+        healthy = False
         
         try:
-            # Navigate to marketplace
-            # Note: This requires Facebook authentication in production
-            search_url = f"https://www.facebook.com/marketplace/category/search/?query={keyword}"
+            if entry is None:
+                entry = await self._new_pooled_page()
             
-            await page.goto(search_url, wait_until='networkidle')
+            yield entry[1]
+            healthy = True
             
-            # Wait for listings to load
-            await page.wait_for_selector('[data-testid="marketplace-product-card"]', timeout=10000)
-            
-            # Scroll to load more results
-            for _ in range(3):
-                await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                await asyncio.sleep(1)
-            
-            # Extract listings
-            listings = await page.query_selector_all('[data-testid="marketplace-product-card"]')
-            
-            results = []
-            
-            for listing in listings[:max_results]:
-                try:
-                    # Extract data
-                    title_elem = await listing.query_selector('span')
-                    price_elem = await listing.query_selector('[class*="price"]')
-                    link_elem = await listing.query_selector('a')
-                    
-                    title = await title_elem.inner_text() if title_elem else ''
-                    price_text = await price_elem.inner_text() if price_elem else '0'
-                    url = await link_elem.get_attribute('href') if link_elem else ''
-                    
-                    # Parse price
-                    price = self._parse_price(price_text)
-                    
-                    if title and price > 0:
-                        results.append({
-                            'marketplace': 'facebook_marketplace',
-                            'title': title,
-                            'price': price,
-                            'url': f"https://facebook.com{url}" if url.startswith('/') else url,
-                            'location': location,
-                            'discovered_at': datetime.utcnow().isoformat(),
-                            'scraped_with': 'playwright'
-                        })
-                
-                except Exception as e:
-                    logger.debug(f"Error parsing listing: {e}")
-                    continue
-            
-            logger.info(f"Found {len(results)} listings on Facebook Marketplace")
-            
-            return results
+        finally:
+            if entry is not None and (not healthy or entry[1].is_closed()):
+                await self._close_entry(entry)
+                entry = None
             
-        except Exception as e:
-            logger.error(f"Facebook scraping error: {e}")
-            return []
+            self._page_pool.put_nowait(entry)
+    
+    async def _close_entry(self, entry: Tuple[BrowserContext, Page]):
+        """Close a pooled context, ignoring errors from dead pages"""
         
-        finally:
+        context, page = entry
+        
+        try:
             await page.close()
             await context.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled context: {e}")
     
-    async def scrape_offerup(self, keyword: str, zipcode: str, max_results: int = 50) -> List[Dict]:
+    async def scrape_many(self,
+                          keywords: List[str],
+                          marketplace: str = 'facebook_marketplace',
+                          location: str = '',
+                          max_results: int = 50) -> List[Dict]:
         """
-        Scrape OfferUp with JavaScript rendering
+        Scrape several keywords in parallel tabs
+        
+        Concurrency is bounded by `pool_size`.
         """
         
-        if not self.browser:
-            await self.initialize()
+        if marketplace == 'offerup':
+            tasks = [self.scrape_offerup(keyword, location, max_results) for keyword in keywords]
+        else:
+            tasks = [self.scrape_facebook_marketplace(keyword, location, max_results) for keyword in keywords]
         
-        logger.info(f"Scraping OfferUp for '{keyword}'")
+        results = []
         
-        context = await self.browser.new_context()
-        page = await context.new_page()
+        for keyword_results in await asyncio.gather(*tasks):
+            results.extend(keyword_results)
+        
+        return results
+    
+    async def scrape_facebook_marketplace(self,
+                                         keyword: str,
+                                         location: str,
+                                         max_results: int = 50) -> List[Dict]:
+        """
+        Scrape Facebook Marketplace with full JavaScript rendering
+        """
+        
+        logger.info(f"Scraping Facebook Marketplace for '{keyword}' in {location}")
         
         try:
-            # OfferUp search URL
-            url = f"https://offerup.com/search/?q={keyword}"
-            
-            await page.goto(url, wait_until='networkidle')
-            
-            # Wait for results
-            await page.wait_for_selector('[data-testid="listing-card"]', timeout=10000)
-            
-            # Scroll to load more
-            for _ in range(3):
-                await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                await asyncio.sleep(1)
-            
-            # Extract listings
-            listings = await page.query_selector_all('[data-testid="listing-card"]')
-            
-            results = []
-            
-            for listing in listings[:max_results]:
-                try:
-                    title = await listing.query_selector_text('h3')
-                    price_text = await listing.query_selector_text('[data-testid="price"]')
-                    link = await listing.query_selector_attribute('a', 'href')
-                    
-                    price = self._parse_price(price_text)
-                    
-                    if title and price > 0:
-                        results.append({
-                            'marketplace': 'offerup',
-                            'title': title,
-                            'price': price,
-                            'url': f"https://offerup.com{link}" if link.startswith('/') else link,
-                            'discovered_at': datetime.utcnow().isoformat(),
-                            'scraped_with': 'playwright'
-                        })
+            async with self.lease_page() as page:
+                return await self._scrape_facebook_page(page, keyword, location, max_results)
+        
+        except Exception as e:
+            logger.error(f"Facebook scraping error: {e}")
+            return []
+    
+    async def _scrape_facebook_page(self,
+                                    page: Page,
+                                    keyword: str,
+                                    location: str,
+                                    max_results: int) -> List[Dict]:
+        """Render and parse one Facebook Marketplace search on a leased page; page errors propagate"""
+        
+        # Navigate to marketplace
+        # Note: This requires Facebook authentication in production
+        search_url = f"https://www.facebook.com/marketplace/category/search/?query={keyword}"
+        
+        await page.goto(search_url, wait_until='domcontentloaded')
+        
+        # Wait for listings to load
+        await page.wait_for_selector('[data-testid="marketplace-product-card"]', timeout=10000)
+        
+        # Scroll to load more results
+        for _ in range(3):
+            await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
+            await asyncio.sleep(1)
+        
+        # Extract listings
+        listings = await page.query_selector_all('[data-testid="marketplace-product-card"]')
+        
+        results = []
+        
+        for listing in listings[:max_results]:
+            try:
+                # Extract data
+                title_elem = await listing.query_selector('span')
+                price_elem = await listing.query_selector('[class*="price"]')
+                link_elem = await listing.query_selector('a')
                 
-                except Exception as e:
-                    logger.debug(f"Error parsing OfferUp listing: {e}")
-                    continue
-            
-            logger.info(f"Found {len(results)} listings on OfferUp")
-            
-            return results
+                title = await title_elem.inner_text() if title_elem else ''
+                price_text = await price_elem.inner_text() if price_elem else '0'
+                url = await link_elem.get_attribute('href') if link_elem else ''
+                
+                # Parse price
+                price = self._parse_price(price_text)
+                
+                if title and price > 0:
+                    results.append({
+                        'marketplace': 'facebook_marketplace',
+                        'title': title,
+                        'price': price,
+                        'url': f"https://facebook.com{url}" if url.startswith('/') else url,
+                        'location': location,
+                        'discovered_at': datetime.utcnow().isoformat(),
+                        'scraped_with': 'playwright'
+                    })
             
+            except Exception as e:
+                logger.debug(f"Error parsing listing: {e}")
+                continue
+        
+        self.stats['pages_scraped'] += 1
+        logger.info(f"Found {len(results)} listings on Facebook Marketplace")
+        
+        return results
+    
+    async def scrape_offerup(self, keyword: str, zipcode: str, max_results: int = 50) -> List[Dict]:
+        """
+        Scrape OfferUp with JavaScript rendering
+        """
+        
+        logger.info(f"Scraping OfferUp for '{keyword}'")
+        
+        try:
+            async with self.lease_page() as page:
+                return await self._scrape_offerup_page(page, keyword, max_results)
+        
         except Exception as e:
             logger.error(f"OfferUp scraping error: {e}")
             return []
+    
+    async def _scrape_offerup_page(self, page: Page, keyword: str, max_results: int) -> List[Dict]:
+        """Render and parse one OfferUp search on a leased page; page errors propagate"""
         
-        finally:
-            await page.close()
-            await context.close()
+        # OfferUp search URL
+        url = f"https://offerup.com/search/?q={keyword}"
+        
+        await page.goto(url, wait_until='domcontentloaded')
+        
+        # Wait for results
+        await page.wait_for_selector('[data-testid="listing-card"]', timeout=10000)
+        
+        # Scroll to load more
+        for _ in range(3):
+            await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
+            await asyncio.sleep(1)
+        
+        # Extract listings
+        listings = await page.query_selector_all('[data-testid="listing-card"]')
+        
+        results = []
+        
+        for listing in listings[:max_results]:
+            try:
+                title = await self.query_selector_text(listing, 'h3')
+                price_text = await self.query_selector_text(listing, '[data-testid="price"]')
+                link = await self.query_selector_attribute(listing, 'a', 'href') or ''
+                
+                price = self._parse_price(price_text)
+                
+                if title and price > 0:
+                    results.append({
+                        'marketplace': 'offerup',
+                        'title': title,
+                        'price': price,
+                        'url': f"https://offerup.com{link}" if link.startswith('/') else link,
+                        'discovered_at': datetime.utcnow().isoformat(),
+                        'scraped_with': 'playwright'
+                    })
+            
+            except Exception as e:
+                logger.debug(f"Error parsing OfferUp listing: {e}")
+                continue
+        
+        self.stats['pages_scraped'] += 1
+        logger.info(f"Found {len(results)} listings on OfferUp")
+        
+        return results
     
     async def automate_purchase(self,
                                url: str,
@@ -192,8 +336,7 @@ class PlaywrightScraper:
         Mimics human actions: login, navigate, add to cart, checkout
         """
         
-        if not self.browser:
-            await self.initialize()
+        await self._ensure_browser()
         
         logger.info(f"Automating purchase for {url}")
         
@@ -264,9 +407,26 @@ class PlaywrightScraper:
         elem = await element.query_selector(selector)
         return await elem.get_attribute(attr) if elem else ''
     
+    def get_stats(self) -> Dict:
+        """Scrape and blocking counters"""
+        return dict(self.stats)
+    
     async def close(self):
-        """Close browser"""
+        """Close pooled contexts and the browser"""
+        
+        if self._page_pool is not None:
+            while not self._page_pool.empty():
+                entry = self._page_pool.get_nowait()
+                if entry is not None:
+                    await self._close_entry(entry)
+            self._page_pool = None
+        
         if self.browser:
             await self.browser.close()
+            self.browser = None
             logger.info("Playwright browser closed")
+        
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
 
@@ -0,0 +1,124 @@
+"""
+Category Scan Scheduler
+Scans each category on its own cadence, highest priority first
+"""
+
+import heapq
+import time
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+class CategoryScheduler:
+    """
+    Heap of next-due times per category
+
+    Uses `scan_interval_minutes` and `priority` from each category in
+    settings.yaml. Due categories are handed out in priority order
+    (1 = most important), and lag — how late a scan started relative to
+    its due time — is tracked per category. Priority only orders the due
+    list; callers that scan due categories together give each the same
+    share of the cycle budget.
+    """
+
+    def __init__(self, config: Dict, now: Optional[float] = None):
+        scheduler_config = config.get('scheduler', {})
+
+        self.cycle_budget = scheduler_config.get('cycle_budget_seconds', 300)
+        self.max_idle = scheduler_config.get('max_idle_seconds', 60)
+
+        now = time.monotonic() if now is None else now
+
+        self.intervals: Dict[str, float] = {}
+        self.priorities: Dict[str, int] = {}
+        self.next_due: Dict[str, float] = {}
+        self.in_flight: Dict[str, float] = {}
+        self.lag: Dict[str, Dict] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+
+        for name, category_config in config.get('categories', {}).items():
+            if not category_config.get('enabled', False):
+                continue
+
+            self.intervals[name] = category_config.get('scan_interval_minutes', 10) * 60
+            self.priorities[name] = category_config.get('priority', 99)
+            self.lag[name] = {'scans': 0, 'last_lag_seconds': 0.0, 'max_lag_seconds': 0.0}
+            self._schedule(name, now)
+
+        logger.info(f"Scheduler tracking {len(self.intervals)} categories")
+
+    def _schedule(self, name: str, due_at: float):
+        self.next_due[name] = due_at
+        heapq.heappush(self._heap, (due_at, self.priorities[name], name))
+
+    def due_categories(self, now: Optional[float] = None) -> List[str]:
+        """Pop every category that is due, ordered by priority"""
+
+        now = time.monotonic() if now is None else now
+        due = []
+
+        while self._heap and self._heap[0][0] <= now:
+            due_at, priority, name = heapq.heappop(self._heap)
+
+            # Skip stale heap entries left behind by a reschedule
+            if self.next_due.get(name) != due_at or name in self.in_flight:
+                continue
+
+            self.in_flight[name] = due_at
+            due.append((priority, due_at, name))
+
+        for _, due_at, name in sorted(due):
+            lag = max(0.0, now - due_at)
+            stats = self.lag[name]
+            stats['last_lag_seconds'] = lag
+            stats['max_lag_seconds'] = max(stats['max_lag_seconds'], lag)
+
+        return [name for _, _, name in sorted(due)]
+
+    def mark_scanned(self, name: str, now: Optional[float] = None):
+        """Record a finished scan and schedule the next one"""
+
+        now = time.monotonic() if now is None else now
+        due_at = self.in_flight.pop(name, now)
+
+        self.lag[name]['scans'] += 1
+
+        # Keep the cadence anchored to due times, but never schedule in the past
+        next_due = due_at + self.intervals[name]
+        self._schedule(name, max(next_due, now))
+
+    def defer(self, name: str, now: Optional[float] = None):
+        """Return an unfinished category to the queue, still due"""
+
+        now = time.monotonic() if now is None else now
+        due_at = self.in_flight.pop(name, now)
+
+        self._schedule(name, due_at)
+
+    def seconds_until_next(self, now: Optional[float] = None) -> float:
+        """How long the monitoring loop can idle before something is due"""
+
+        now = time.monotonic() if now is None else now
+
+        pending = [due_at for name, due_at in self.next_due.items() if name not in self.in_flight]
+        if not pending:
+            return self.max_idle
+
+        return min(self.max_idle, max(0.0, min(pending) - now))
+
+    def get_lag_report(self, now: Optional[float] = None) -> Dict[str, Dict]:
+        """Per-category scan counts, lag and how overdue each category is right now"""
+
+        now = time.monotonic() if now is None else now
+        report = {}
+
+        for name, stats in self.lag.items():
+            report[name] = {
+                **stats,
+                'priority': self.priorities[name],
+                'interval_seconds': self.intervals[name],
+                'overdue_seconds': max(0.0, now - self.next_due[name]) if name not in self.in_flight else 0.0
+            }
+
+        return report
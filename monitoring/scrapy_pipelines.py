@@ -0,0 +1,207 @@
+"""
+Scrapy Item Pipelines
+Batched MongoDB writes for high-volume crawls
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from loguru import logger
+from twisted.internet import defer, task, threads
+
+from database.mongodb_storage import MongoDBManager
+
+
+_shared_mongo: Optional[MongoDBManager] = None
+_shared_mongo_lock = threading.Lock()
+
+
+def shared_mongo() -> MongoDBManager:
+    """The process-wide MongoDBManager, connected (and its indexes created) on first use"""
+
+    global _shared_mongo
+
+    with _shared_mongo_lock:
+        if _shared_mongo is None:
+            _shared_mongo = MongoDBManager()
+
+    return _shared_mongo
+
+
+class MongoBatchPipeline:
+    """
+    Buffers scraped listings and writes them with unordered insert_many
+
+    Each item becomes a raw_listings document and a price_scrapes
+    document. Buffers are flushed when they reach MONGO_BATCH_SIZE or
+    every MONGO_FLUSH_INTERVAL seconds, on a worker thread so the
+    reactor keeps crawling. When MONGO_MAX_PENDING_FLUSHES writes are
+    already in flight, process_item waits for one to finish; Scrapy then
+    stops pulling new responses until Mongo catches up. Crawls in the
+    same process share one MongoDBManager, connected on a worker thread
+    by the first crawl that needs it.
+    """
+
+    def __init__(self,
+                 mongo=None,
+                 batch_size: int = 500,
+                 flush_interval: float = 2.0,
+                 max_pending_flushes: int = 2,
+                 clock=None):
+        # The shared manager is used unless one is passed in
+        self.mongo = mongo
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending_flushes = max_pending_flushes
+        self.clock = clock
+
+        self.listings: List[Dict] = []
+        self.scrapes: List[Dict] = []
+        self.pending: List[defer.Deferred] = []
+        self._flush_loop: Optional[task.LoopingCall] = None
+        self._started_at = time.monotonic()
+        self._crawler_stats = None
+
+        self.stats = {
+            'items': 0,
+            'flushes': 0,
+            'documents_written': 0,
+            'write_errors': 0,
+            'backpressure_waits': 0,
+            'flush_seconds_total': 0.0,
+            'flush_seconds_max': 0.0
+        }
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+
+        pipeline = cls(
+            batch_size=settings.getint('MONGO_BATCH_SIZE', 500),
+            flush_interval=settings.getfloat('MONGO_FLUSH_INTERVAL', 2.0),
+            max_pending_flushes=settings.getint('MONGO_MAX_PENDING_FLUSHES', 2)
+        )
+        pipeline._crawler_stats = crawler.stats
+
+        return pipeline
+
+    @defer.inlineCallbacks
+    def open_spider(self, spider):
+        if self.mongo is None:
+            # Connecting and creating indexes block, so keep them off the reactor
+            self.mongo = yield self._run_in_thread(shared_mongo)
+
+        self._started_at = time.monotonic()
+        self._flush_loop = task.LoopingCall(self._flush)
+        if self.clock is not None:
+            self._flush_loop.clock = self.clock
+        self._flush_loop.start(self.flush_interval, now=False)
+
+    def process_item(self, item, spider):
+        listing = dict(item)
+
+        self.listings.append(MongoDBManager.listing_document(listing))
+        self.scrapes.append(MongoDBManager.scrape_document({
+            'product_id': listing.get('listing_id') or listing.get('url'),
+            'marketplace': listing.get('marketplace'),
+            'price': listing.get('price'),
+            'metadata': {'title': listing.get('title'), 'category': listing.get('category')}
+        }))
+        self.stats['items'] += 1
+
+        if len(self.listings) >= self.batch_size:
+            self._flush()
+
+        if len(self.pending) >= self.max_pending_flushes:
+            # Backpressure: hold this item until the oldest write lands
+            self.stats['backpressure_waits'] += 1
+            waiter = defer.Deferred()
+
+            def release(result):
+                waiter.callback(item)
+                return result
+
+            self.pending[0].addBoth(release)
+            return waiter
+
+        return item
+
+    def _flush(self) -> Optional[defer.Deferred]:
+        """Hand the current buffers to a worker thread"""
+
+        if not self.listings:
+            return None
+
+        listings, self.listings = self.listings, []
+        scrapes, self.scrapes = self.scrapes, []
+
+        deferred = self._run_in_thread(self._write, listings, scrapes)
+        self.pending.append(deferred)
+
+        def finished(result):
+            self.pending.remove(deferred)
+            return result
+
+        deferred.addBoth(finished)
+        return deferred
+
+    def _run_in_thread(self, func, *args) -> defer.Deferred:
+        return threads.deferToThread(func, *args)
+
+    def _write(self, listings: List[Dict], scrapes: List[Dict]):
+        """Blocking batch write, run off the reactor thread"""
+
+        started = time.perf_counter()
+        documents = len(listings) + len(scrapes)
+
+        try:
+            written = self.mongo.insert_batch('raw_listings', listings)
+            written += self.mongo.insert_batch('price_scrapes', scrapes)
+        except Exception as e:
+            logger.error(f"Mongo batch write failed: {e}")
+            written = 0
+
+        elapsed = time.perf_counter() - started
+
+        self.stats['flushes'] += 1
+        self.stats['documents_written'] += written
+        self.stats['write_errors'] += documents - written
+        self.stats['flush_seconds_total'] += elapsed
+        self.stats['flush_seconds_max'] = max(self.stats['flush_seconds_max'], elapsed)
+
+    @defer.inlineCallbacks
+    def close_spider(self, spider):
+        if self._flush_loop is not None and self._flush_loop.running:
+            self._flush_loop.stop()
+
+        self._flush()
+
+        if self.pending:
+            yield defer.DeferredList(list(self.pending))
+
+        stats = self.get_stats()
+
+        if self._crawler_stats is not None:
+            for key, value in stats.items():
+                self._crawler_stats.set_value(f'mongo/{key}', value)
+
+        logger.info(
+            f"Mongo pipeline: {stats['items']} items at {stats['items_per_second']:.0f}/s, "
+            f"{stats['flushes']} flushes, {stats['avg_flush_ms']:.1f}ms avg"
+        )
+
+    def get_stats(self) -> Dict:
+        """Item throughput and flush latency"""
+
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        flushes = self.stats['flushes']
+
+        return {
+            **self.stats,
+            'items_per_second': self.stats['items'] / elapsed,
+            'avg_flush_ms': self.stats['flush_seconds_total'] / flushes * 1000 if flushes else 0.0,
+            'max_flush_ms': self.stats['flush_seconds_max'] * 1000,
+            'buffered': len(self.listings),
+            'pending_flushes': len(self.pending)
+        }
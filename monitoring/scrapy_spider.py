@@ -3,14 +3,22 @@ Scrapy Framework Integration for High-Performance Scraping
 Handles 100+ requests per minute across 500 sites
 """
 
+import asyncio
+import multiprocessing
+import queue
+import threading
+
 import scrapy
-from scrapy.crawler import CrawlerProcess
-from scrapy.utils.project import get_project_settings
-from typing import Dict, List
+from scrapy import signals
+from scrapy.crawler import CrawlerRunner
+from scrapy.settings import Settings
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 import json
 from datetime import datetime
 from loguru import logger
 
+from monitoring.html_parsers import get_parser
+
 
 class MarketplaceSpider(scrapy.Spider):
     """
@@ -41,10 +49,11 @@ class MarketplaceSpider(scrapy.Spider):
         }
     }
     
-    def __init__(self, urls: List[str], category: str, *args, **kwargs):
+    def __init__(self, urls: List[str], category: str, parser_backend: str = 'auto', *args, **kwargs):
         super(MarketplaceSpider, self).__init__(*args, **kwargs)
         self.start_urls = urls
         self.category = category
+        self.parser = get_parser({'scanning': {'parser_backend': parser_backend}})
         self.results = []
     
     def parse(self, response):
@@ -65,25 +74,18 @@ class MarketplaceSpider(scrapy.Spider):
     def parse_craigslist(self, response):
         """Parse Craigslist listings"""
         
-        for listing in response.css('.result-row'):
-            title = listing.css('.result-title::text').get()
-            price_text = listing.css('.result-price::text').get()
-            url = listing.css('.result-title::attr(href)').get()
-            location = listing.css('.result-hood::text').get()
-            
-            if title and price_text:
-                price = self._parse_price(price_text)
-                
-                yield {
-                    'marketplace': 'craigslist',
-                    'title': title.strip(),
-                    'price': price,
-                    'url': url,
-                    'location': location.strip() if location else '',
-                    'category': self.category,
-                    'discovered_at': datetime.utcnow().isoformat(),
-                    'scraped_with': 'scrapy'
-                }
+        # Same parser backend as CraigslistScanner, instead of a full selector tree
+        for record in self.parser.parse_craigslist(response.body, limit=120):
+            yield {
+                'marketplace': 'craigslist',
+                'title': record['title'],
+                'price': record['price'],
+                'url': record['url'],
+                'location': record['hood'],
+                'category': self.category,
+                'discovered_at': datetime.utcnow().isoformat(),
+                'scraped_with': 'scrapy'
+            }
     
     def parse_facebook(self, response):
         """Parse Facebook Marketplace - requires dynamic rendering"""
@@ -149,17 +151,243 @@ class MarketplaceSpider(scrapy.Spider):
         return 0.0
 
 
+def _crawl_worker(settings: Dict, jobs, events):
+    """
+    Crawl process entry point: one Twisted reactor serving every batch
+    
+    Jobs arrive on `jobs` as (job_id, urls, category, parser_backend);
+    None shuts the worker down. Items and job completions are sent back
+    on `events` as (kind, job_id, payload) while crawls are running.
+    """
+    
+    from twisted.internet import reactor
+    from twisted.python.failure import Failure
+    
+    # Service tuning takes precedence over the spider's custom_settings
+    crawl_settings = Settings()
+    crawl_settings.setdict(settings, priority='cmdline')
+    runner = CrawlerRunner(crawl_settings)
+    
+    def start_job(job_id, urls, category, parser_backend):
+        crawler = runner.create_crawler(MarketplaceSpider)
+        
+        def on_item(item, response, spider):
+            events.put(('item', job_id, dict(item)))
+        
+        def on_finished(result):
+            job_stats = crawler.stats.get_stats() if crawler.stats else {}
+            summary = {
+                'items': job_stats.get('item_scraped_count', 0),
+                'responses': job_stats.get('response_received_count', 0),
+                'errors': job_stats.get('log_count/ERROR', 0)
+            }
+            if isinstance(result, Failure):
+                summary['error'] = result.getErrorMessage()
+            events.put(('done', job_id, summary))
+        
+        # Closures are only referenced here, so keep a strong reference
+        crawler.signals.connect(on_item, signal=signals.item_scraped, weak=False)
+        deferred = runner.crawl(crawler, urls=urls, category=category, parser_backend=parser_backend)
+        deferred.addBoth(on_finished)
+    
+    def shutdown():
+        runner.stop().addBoth(lambda _: reactor.stop())
+    
+    def read_jobs():
+        while True:
+            job = jobs.get()
+            if job is None:
+                reactor.callFromThread(shutdown)
+                return
+            reactor.callFromThread(start_job, *job)
+    
+    threading.Thread(target=read_jobs, daemon=True).start()
+    events.put(('ready', None, None))
+    
+    reactor.run(installSignalHandlers=False)
+
+
+class ScrapyCrawlService:
+    """
+    Long-lived Scrapy crawl worker
+    
+    The Twisted reactor can only be started once per process, so crawls
+    run in a dedicated worker process that stays up between batches. URL
+    batches go over a multiprocessing queue and items stream back as the
+    spider yields them. Concurrency settings come from the `scrapy`
+    section of settings.yaml.
+    """
+    
+    def __init__(self, config: Dict):
+        scrapy_config = config.get('scrapy', {})
+        
+        self.settings = {
+            'CONCURRENT_REQUESTS': scrapy_config.get('concurrent_requests', 100),
+            'CONCURRENT_REQUESTS_PER_DOMAIN': scrapy_config.get('concurrent_requests_per_domain', 10),
+            'DOWNLOAD_DELAY': scrapy_config.get('download_delay', 0.5),
+            'AUTOTHROTTLE_TARGET_CONCURRENCY': scrapy_config.get('autothrottle_target_concurrency', 10.0),
+            'LOG_LEVEL': scrapy_config.get('log_level', 'INFO'),
+            # Any other Scrapy setting, passed through as-is
+            **scrapy_config.get('settings', {})
+        }
+        
+        mongo_config = scrapy_config.get('mongo_pipeline', {})
+        if mongo_config.get('enabled', False):
+            self.settings.update({
+                'ITEM_PIPELINES': {'monitoring.scrapy_pipelines.MongoBatchPipeline': 300},
+                'MONGO_BATCH_SIZE': mongo_config.get('batch_size', 500),
+                'MONGO_FLUSH_INTERVAL': mongo_config.get('flush_interval_seconds', 2.0),
+                'MONGO_MAX_PENDING_FLUSHES': mongo_config.get('max_pending_flushes', 2)
+            })
+        self.parser_backend = config.get('scanning', {}).get('parser_backend', 'auto')
+        self.start_timeout = scrapy_config.get('start_timeout_seconds', 60)
+        self.context = multiprocessing.get_context(scrapy_config.get('start_method', 'spawn'))
+        
+        self._process = None
+        self._jobs = None
+        self._events = None
+        self._reader = None
+        self._ready = threading.Event()
+        
+        # job id -> (event loop, queue) of the coroutine consuming that job
+        self._streams: Dict[int, Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = {}
+        self._next_job = 0
+        
+        self.stats = {
+            'jobs_submitted': 0,
+            'jobs_completed': 0,
+            'items': 0,
+            'worker_starts': 0
+        }
+    
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+    
+    async def start(self):
+        """Start the crawl worker process if it is not already running"""
+        
+        if self.running:
+            return
+        
+        self._ready.clear()
+        self._jobs = self.context.Queue()
+        self._events = self.context.Queue()
+        
+        self._process = self.context.Process(
+            target=_crawl_worker,
+            args=(self.settings, self._jobs, self._events),
+            name='scrapy-crawl-worker',
+            daemon=True
+        )
+        self._process.start()
+        
+        self._reader = threading.Thread(target=self._read_events, args=(self._process, self._events), daemon=True)
+        self._reader.start()
+        
+        if not await asyncio.to_thread(self._ready.wait, self.start_timeout):
+            raise RuntimeError("Scrapy crawl worker did not start")
+        
+        self.stats['worker_starts'] += 1
+        logger.info(f"Scrapy crawl worker started (pid {self._process.pid})")
+    
+    def _read_events(self, process, events):
+        """Route worker events to the coroutine consuming each job"""
+        
+        while True:
+            try:
+                kind, job_id, payload = events.get(timeout=1.0)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                kind, job_id, payload = 'lost', None, None
+            except (EOFError, OSError):
+                kind, job_id, payload = 'lost', None, None
+            
+            if kind == 'ready':
+                self._ready.set()
+            elif kind == 'stop':
+                return
+            elif kind == 'lost':
+                # The worker died; fail every job still waiting on it
+                for loop, stream in list(self._streams.values()):
+                    loop.call_soon_threadsafe(stream.put_nowait, ('lost', None))
+                return
+            elif job_id in self._streams:
+                loop, stream = self._streams[job_id]
+                loop.call_soon_threadsafe(stream.put_nowait, (kind, payload))
+    
+    async def crawl(self, urls: List[str], category: str) -> AsyncIterator[Dict]:
+        """Crawl a batch of URLs, yielding items as the worker scrapes them"""
+        
+        await self.start()
+        
+        job_id = self._next_job
+        self._next_job += 1
+        
+        stream: asyncio.Queue = asyncio.Queue()
+        self._streams[job_id] = (asyncio.get_running_loop(), stream)
+        
+        self._jobs.put((job_id, list(urls), category, self.parser_backend))
+        self.stats['jobs_submitted'] += 1
+        
+        logger.info(f"Submitted Scrapy crawl {job_id}: {len(urls)} URLs in category '{category}'")
+        
+        try:
+            while True:
+                kind, payload = await stream.get()
+                
+                if kind == 'item':
+                    self.stats['items'] += 1
+                    yield payload
+                
+                elif kind == 'done':
+                    self.stats['jobs_completed'] += 1
+                    if payload.get('error'):
+                        logger.error(f"Scrapy crawl {job_id} failed: {payload['error']}")
+                    else:
+                        logger.info(f"Scrapy crawl {job_id} completed: {payload['items']} items")
+                    return
+                
+                else:
+                    raise RuntimeError("Scrapy crawl worker exited during a crawl")
+        finally:
+            self._streams.pop(job_id, None)
+    
+    def get_stats(self) -> Dict:
+        """Job and item counters"""
+        return {**self.stats, 'running': self.running, 'jobs_in_flight': len(self._streams)}
+    
+    async def close(self):
+        """Stop the crawl worker once its running crawls have shut down"""
+        
+        if self._process is None:
+            return
+        
+        if self._process.is_alive():
+            self._jobs.put(None)
+            await asyncio.to_thread(self._process.join, 30)
+        
+        if self._process.is_alive():
+            self._process.terminate()
+        
+        self._events.put(('stop', None, None))
+        await asyncio.to_thread(self._reader.join, 5)
+        
+        self._process = None
+
+
 class ScrapyOrchestrator:
     """
     Manages Scrapy spiders for high-volume scraping
     """
     
-    def __init__(self):
-        self.process = None
+    def __init__(self, config: Optional[Dict] = None):
+        self.service = ScrapyCrawlService(config or {})
     
-    def start_crawl(self, urls: List[str], category: str, callback=None):
+    def start_crawl(self, urls: List[str], category: str, callback=None) -> List[Dict]:
         """
-        Start Scrapy crawl process
+        Run a crawl to completion from synchronous code
         
         Args:
             urls: List of URLs to scrape
@@ -167,36 +395,20 @@ class ScrapyOrchestrator:
             callback: Function to call with results
         """
         
-        logger.info(f"Starting Scrapy crawl for {len(urls)} URLs in category '{category}'")
-        
-        process = CrawlerProcess({
-            'USER_AGENT': 'Mozilla/5.0 (compatible; ArbitrageBot/1.0)',
-            'ROBOTSTXT_OBEY': True,
-            'CONCURRENT_REQUESTS': 100,
-            'LOG_LEVEL': 'INFO'
-        })
+        results = asyncio.run(self.crawl_async(urls, category))
         
-        process.crawl(MarketplaceSpider, urls=urls, category=category)
-        process.start()  # Blocking call
+        if callback:
+            callback(results)
         
-        logger.info("Scrapy crawl completed")
+        return results
     
     async def crawl_async(self, urls: List[str], category: str) -> List[Dict]:
         """
-        Async wrapper for Scrapy crawling
+        Crawl a URL batch on the persistent worker and collect its items
         """
         
-        import asyncio
-        from concurrent.futures import ThreadPoolExecutor
-        
-        executor = ThreadPoolExecutor(max_workers=1)
-        
-        results = []
-        
-        def run_crawl():
-            self.start_crawl(urls, category)
-            return results
-        
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(executor, run_crawl)
-
+        return [item async for item in self.service.crawl(urls, category)]
+    
+    async def close(self):
+        """Shut the crawl worker down"""
+        await self.service.close()
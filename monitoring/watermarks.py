@@ -0,0 +1,215 @@
+"""
+Incremental Scanning Watermarks
+Remembers the newest listing per query and the listings already sent downstream
+"""
+
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+
+def listing_key(listing: Dict) -> str:
+    """Stable identity for a listing: marketplace post id, falling back to URL"""
+    return str(listing.get('listing_id') or listing.get('url') or listing.get('title', ''))
+
+
+class WatermarkStore(ABC):
+    """
+    Base watermark store
+
+    A watermark is the newest post id seen for a
+    (marketplace, keyword, location) query. Seen listings are kept with
+    their last price so only new or re-priced listings go downstream.
+    """
+
+    @abstractmethod
+    def get_watermark(self, marketplace: str, keyword: str, location: str = '') -> Optional[str]:
+        """Newest post id seen for a query, or None"""
+        pass
+
+    @abstractmethod
+    def set_watermark(self, marketplace: str, keyword: str, location: str, newest_id: str):
+        """Remember the newest post id seen for a query"""
+        pass
+
+    @abstractmethod
+    def _get_seen_prices(self, marketplace: str, keys: List[str]) -> Dict[str, float]:
+        """Last price of each already-seen listing among `keys`"""
+        pass
+
+    @abstractmethod
+    def _mark_seen(self, marketplace: str, prices: Dict[str, float]):
+        """Remember listings as seen at these prices"""
+        pass
+
+    def filter_new(self, marketplace: str, listings: List[Dict]) -> List[Dict]:
+        """Keep listings that are unseen or whose price changed, and remember them"""
+
+        if not listings:
+            return []
+
+        keys = [listing_key(listing) for listing in listings]
+        seen = self._get_seen_prices(marketplace, keys)
+
+        fresh = []
+        updates = {}
+
+        for key, listing in zip(keys, listings):
+            price = float(listing.get('price') or 0)
+            previous = seen.get(key)
+
+            if previous is None:
+                fresh.append(listing)
+            elif abs(previous - price) >= 0.01:
+                fresh.append({**listing, 'previous_price': previous, 'price_changed': True})
+            else:
+                continue
+
+            updates[key] = price
+
+        if updates:
+            self._mark_seen(marketplace, updates)
+
+        logger.debug(f"{marketplace}: {len(fresh)}/{len(listings)} listings new or re-priced")
+        return fresh
+
+    def close(self):
+        pass
+
+
+class SQLiteWatermarkStore(WatermarkStore):
+    """Watermarks persisted in a local SQLite file"""
+
+    def __init__(self, path: str = 'data/watermarks.db', retention_days: int = 7):
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.retention_days = retention_days
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS watermarks (
+                marketplace TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                location TEXT NOT NULL,
+                newest_id TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (marketplace, keyword, location)
+            );
+            CREATE TABLE IF NOT EXISTS seen_listings (
+                marketplace TEXT NOT NULL,
+                listing_key TEXT NOT NULL,
+                price REAL,
+                seen_at TEXT NOT NULL,
+                PRIMARY KEY (marketplace, listing_key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_seen_listings_seen_at ON seen_listings (seen_at);
+        """)
+        self.prune()
+
+    def get_watermark(self, marketplace: str, keyword: str, location: str = '') -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT newest_id FROM watermarks WHERE marketplace = ? AND keyword = ? AND location = ?",
+            (marketplace, keyword, location)
+        ).fetchone()
+
+        return row[0] if row else None
+
+    def set_watermark(self, marketplace: str, keyword: str, location: str, newest_id: str):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?, ?, ?)",
+                (marketplace, keyword, location, newest_id, datetime.utcnow().isoformat())
+            )
+
+    def _get_seen_prices(self, marketplace: str, keys: List[str]) -> Dict[str, float]:
+        placeholders = ','.join('?' * len(keys))
+        rows = self.conn.execute(
+            f"SELECT listing_key, price FROM seen_listings "
+            f"WHERE marketplace = ? AND listing_key IN ({placeholders})",
+            (marketplace, *keys)
+        ).fetchall()
+
+        return {key: price for key, price in rows}
+
+    def _mark_seen(self, marketplace: str, prices: Dict[str, float]):
+        now = datetime.utcnow().isoformat()
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO seen_listings VALUES (?, ?, ?, ?)",
+                [(marketplace, key, price, now) for key, price in prices.items()]
+            )
+
+    def prune(self):
+        """Forget listings not seen within the retention window"""
+
+        cutoff = (datetime.utcnow() - timedelta(days=self.retention_days)).isoformat()
+
+        with self.conn:
+            deleted = self.conn.execute("DELETE FROM seen_listings WHERE seen_at < ?", (cutoff,)).rowcount
+
+        if deleted:
+            logger.info(f"Pruned {deleted} stale seen listings")
+
+    def close(self):
+        self.conn.close()
+
+
+class RedisWatermarkStore(WatermarkStore):
+    """
+    Watermarks shared through Redis, for multi-process scanning
+
+    Each seen listing is its own key with a TTL of the retention window,
+    set whenever the listing is recorded as new or re-priced, so every
+    listing expires on its own schedule like a pruned SQLite row.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, retention_days: int = 7, redis_client=None):
+        if redis_client is None:
+            import redis
+
+            redis_url = redis_url or os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+            redis_client = redis.from_url(redis_url, decode_responses=True)
+
+        self.redis_client = redis_client
+        self.retention_seconds = retention_days * 86400
+
+    def get_watermark(self, marketplace: str, keyword: str, location: str = '') -> Optional[str]:
+        return self.redis_client.get(f"watermark:{marketplace}:{keyword}:{location}")
+
+    def set_watermark(self, marketplace: str, keyword: str, location: str, newest_id: str):
+        self.redis_client.set(f"watermark:{marketplace}:{keyword}:{location}", newest_id)
+
+    def _get_seen_prices(self, marketplace: str, keys: List[str]) -> Dict[str, float]:
+        prices = self.redis_client.mget([f"seen:{marketplace}:{key}" for key in keys])
+        return {key: float(price) for key, price in zip(keys, prices) if price is not None}
+
+    def _mark_seen(self, marketplace: str, prices: Dict[str, float]):
+        pipe = self.redis_client.pipeline()
+        for key, price in prices.items():
+            pipe.set(f"seen:{marketplace}:{key}", price, ex=self.retention_seconds)
+        pipe.execute()
+
+
+def create_watermark_store(config: Dict) -> Optional[WatermarkStore]:
+    """Build the configured watermark store, or None when incremental scanning is off"""
+
+    incremental_config = config.get('incremental_scanning', {})
+
+    if not incremental_config.get('enabled', False):
+        return None
+
+    retention_days = incremental_config.get('seen_retention_days', 7)
+
+    if incremental_config.get('backend', 'sqlite') == 'redis':
+        return RedisWatermarkStore(retention_days=retention_days)
+
+    return SQLiteWatermarkStore(
+        incremental_config.get('sqlite_path', 'data/watermarks.db'),
+        retention_days=retention_days
+    )
@@ -0,0 +1,164 @@
+"""
+Playwright Scraping Benchmark
+Compares per-call contexts (old behaviour) against the pooled, resource-blocking scraper
+
+Usage:
+    python scripts/benchmark_playwright.py --marketplace offerup --pool-size 4 \
+        "lego set" "nintendo switch" "textbook" "guitar"
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitoring.playwright_scraper import PlaywrightScraper
+
+
+SEARCH_URLS = {
+    'facebook_marketplace': "https://www.facebook.com/marketplace/category/search/?query={keyword}",
+    'offerup': "https://offerup.com/search/?q={keyword}"
+}
+
+
+def process_tree_rss_mb() -> float:
+    """Resident memory of this process and all descendants (Linux /proc)"""
+
+    parents: Dict[int, int] = {}
+    rss_pages: Dict[int, int] = {}
+
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            parents[int(entry)] = int(fields[1])
+            rss_pages[int(entry)] = int(fields[21])
+        except (OSError, IndexError, ValueError):
+            continue
+
+    tree = {os.getpid()}
+    changed = True
+    while changed:
+        changed = False
+        for pid, ppid in parents.items():
+            if ppid in tree and pid not in tree:
+                tree.add(pid)
+                changed = True
+
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    return sum(rss_pages.get(pid, 0) for pid in tree) * page_size / (1024 * 1024)
+
+
+async def sample_peak_rss(stop: asyncio.Event, peak: List[float]):
+    """Poll process-tree RSS until stopped, keeping the maximum"""
+
+    while not stop.is_set():
+        peak[0] = max(peak[0], process_tree_rss_mb())
+        await asyncio.sleep(0.25)
+
+
+async def run_legacy(keywords: List[str], marketplace: str) -> int:
+    """Old behaviour: a fresh context per keyword, full resource loading, networkidle"""
+
+    scraper = PlaywrightScraper(pool_size=1, block_resources=False)
+    await scraper.initialize()
+    pages = 0
+
+    try:
+        for keyword in keywords:
+            context = await scraper.browser.new_context()
+            page = await context.new_page()
+            try:
+                await page.goto(SEARCH_URLS[marketplace].format(keyword=keyword), wait_until='networkidle')
+                pages += 1
+            except Exception as e:
+                print(f"   legacy: {keyword}: {e}")
+            finally:
+                await page.close()
+                await context.close()
+    finally:
+        await scraper.close()
+
+    return pages
+
+
+async def run_pooled(keywords: List[str], marketplace: str, pool_size: int) -> int:
+    """New behaviour: warm pooled contexts, blocked resources, parallel tabs"""
+
+    scraper = PlaywrightScraper(pool_size=pool_size, block_resources=True)
+    await scraper.initialize()
+
+    async def load(keyword: str) -> int:
+        try:
+            async with scraper.lease_page() as page:
+                await page.goto(SEARCH_URLS[marketplace].format(keyword=keyword), wait_until='domcontentloaded')
+            return 1
+        except Exception as e:
+            print(f"   pooled: {keyword}: {e}")
+            return 0
+
+    try:
+        pages = sum(await asyncio.gather(*(load(keyword) for keyword in keywords)))
+        print(f"   requests blocked: {scraper.get_stats()['requests_blocked']}")
+    finally:
+        await scraper.close()
+
+    return pages
+
+
+async def measure(label: str, coro) -> Dict:
+    """Time a run and record peak process-tree RSS"""
+
+    stop = asyncio.Event()
+    peak = [0.0]
+    sampler = asyncio.create_task(sample_peak_rss(stop, peak))
+
+    started = time.perf_counter()
+    pages = await coro
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await sampler
+
+    result = {
+        'label': label,
+        'pages': pages,
+        'seconds': elapsed,
+        'pages_per_minute': pages / elapsed * 60 if elapsed else 0.0,
+        'peak_rss_mb': peak[0]
+    }
+
+    print(f"{label:8s}: {pages} pages in {elapsed:.1f}s "
+          f"({result['pages_per_minute']:.1f} pages/min), peak RSS {peak[0]:.0f} MB")
+
+    return result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('keywords', nargs='*', default=['lego set', 'nintendo switch', 'textbook', 'guitar'])
+    parser.add_argument('--marketplace', choices=sorted(SEARCH_URLS), default='offerup')
+    parser.add_argument('--pool-size', type=int, default=4)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"PLAYWRIGHT BENCHMARK - {args.marketplace}, {len(args.keywords)} keywords")
+    print("=" * 60)
+
+    before = await measure('before', run_legacy(args.keywords, args.marketplace))
+    after = await measure('after', run_pooled(args.keywords, args.marketplace, args.pool_size))
+
+    if before['pages_per_minute']:
+        speedup = after['pages_per_minute'] / before['pages_per_minute']
+        print(f"\nThroughput: {speedup:.2f}x, RSS delta: {after['peak_rss_mb'] - before['peak_rss_mb']:+.0f} MB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -3,21 +3,124 @@ Celery Tasks for Async Processing
 """
 
 from celery import Celery
+from loguru import logger
+from typing import Dict, List, Optional
+import asyncio
 import os
+import threading
+
+import yaml
+
+from tasks.result_channel import ResultChannel, create_result_channel
 
 # Initialize Celery
 celery = Celery(
     'arbitrage_tasks',
-    broker=os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
-    backend=os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    broker=os.getenv('CELERY_BROKER_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/0')),
+    backend=os.getenv('CELERY_RESULT_BACKEND', os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
 )
 
 
-@celery.task
-def scan_marketplace(marketplace: str, category: str, keywords: list):
-    """Async task to scan a marketplace"""
-    # Implementation
-    pass
+def route_task(name, args, kwargs, options, task=None, **kw):
+    """Scan shards go to one queue per marketplace, so workers can be dedicated to a site"""
+    
+    if name == scan_marketplace.name:
+        return {'queue': f"scan.{kwargs.get('marketplace', 'default')}"}
+    
+    return None
+
+
+celery.conf.task_routes = (route_task,)
+
+
+# Worker-side state: config and result channel per process; the scanner and
+# its event loop per worker thread, because pooled HTTP clients are bound to
+# the loop they were first used on (threaded pools run tasks on many threads)
+_worker_config: Optional[Dict] = None
+_market_scanner = None
+_result_channel: Optional[ResultChannel] = None
+_thread_state = threading.local()
+
+
+def configure_worker(config: Dict, market_scanner=None, result_channel: Optional[ResultChannel] = None):
+    """
+    Set the config (and optionally prebuilt components) scan tasks use in this process
+    
+    A prebuilt market_scanner is shared by every worker thread, so pass one
+    only with the prefork or solo pool; otherwise each thread builds its own.
+    """
+    
+    global _worker_config, _market_scanner, _result_channel
+    
+    _worker_config = config
+    _market_scanner = market_scanner
+    _result_channel = result_channel
+
+
+def _get_config() -> Dict:
+    global _worker_config
+    
+    if _worker_config is None:
+        with open(os.getenv('ARBITRAGE_CONFIG', 'config/settings.yaml'), 'r') as f:
+            _worker_config = yaml.safe_load(f)
+    
+    return _worker_config
+
+
+def _get_market_scanner():
+    if _market_scanner is not None:
+        return _market_scanner
+    
+    if getattr(_thread_state, 'market_scanner', None) is None:
+        from monitoring.market_scanner import MarketScanner
+        _thread_state.market_scanner = MarketScanner(_get_config())
+    
+    return _thread_state.market_scanner
+
+
+def _get_result_channel() -> ResultChannel:
+    global _result_channel
+    
+    if _result_channel is None:
+        _result_channel = create_result_channel(_get_config())
+    
+    return _result_channel
+
+
+def _run(coroutine):
+    """Run a coroutine on this worker thread's long-lived event loop"""
+    
+    if getattr(_thread_state, 'loop', None) is None:
+        _thread_state.loop = asyncio.new_event_loop()
+    
+    return _thread_state.loop.run_until_complete(coroutine)
+
+
+@celery.task(acks_late=True)
+def scan_marketplace(marketplace: str, category: str, location: Optional[str] = None) -> Dict:
+    """
+    Scan one (marketplace, category, location) shard
+    
+    Listings are published to the scan result channel for the decision
+    stage; the task result only carries a summary.
+    """
+    
+    shard = {'marketplace': marketplace, 'category': category, 'location': location}
+    
+    listings = _run(_get_market_scanner().scan_shard(marketplace, category, location))
+    _get_result_channel().publish(shard, listings)
+    
+    logger.info(f"Shard {marketplace}/{category}/{location or '-'}: {len(listings)} listings")
+    return {**shard, 'listings': len(listings)}
+
+
+def dispatch_scan_shards(shards: List[Dict]) -> List:
+    """Queue a scan_marketplace task per shard, returning the AsyncResults"""
+    
+    return [
+        scan_marketplace.apply_async(kwargs=shard)
+        for shard in shards
+    ]
 
 
 @celery.task
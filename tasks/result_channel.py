@@ -0,0 +1,107 @@
+"""
+Scan Result Channel
+Carries listings from distributed scan workers back to the decision stage
+"""
+
+import json
+import os
+import queue
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+
+class ResultChannel(ABC):
+    """
+    Base result channel
+
+    Scan workers publish one message per finished shard: the shard
+    (marketplace, category, location) and its listings. The decision
+    stage pops messages in arrival order.
+    """
+
+    @abstractmethod
+    def publish(self, shard: Dict, listings: List[Dict]):
+        """Send one finished shard's listings"""
+        pass
+
+    @abstractmethod
+    def get(self, timeout: float = 1.0) -> Optional[Dict]:
+        """Next message, or None if nothing arrived within `timeout` seconds (blocking)"""
+        pass
+
+    def close(self):
+        pass
+
+
+class MemoryResultChannel(ResultChannel):
+    """In-process channel for a single node and for tests"""
+
+    def __init__(self):
+        self.messages: queue.Queue = queue.Queue()
+
+    def publish(self, shard: Dict, listings: List[Dict]):
+        self.messages.put({'shard': shard, 'listings': listings})
+
+    def get(self, timeout: float = 1.0) -> Optional[Dict]:
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class RedisResultChannel(ResultChannel):
+    """
+    Redis list shared by every worker node
+
+    A list rather than pub/sub, so results published while the decision
+    stage is restarting are kept until it reads them.
+    """
+
+    def __init__(self, url: Optional[str] = None, key: str = 'arbitrage:scan_results', max_length: int = 10000):
+        import redis
+
+        self.redis = redis.Redis.from_url(url or os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+        self.key = key
+        self.max_length = max_length
+
+    def publish(self, shard: Dict, listings: List[Dict]):
+        pipe = self.redis.pipeline()
+        pipe.rpush(self.key, json.dumps({'shard': shard, 'listings': listings}, default=str))
+        # Drop the oldest results if the decision stage falls far behind
+        pipe.ltrim(self.key, -self.max_length, -1)
+        pipe.execute()
+
+    def get(self, timeout: float = 1.0) -> Optional[Dict]:
+        item = self.redis.blpop(self.key, timeout=max(1, int(timeout)))
+        if item is None:
+            return None
+
+        return json.loads(item[1])
+
+    def close(self):
+        self.redis.close()
+
+
+# One memory channel per process, shared by the tasks and the consumer
+_memory_channel: Optional[MemoryResultChannel] = None
+
+
+def create_result_channel(config: Dict) -> ResultChannel:
+    """Build the configured result channel (redis or memory)"""
+
+    global _memory_channel
+
+    distributed_config = config.get('distributed_scanning', {})
+
+    if distributed_config.get('results_backend', 'redis') == 'memory':
+        if _memory_channel is None:
+            _memory_channel = MemoryResultChannel()
+        return _memory_channel
+
+    logger.info("Using Redis scan result channel")
+    return RedisResultChannel(
+        key=distributed_config.get('results_key', 'arbitrage:scan_results'),
+        max_length=distributed_config.get('max_pending_results', 10000)
+    )
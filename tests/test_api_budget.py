@@ -0,0 +1,135 @@
+"""
+Tests for the API budget scheduler
+"""
+
+import asyncio
+import time
+
+import pytest
+from infrastructure.api_budget import APIBudgetManager, BudgetExceeded
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+def budget(apis, clock=None, db=None, **settings):
+    config = {
+        'api_budget': {'apis': apis, **settings},
+        'categories': {'lego': {'avg_margin': 0.35}, 'books': {'avg_margin': 0.25}}
+    }
+    return APIBudgetManager(config, db=db, clock=clock or time.time)
+
+
+async def lookup(value):
+    return value
+
+
+def test_priority_is_expected_profit():
+    """Priority is price times the category's average margin"""
+
+    manager = budget({})
+
+    assert manager.priority_for(200, 'lego') == pytest.approx(70.0)
+    assert manager.priority_for(3, 'books') == pytest.approx(0.75)
+    assert manager.priority_for(None, 'unknown') == 0.0
+
+
+@pytest.mark.asyncio
+async def test_minute_quota_admits_highest_priority_first():
+    """Callers queued behind the minute quota run in order of expected profit"""
+
+    clock = FakeClock()
+    manager = budget({'keepa': {'per_minute': 1}}, clock=clock)
+
+    await manager.acquire('keepa', 1.0)
+
+    order = []
+
+    async def waiter(priority):
+        await manager.acquire('keepa', priority)
+        order.append(priority)
+
+    tasks = [asyncio.ensure_future(waiter(priority)) for priority in (5.0, 70.0, 20.0)]
+    await asyncio.sleep(0)
+    assert manager.get_stats()['apis']['keepa']['queued'] == 3
+
+    # A minute later the window frees one slot at a time
+    for _ in range(3):
+        clock.now += 61
+        manager._wake.pop('keepa').cancel()
+        manager._admit('keepa')
+        await asyncio.sleep(0)
+
+    await asyncio.gather(*tasks)
+
+    assert order == [70.0, 20.0, 5.0]
+    assert manager.get_stats()['waited'] == 3
+
+
+@pytest.mark.asyncio
+async def test_daily_quota_and_reserve():
+    """The last of a daily allowance is kept for valuable lookups; none is left after it"""
+
+    manager = budget({'keepa': {'daily_requests': 10}}, reserve_fraction=0.2, tight_min_priority=20)
+
+    for _ in range(8):
+        await manager.call('keepa', 1.0, lookup, 'x')
+
+    with pytest.raises(BudgetExceeded):
+        await manager.call('keepa', 1.0, lookup, 'x')
+
+    for _ in range(2):
+        assert await manager.call('keepa', 70.0, lookup, 'y') == 'y'
+
+    with pytest.raises(BudgetExceeded):
+        await manager.call('keepa', 70.0, lookup, 'y')
+
+    stats = manager.get_stats()
+    assert stats['refused'] == 2
+    assert stats['apis']['keepa']['requests_today'] == 10
+
+
+@pytest.mark.asyncio
+async def test_usage_is_persisted_and_reloaded(tmp_path, monkeypatch):
+    """Calls are written to the APIUsage table and seed a restarted manager"""
+
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'usage.db'}")
+    from database.db_manager import DatabaseManager
+    db = DatabaseManager({})
+
+    apis = {'keepa': {'cost_per_request': 0.004, 'daily_budget': 1.0}}
+    manager = budget(apis, db=db, flush_size=2)
+
+    for _ in range(3):
+        await manager.call('keepa', 10.0, lookup, 'x')
+    manager.record_viable()
+    await manager.close()
+
+    stats = manager.get_stats()
+    assert stats['spend'] == pytest.approx(0.012)
+    assert stats['spend_per_viable'] == pytest.approx(0.012)
+
+    restarted = budget(apis, db=db)
+    await restarted.load_today()
+
+    keepa = restarted.get_stats()['apis']['keepa']
+    assert keepa['requests_today'] == 3
+    assert keepa['spend_today'] == pytest.approx(0.012)
+    assert keepa['remaining_fraction'] == pytest.approx(0.988)
+
+
+@pytest.mark.asyncio
+async def test_disabled_budget_only_records():
+    """With the scheduler off, calls run unthrottled but are still counted"""
+
+    manager = budget({'keepa': {'daily_requests': 1}}, enabled=False)
+
+    for _ in range(3):
+        await manager.call('keepa', 0.0, lookup, 'x')
+
+    assert manager.get_stats()['calls'] == 3
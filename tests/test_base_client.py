@@ -0,0 +1,196 @@
+"""
+Tests for the shared integration client layer
+"""
+
+import asyncio
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from infrastructure.http_pool import HTTPClientPool
+from integrations.api_integrations import APIManager, BrickLinkAPI, TacticalArbitrageAPI, TCGPlayerAPI
+from integrations.base_client import BaseAPIClient, parse_retry_after
+
+
+FAST_RETRIES = {'api_clients': {'defaults': {'backoff_base_seconds': 0.001, 'max_retries': 2}}}
+
+
+def mock_pool(handler):
+    return HTTPClientPool({}, transport=httpx.MockTransport(handler))
+
+
+def client(handler, config=FAST_RETRIES):
+    return BaseAPIClient('example', 'https://api.example.com', config, mock_pool(handler))
+
+
+def test_parse_retry_after():
+    """Retry-After may be delta-seconds or an HTTP date"""
+
+    assert parse_retry_after('2') == 2.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+
+    in_ten = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=10), usegmt=True)
+    assert 8 <= parse_retry_after(in_ten) <= 10
+
+
+@pytest.mark.asyncio
+async def test_throttled_request_waits_for_retry_after():
+    """A 429 is retried no earlier than the server asks"""
+
+    responses = iter([httpx.Response(429, headers={'Retry-After': '0.1'}), httpx.Response(200, json={'ok': True})])
+    api = client(lambda request: next(responses))
+
+    started = time.perf_counter()
+    assert await api.get_json('/prices') == {'ok': True}
+    assert time.perf_counter() - started >= 0.1
+
+    stats = api.get_stats()['endpoints']['/prices']
+    assert stats['requests'] == 2
+    assert stats['errors'] == 1
+    assert stats['retries'] == 1
+
+
+@pytest.mark.asyncio
+async def test_retries_run_out():
+    """Persistent 5xx comes back after max_retries; a long Retry-After is not waited for"""
+
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if request.url.path == '/throttled':
+            return httpx.Response(429, headers={'Retry-After': '3600'})
+        if request.url.path == '/down':
+            raise httpx.ConnectError('connection refused')
+        return httpx.Response(503)
+
+    api = client(handler)
+
+    assert (await api.request('GET', '/flaky')).status_code == 503
+    assert (await api.request('GET', '/throttled')).status_code == 429
+    with pytest.raises(httpx.ConnectError):
+        await api.request('GET', '/down')
+
+    assert calls == ['/flaky'] * 3 + ['/throttled'] + ['/down'] * 3
+
+    # Client errors are not retried
+    api = client(lambda request: httpx.Response(404))
+    with pytest.raises(httpx.HTTPStatusError):
+        await api.get_json('/missing')
+    assert api.get_stats()['endpoints']['/missing']['retries'] == 0
+
+
+@pytest.mark.asyncio
+async def test_posts_are_sent_once_unless_retry_is_asked_for(monkeypatch):
+    """A failed POST is not resent by default, since the server may have acted on it"""
+
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        return httpx.Response(503)
+
+    api = client(handler)
+
+    assert (await api.request('POST', '/orders')).status_code == 503
+    assert calls == ['POST']
+
+    assert (await api.request('POST', '/orders', retry=True)).status_code == 503
+    assert calls == ['POST'] * 4
+
+    monkeypatch.setenv('TACTICAL_ARBITRAGE_API_KEY', 'key')
+    scans = TacticalArbitrageAPI(FAST_RETRIES, mock_pool(handler))
+    calls.clear()
+
+    assert (await scans.start_scan({'source': 'walmart'}))['success'] is False
+    assert calls == ['POST']
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_limited_per_integration():
+    """No more than max_concurrency requests are in flight at once"""
+
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={})
+
+    api = client(handler, {'api_clients': {'example': {'max_concurrency': 2}}})
+    await asyncio.gather(*(api.get_json('/prices') for _ in range(6)))
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_tcgplayer_token_is_cached_and_refreshed(monkeypatch):
+    """One token serves many requests; a 401 gets a fresh one"""
+
+    monkeypatch.setenv('TCGPLAYER_PUBLIC_KEY', 'public')
+    monkeypatch.setenv('TCGPLAYER_PRIVATE_KEY', 'private')
+
+    tokens = iter(['first', 'second'])
+    seen = []
+
+    def handler(request):
+        if request.url.path == '/token':
+            return httpx.Response(200, json={'access_token': next(tokens), 'expires_in': 1209599})
+
+        seen.append(request.headers['Authorization'])
+        if len(seen) == 3:
+            return httpx.Response(401)
+        return httpx.Response(200, json={'results': [{'name': 'Charizard'}]})
+
+    api = TCGPlayerAPI(FAST_RETRIES, mock_pool(handler))
+
+    for _ in range(3):
+        assert await api.search_card('Charizard') == [{'name': 'Charizard'}]
+
+    assert seen == ['Bearer first', 'Bearer first', 'Bearer first', 'Bearer second']
+    assert api.get_stats()['token_refreshes'] == 2
+
+
+@pytest.mark.asyncio
+async def test_bricklink_requests_are_signed(monkeypatch):
+    """Each BrickLink request carries a fresh OAuth 1.0 signature"""
+
+    for name in ('CONSUMER_KEY', 'CONSUMER_SECRET', 'TOKEN_VALUE', 'TOKEN_SECRET'):
+        monkeypatch.setenv(f'BRICKLINK_{name}', name.lower())
+
+    headers = []
+
+    def handler(request):
+        headers.append(request.headers['Authorization'])
+        assert request.url.path.endswith('/items/SET/75192-1/price')
+        return httpx.Response(200, json={'data': {'avg_price': '712.50', 'total_quantity': 40, 'currency_code': 'USD'}})
+
+    api = BrickLinkAPI({}, mock_pool(handler))
+
+    result = await api.get_set_price('75192')
+    await api.get_set_price('75192')
+
+    assert result['avg_price'] == 712.5
+    assert result['checked'] is True
+    assert headers[0].startswith('OAuth ')
+    assert 'oauth_consumer_key="consumer_key"' in headers[0]
+    assert 'oauth_signature=' in headers[0]
+    assert headers[0] != headers[1]
+    assert list(api.get_stats()['endpoints']) == ['/items/SET/{no}/price']
+
+
+def test_api_manager_shares_one_pool():
+    """Every HTTP integration uses the manager's connection pool"""
+
+    pool = HTTPClientPool({})
+    manager = APIManager(http_pool=pool)
+
+    assert all(api.http_pool is pool for api in manager.clients.values())
+    assert manager.get_client_stats() == {}
@@ -0,0 +1,99 @@
+"""
+Tests for the headless browser pool
+"""
+
+import asyncio
+import threading
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+from monitoring.browser_pool import BrowserPool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def pool():
+    pool = BrowserPool({'browser_pool': {'size': 1, 'max_uses': 3}})
+    pool._launch = FakeDriver
+    return pool
+
+
+@pytest.mark.asyncio
+async def test_session_reused_then_recycled(pool):
+    """A session serves max_uses queries before a fresh one is launched"""
+
+    drivers = [await pool.run(lambda driver: driver) for _ in range(4)]
+
+    assert drivers[0] is drivers[1] is drivers[2]
+    assert drivers[0].quit_called
+    assert drivers[3] is not drivers[0]
+    assert pool.get_stats()['launched'] == 2
+
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_crashed_session_replaced(pool):
+    """A driver error recycles the session instead of returning it to the pool"""
+
+    def crash(driver):
+        raise WebDriverException("chrome not reachable")
+
+    first = await pool.run(lambda driver: driver)
+
+    with pytest.raises(WebDriverException):
+        await pool.run(crash)
+
+    second = await pool.run(lambda driver: driver)
+
+    assert first.quit_called
+    assert second is not first
+    assert pool.get_stats()['crashed'] == 1
+
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_query_keeps_its_session_until_the_thread_finishes():
+    """A driver still in use by a cancelled query's thread is not leased to anyone else"""
+
+    pool = BrowserPool({'browser_pool': {'size': 2, 'max_uses': 3}})
+    pool._launch = FakeDriver
+
+    started = threading.Event()
+    release = threading.Event()
+    busy = []
+
+    def slow(driver):
+        busy.append(driver)
+        started.set()
+        release.wait(5)
+        busy.remove(driver)
+        return driver
+
+    def check(driver):
+        return driver, driver in busy
+
+    first = asyncio.ensure_future(pool.run(slow))
+    await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    # Only the free slot is leased while the cancelled query's thread runs
+    results = await asyncio.gather(*(pool.run(check) for _ in range(2)))
+    release.set()
+    results.append(await asyncio.wait_for(pool.run(check), 5))
+
+    assert not any(in_use for _, in_use in results)
+    assert results[0][0] is results[1][0]
+    assert pool.get_stats()['launched'] == 2
+
+    await pool.close()
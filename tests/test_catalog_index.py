@@ -0,0 +1,138 @@
+"""
+Tests for the local catalog index
+"""
+
+import json
+import random
+import time
+
+import pytest
+from monitoring.catalog_index import CatalogIndex, create_catalog_index
+from monitoring.market_scanner import PriceValidator
+
+
+PRODUCTS = [
+    {'asin': 'B075SDMMMV', 'upc': '673419267335', 'set_number': '75192', 'brand': 'LEGO',
+     'title': 'Star Wars Millennium Falcon 75192', 'category': 'lego'},
+    {'asin': 'B07QQ8P13L', 'set_number': '75257', 'brand': 'LEGO',
+     'title': 'Star Wars Millennium Falcon 75257', 'category': 'lego'},
+    {'asin': 'B01N5OKGLH', 'brand': 'Nintendo', 'model': 'Switch',
+     'title': 'Legend of Zelda Breath of the Wild', 'category': 'video_games'},
+    {'asin': 'B0002E1G5C', 'brand': 'Boss', 'model': 'DS-1',
+     'title': 'Distortion Guitar Pedal', 'category': 'musical_instruments'},
+    {'asin': 'B00005N5PF', 'isbn': '0134154363', 'title': 'Calculus Early Transcendentals', 'category': 'books'}
+]
+
+
+@pytest.fixture
+def catalog():
+    return CatalogIndex({}, PRODUCTS)
+
+
+def test_identifier_lookup(catalog):
+    """Exact identifiers resolve directly; ISBN-10s match their ISBN-13"""
+
+    assert catalog.get('upc', '673419267335')['asin'] == 'B075SDMMMV'
+    assert catalog.get('set_number', '75257')['asin'] == 'B07QQ8P13L'
+    assert catalog.get('isbn', '9780134154367')['asin'] == 'B00005N5PF'
+    assert catalog.get('asin', 'b0002e1g5c')['model'] == 'DS-1'
+    assert catalog.get('upc', '000000000000') is None
+
+
+def test_title_match(catalog):
+    """Marketplace titles resolve to the product they name"""
+
+    assert catalog.match('LEGO Millennium Falcon 75192 sealed', 'lego')['asin'] == 'B075SDMMMV'
+    assert catalog.match('Zelda Breath of the Wild Nintendo Switch', 'video_games')['asin'] == 'B01N5OKGLH'
+    assert catalog.match('Boss DS-1 distortion pedal')['asin'] == 'B0002E1G5C'
+
+
+def test_weak_and_ambiguous_titles_are_rejected(catalog):
+    """Without a set number both Falcons score alike, so neither is chosen"""
+
+    assert catalog.match('LEGO Star Wars Millennium Falcon', 'lego') is None
+    assert catalog.match('Vintage oak dresser') is None
+    assert catalog.match('LEGO Millennium Falcon 75192', 'video_games') is None
+
+    stats = catalog.get_stats()
+    assert stats['ambiguous'] == 1
+    assert stats['misses'] == 2
+
+
+def test_load_file_and_factory(tmp_path):
+    """The factory loads JSON lines and returns None without a file"""
+
+    path = tmp_path / 'catalog.jsonl'
+    path.write_text('\n'.join(json.dumps(product) for product in PRODUCTS))
+
+    config = {'catalog': {'enabled': True, 'path': str(path)}}
+    assert len(create_catalog_index(config).products) == len(PRODUCTS)
+
+    config['catalog']['path'] = str(tmp_path / 'missing.jsonl')
+    assert create_catalog_index(config) is None
+    assert create_catalog_index({}) is None
+
+
+def test_title_lookup_is_sub_millisecond():
+    """Title lookups on a 50k-product catalog stay well under a millisecond"""
+
+    rng = random.Random(0)
+    words = [f'word{n}' for n in range(3000)]
+    products = [
+        {'asin': f'B{n:09d}', 'brand': rng.choice(['LEGO', 'Sony', 'Nintendo', 'Fender']),
+         'title': ' '.join(rng.sample(words, 5)) + f' {n}'}
+        for n in range(50000)
+    ]
+    catalog = CatalogIndex({}, products)
+
+    queries = [products[rng.randrange(len(products))] for _ in range(500)]
+
+    started = time.perf_counter()
+    resolved = [catalog.match(f"{product['brand']} {product['title']} like new") for product in queries]
+    elapsed = (time.perf_counter() - started) / len(queries)
+
+    print(f"\n   {elapsed * 1e6:.0f}us per title lookup")
+
+    assert [product['asin'] for product in resolved] == [product['asin'] for product in queries]
+    assert elapsed < 1e-3
+
+
+@pytest.mark.asyncio
+async def test_validator_prices_titles_without_barcodes(catalog, monkeypatch):
+    """A listing with no UPC is priced through the ASIN its title resolves to"""
+
+    monkeypatch.setenv('KEEPA_API_KEY', 'key')
+    validator = PriceValidator({}, catalog=catalog)
+    asins = []
+
+    async def get_amazon_price(asin):
+        asins.append(asin)
+        return {'asin': asin, 'current_price': 400.0, 'source': 'keepa'}
+
+    monkeypatch.setattr(validator, 'get_amazon_price', get_amazon_price)
+
+    result = await validator.validate_opportunity({'title': 'Millennium Falcon 75192 UCS', 'price': 250}, 'lego')
+
+    assert asins == ['B075SDMMMV']
+    assert result['target_price'] == 400.0
+
+
+@pytest.mark.asyncio
+async def test_validator_looks_lego_set_numbers_up_as_set_numbers(catalog, monkeypatch):
+    """A LEGO listing's set number finds its product even when the title is ambiguous"""
+
+    monkeypatch.setenv('KEEPA_API_KEY', 'key')
+    validator = PriceValidator({}, catalog=catalog)
+    asins = []
+
+    async def get_amazon_price(asin):
+        asins.append(asin)
+        return {'asin': asin, 'current_price': 120.0, 'source': 'keepa'}
+
+    monkeypatch.setattr(validator, 'get_amazon_price', get_amazon_price)
+
+    listing = {'title': 'LEGO Star Wars Millennium Falcon', 'price': 60, 'identifier': '75257'}
+    await validator.validate_opportunity(listing, 'lego')
+
+    assert catalog.match(listing['title'], 'lego') is None
+    assert asins == ['B07QQ8P13L']
@@ -0,0 +1,68 @@
+"""
+Tests for cross-marketplace listing deduplication
+"""
+
+import pytest
+from monitoring.deduplication import ListingDeduplicator, normalize_url
+
+
+@pytest.fixture
+def deduplicator():
+    return ListingDeduplicator({'deduplication': {'max_entries': 100}})
+
+
+def test_normalize_url_strips_tracking():
+    """Tracking params, www and trailing slashes don't change identity"""
+
+    assert normalize_url('https://www.facebook.com/marketplace/item/123/?ref=search&utm_source=x') == \
+        normalize_url('http://facebook.com/marketplace/item/123')
+
+
+def test_cross_posted_listing_is_duplicate(deduplicator):
+    """Same item on two marketplaces with a slightly different title and price"""
+
+    listings = [
+        {'title': 'LEGO Star Wars Millennium Falcon 75192 sealed', 'price': 650,
+         'url': 'https://boston.craigslist.org/1.html'},
+        {'title': 'Lego star wars millennium falcon 75192 - sealed!', 'price': 675,
+         'url': 'https://offerup.com/item/detail/99'},
+        {'title': 'LEGO Technic Bugatti Chiron 42083', 'price': 300,
+         'url': 'https://offerup.com/item/detail/100'}
+    ]
+
+    unique = deduplicator.deduplicate(listings)
+
+    assert [item['url'] for item in unique] == [listings[0]['url'], listings[2]['url']]
+    assert deduplicator.get_stats()['near_duplicates'] == 1
+
+
+def test_same_title_different_price_kept(deduplicator):
+    """A much cheaper copy of the same product is a separate opportunity"""
+
+    assert not deduplicator.is_duplicate({'title': 'Calculus Early Transcendentals 8th edition', 'price': 40})
+    assert not deduplicator.is_duplicate({'title': 'Calculus Early Transcendentals 8th edition', 'price': 15})
+
+
+def test_repriced_listing_passes(deduplicator):
+    """A listing the watermark store passes on as re-priced is not dropped by its URL"""
+
+    listing = {'title': 'Fender Stratocaster MIM', 'price': 450, 'url': 'https://offerup.com/item/detail/7'}
+
+    assert not deduplicator.is_duplicate(listing)
+    assert deduplicator.is_duplicate(dict(listing))
+    assert not deduplicator.is_duplicate({**listing, 'price': 380, 'price_changed': True})
+    assert deduplicator.is_duplicate({**listing, 'price': 380})
+
+    stats = deduplicator.get_stats()
+    assert stats['url_duplicates'] == 2
+    assert stats['repriced'] == 1
+    assert stats['indexed'] == 1
+
+
+def test_index_is_bounded(deduplicator):
+    """Oldest entries are evicted once max_entries is reached"""
+
+    for i in range(250):
+        deduplicator.is_duplicate({'title': f'item {i}', 'price': i, 'url': f'https://example.com/{i}'})
+
+    assert deduplicator.get_stats()['indexed'] <= 100
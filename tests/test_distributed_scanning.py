@@ -0,0 +1,112 @@
+"""
+Tests for sharded scanning on Celery with an in-memory broker
+"""
+
+import threading
+
+import httpx
+import pytest
+
+pytest.importorskip('celery')
+
+from celery.contrib.testing.worker import start_worker
+
+from infrastructure.http_pool import HTTPClientPool
+from monitoring.market_scanner import MarketScanner
+from tasks import celery_tasks
+from tasks.result_channel import MemoryResultChannel
+
+
+CONFIG = {
+    'craigslist_locations': ['boston', 'worcester'],
+    'marketplaces': {'craigslist': {'enabled': True, 'rate_limit': {'requests_per_second': 100, 'burst': 10}}},
+    'categories': {'lego': {'enabled': True, 'max_purchase_price': 100}},
+    'incremental_scanning': {'enabled': False},
+    'parse_pool': {'enabled': False}
+}
+
+
+def craigslist_handler(request):
+    location = request.url.host.split('.')[0]
+    keyword = request.url.params['query']
+    pid = f"{location}-{keyword}".replace(' ', '-')
+    return httpx.Response(200, text=(
+        f'<li class="result-row" data-pid="{pid}">'
+        f'<a class="result-title" href="https://{location}.craigslist.org/{pid}.html">{keyword} {location}</a>'
+        f'<span class="result-price">$40</span></li>'
+    ))
+
+
+@pytest.fixture
+def market_scanner():
+    scanner = MarketScanner(CONFIG)
+    scanner.http_pool = HTTPClientPool(CONFIG, transport=httpx.MockTransport(craigslist_handler))
+    for marketplace_scanner in scanner.scanners.values():
+        marketplace_scanner.http_pool = scanner.http_pool
+    return scanner
+
+
+def test_shards_split_by_marketplace_category_and_location(market_scanner):
+    """Craigslist shards per location; routing puts each marketplace on its own queue"""
+
+    shards = market_scanner.shards(['lego'])
+
+    assert shards == [
+        {'marketplace': 'craigslist', 'category': 'lego', 'location': 'boston'},
+        {'marketplace': 'craigslist', 'category': 'lego', 'location': 'worcester'}
+    ]
+    assert celery_tasks.route_task(celery_tasks.scan_marketplace.name, (), shards[0], {}) == {'queue': 'scan.craigslist'}
+
+
+def test_shards_run_on_worker_and_publish_results(market_scanner):
+    """Shards dispatched over the memory broker publish their listings to the channel"""
+
+    app = celery_tasks.celery
+    app.conf.update(broker_url='memory://', result_backend='cache+memory://', broker_connection_retry_on_startup=False)
+
+    channel = MemoryResultChannel()
+    celery_tasks.configure_worker(CONFIG, market_scanner=market_scanner, result_channel=channel)
+
+    shards = market_scanner.shards(['lego'])
+
+    try:
+        with start_worker(app, pool='solo', queues=['scan.craigslist'], perform_ping_check=False):
+            results = celery_tasks.dispatch_scan_shards(shards)
+            summaries = [result.get(timeout=30) for result in results]
+    finally:
+        celery_tasks.configure_worker(None)
+
+    messages = [channel.get(timeout=1) for _ in shards]
+
+    assert sorted(summary['location'] for summary in summaries) == ['boston', 'worcester']
+    assert sorted(message['shard']['location'] for message in messages) == ['boston', 'worcester']
+
+    for message in messages:
+        location = message['shard']['location']
+        assert message['listings']
+        assert all(listing['location'].startswith(location) for listing in message['listings'])
+
+
+
+def test_each_worker_thread_gets_its_own_scanner(monkeypatch):
+    """Threaded pools never share a scanner (and its loop-bound HTTP clients) across threads"""
+
+    monkeypatch.setattr('monitoring.market_scanner.MarketScanner', lambda config: object())
+    celery_tasks.configure_worker(CONFIG)
+    scanners = []
+
+    def worker():
+        scanners.append((celery_tasks._get_market_scanner(), celery_tasks._get_market_scanner()))
+
+    try:
+        threads = [threading.Thread(target=worker) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        celery_tasks.configure_worker(None)
+
+    (first, again), (second, _) = scanners
+    assert first is again
+    assert first is not second
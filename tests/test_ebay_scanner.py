@@ -0,0 +1,61 @@
+"""
+Tests for concurrent eBay Finding API queries
+"""
+
+import sys
+import threading
+import time
+import types
+
+import pytest
+from monitoring.market_scanner import EbayScanner
+
+
+class FakeResponse:
+    def __init__(self, keyword):
+        self.keyword = keyword
+
+    def dict(self):
+        return {'searchResult': {'item': [
+            {'itemId': self.keyword, 'title': self.keyword, 'sellingStatus': {'currentPrice': {'value': '10'}}}
+        ]}}
+
+
+class FakeFinding:
+    """Like ebaysdk's BaseConnection, keeps the last response on the connection itself"""
+
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.response = None
+        self.users = set()
+        FakeFinding.instances.append(self)
+
+    def execute(self, verb, data):
+        self.users.add(threading.get_ident())
+        self.response = FakeResponse(data['keywords'])
+        time.sleep(0.01)
+        return self.response
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_do_not_share_a_connection(monkeypatch):
+    """Each worker thread gets its own connection, so responses never cross"""
+
+    finding = types.ModuleType('ebaysdk.finding')
+    finding.Connection = FakeFinding
+    monkeypatch.setitem(sys.modules, 'ebaysdk', types.ModuleType('ebaysdk'))
+    monkeypatch.setitem(sys.modules, 'ebaysdk.finding', finding)
+    monkeypatch.setattr(EbayScanner, '_connections', threading.local())
+
+    scanner = EbayScanner({'marketplaces': {'ebay': {
+        'rate_limit': {'requests_per_second': 1000, 'burst': 20, 'max_concurrency': 4}
+    }}})
+    keywords = [f'keyword {n}' for n in range(12)]
+
+    results = await scanner.scan('lego', keywords)
+
+    assert sorted(result['title'] for result in results) == sorted(keywords)
+    assert all(result['search_keyword'] == result['title'] for result in results)
+    assert len(FakeFinding.instances) > 1
+    assert all(len(connection.users) == 1 for connection in FakeFinding.instances)
@@ -0,0 +1,81 @@
+"""
+Tests for fee schedules and batch profitability
+
+Run with `pytest tests/test_fees.py -s` to see the per-candidate screening cost.
+"""
+
+import time
+
+import numpy as np
+import pytest
+from utils.fees import FeeEngine
+from utils.helpers import calculate_fees, is_profitable
+
+
+def test_helper_fees_match_schedules():
+    """calculate_fees keeps the Amazon tiers, book closing fee and eBay rates"""
+
+    assert calculate_fees(10.00, 'amazon', 'books') == 6.30
+    assert calculate_fees(30.00, 'amazon', 'lego') == 9.00
+    assert calculate_fees(50.00, 'amazon', 'lego') == 13.50
+    assert calculate_fees(100.00, 'ebay', 'lego') == 16.10
+    assert calculate_fees(100.00, 'mercari', 'lego') == 0.0
+
+    assert is_profitable(10.00, 40.00, 5.00)
+    assert not is_profitable(10.00, 20.00, 5.00)
+
+
+def test_batch_matches_scalar_path():
+    """Each element of a batch equals evaluating that candidate alone"""
+
+    engine = FeeEngine({'categories': {'books': {'min_margin': 0.25}}})
+    source = [5.0, 20.0, 12.0, 0.0]
+    target = [45.0, 24.0, 60.0, 19.99]
+    categories = ['books', 'lego', 'books', 'video_games']
+
+    batch = engine.evaluate(source, target, shipping=[5.0, 5.0, 3.0, 5.0], category=categories)
+
+    for i in range(len(source)):
+        one = engine.evaluate_one(source[i], target[i], [5.0, 5.0, 3.0, 5.0][i], category=categories[i])
+        for key, value in one.items():
+            assert batch[key][i] == pytest.approx(value)
+
+    assert batch['viable'].tolist() == [True, False, True, False]
+    # No source price: ROI is reported as zero rather than infinite
+    assert batch['roi'][3] == 0.0
+
+
+def test_category_margins_and_schedule_overrides():
+    """Category min_margin and configured schedules replace the defaults"""
+
+    engine = FeeEngine({
+        'categories': {'books': {'min_margin': 0.50}},
+        'fees': {'schedules': {'amazon': {'lego': {'referral_rate': 0.08}}}, 'min_profit': 1.0}
+    })
+
+    assert engine.fees(100.0, 'amazon', 'lego')[0] == 8.0
+
+    # $40 books pay 12.30 in fees: buying at 7 leaves a 52% margin, at 9 only 47%
+    assert engine.evaluate_one(7.00, 40.0, 0.0, category='books')['viable']
+    assert not engine.evaluate_one(9.00, 40.0, 0.0, category='books')['viable']
+
+
+def test_batch_screening_benchmark():
+    """Screen a cycle's worth of candidates in one call"""
+
+    engine = FeeEngine()
+    rng = np.random.default_rng(0)
+    count = 50000
+
+    source = rng.uniform(1, 100, count)
+    target = rng.uniform(5, 300, count)
+    categories = rng.choice(['books', 'lego', 'video_games'], count)
+
+    started = time.perf_counter()
+    result = engine.evaluate(source, target, category=categories)
+    elapsed = time.perf_counter() - started
+
+    print(f"\n   {count:,} candidates in {elapsed * 1000:.1f}ms ({elapsed / count * 1e6:.2f}us each)")
+
+    assert result['viable'].shape == (count,)
+    assert elapsed / count < 1e-4
@@ -0,0 +1,51 @@
+"""
+Tests for the pooled HTTP client layer
+"""
+
+import httpx
+import pytest
+from infrastructure.http_pool import HTTPClientPool
+
+
+@pytest.fixture
+def pool():
+    def handler(request):
+        if request.url.host == 'broken.example.com':
+            raise httpx.ConnectError("connection refused")
+        return httpx.Response(200, text='ok')
+
+    return HTTPClientPool({'http_client': {'max_connections_per_host': 4}},
+                          transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_client_reused_per_host(pool):
+    """Same host shares one client, different hosts get their own"""
+
+    first = pool.get_client('https://boston.craigslist.org/search/sss')
+    second = pool.get_client('https://boston.craigslist.org/search/sss?query=lego')
+    other = pool.get_client('https://worcester.craigslist.org/search/sss')
+
+    assert first is second
+    assert first is not other
+
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_stats_recorded(pool):
+    """Requests and errors are counted per host"""
+
+    response = await pool.get('https://boston.craigslist.org/search/sss')
+    assert response.text == 'ok'
+
+    with pytest.raises(httpx.ConnectError):
+        await pool.get('https://broken.example.com/')
+
+    stats = pool.get_stats()
+
+    assert stats['https://boston.craigslist.org']['requests'] == 1
+    assert stats['https://boston.craigslist.org']['errors'] == 0
+    assert stats['https://broken.example.com']['errors'] == 1
+
+    await pool.close()
@@ -0,0 +1,104 @@
+"""
+Tests for identifier extraction and check-digit validation
+
+Run with `pytest tests/test_identifiers.py -s` to see per-title extraction cost.
+"""
+
+import random
+import time
+
+from utils.identifiers import (
+    extract_identifier,
+    extract_identifiers,
+    extract_isbn,
+    extract_upc,
+    is_valid_isbn10,
+    is_valid_isbn13,
+    is_valid_upc,
+    isbn10_to_13,
+    normalize_isbn
+)
+
+
+def test_check_digits():
+    """Known-good identifiers validate; a changed digit does not"""
+
+    assert is_valid_isbn10('0134154363')
+    assert is_valid_isbn10('080442957X')
+    assert is_valid_isbn13('9780134154367')
+    assert is_valid_upc('673419267335')
+
+    assert not is_valid_isbn10('0134154364')
+    assert not is_valid_isbn13('9780134154368')
+    assert not is_valid_upc('673419267336')
+
+
+def test_isbn_normalization():
+    """ISBN-10s become ISBN-13s; separators are dropped"""
+
+    assert isbn10_to_13('0134154363') == '9780134154367'
+    assert normalize_isbn('0-8044-2957-x') == '9780804429573'
+    assert normalize_isbn('978-0-13-415436-7') == '9780134154367'
+    assert normalize_isbn('1234567890') is None
+
+
+def test_extraction_skips_junk_numbers():
+    """Numbers that fail the check digit are passed over for the next candidate"""
+
+    assert extract_isbn('Call 6175551234, ISBN 0134154363') == '9780134154367'
+    assert extract_isbn('Textbook, ISBN 978 0134 154 367') == '9780134154367'
+    assert extract_isbn('Order 9780134154368') is None
+    assert extract_upc('SKU 123456789013 UPC 673419267335') == '673419267335'
+    assert extract_identifier('Algebra ISBN-10: 0134154363 barcode 673419267335', 'books') == '9780134154367'
+    assert extract_identifier('Algebra ISBN-10: 0134154363', 'lego') is None
+
+
+def test_batch_matches_scalar():
+    """extract_identifiers gives the same answer as one call per text"""
+
+    texts = [
+        'Calculus 978-0134154367',
+        'LEGO 75192 sealed upc 673419267335',
+        '',
+        'Physics 0134154364 then 080442957X',
+        'Book with only upc 673419267335',
+        'Nothing here 2021'
+    ]
+    categories = ['books', 'lego', 'books', 'books', 'books', 'video_games']
+
+    expected = [extract_identifier(text, category) for text, category in zip(texts, categories)]
+
+    assert extract_identifiers(texts, categories) == expected
+    assert expected == ['9780134154367', '673419267335', None, '9780804429573', '673419267335', None]
+    assert extract_identifiers(texts, 'books') == [extract_identifier(text, 'books') for text in texts]
+
+
+def test_extraction_benchmark():
+    """Report per-title cost of scalar and batch extraction"""
+
+    rng = random.Random(0)
+    templates = [
+        'Used textbook ISBN {isbn} good condition',
+        'LEGO set {n} sealed box, call 617555{n}',
+        'Nintendo Switch game barcode {upc}',
+        'Vintage guitar pedal, works great, ${n}'
+    ]
+    texts = [
+        rng.choice(templates).format(isbn='978-0134154367', upc='673419267335', n=rng.randint(1000, 9999)) + f' #{i}'
+        for i in range(20000)
+    ]
+
+    started = time.perf_counter()
+    scalar = [extract_identifier(text, 'books') for text in texts]
+    scalar_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batch = extract_identifiers(texts, 'books')
+    batch_elapsed = time.perf_counter() - started
+
+    print(
+        f"\n   scalar: {scalar_elapsed / len(texts) * 1e6:.2f}us/title"
+        f"\n   batch:  {batch_elapsed / len(texts) * 1e6:.2f}us/title"
+    )
+
+    assert batch == scalar
@@ -0,0 +1,67 @@
+"""
+Tests for Keepa lookup micro-batching
+"""
+
+import asyncio
+
+import pytest
+from infrastructure.keepa_batcher import KeepaBatcher
+
+
+class FakeKeepa:
+    """Stands in for keepa.Keepa: records queries, returns one product per ASIN"""
+
+    instances = 0
+
+    def __init__(self, api_key):
+        FakeKeepa.instances += 1
+        self.queries = []
+        self.tokens_left = 100
+
+    def query(self, asins, stats=None, progress_bar=True):
+        self.queries.append(list(asins))
+        self.tokens_left -= len(asins)
+        return [{'asin': asin, 'stats': {'current': [1999]}} for asin in asins if asin != 'MISSING']
+
+
+@pytest.fixture
+def batcher():
+    FakeKeepa.instances = 0
+    return KeepaBatcher({'pricing_sources': {'keepa': {'batch_window_ms': 5}}}, api_key='key', client_factory=FakeKeepa)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_one_query(batcher):
+    """Lookups in the same window go out as one query, duplicates once"""
+
+    asins = ['A1', 'A2', 'A3', 'A1', 'MISSING']
+    products = await asyncio.gather(*[batcher.get_product(asin) for asin in asins])
+
+    assert [product and product['asin'] for product in products] == ['A1', 'A2', 'A3', 'A1', None]
+    assert batcher._client.queries == [['A1', 'A2', 'A3', 'MISSING']]
+    assert batcher.get_stats()['lookups_per_request'] == 5
+
+
+@pytest.mark.asyncio
+async def test_client_is_reused_and_batches_are_capped(batcher):
+    """Over 100 ASINs are split across requests on the same client"""
+
+    await asyncio.gather(*[batcher.get_product(f'B{n}') for n in range(150)])
+    await batcher.get_product('C1')
+
+    assert FakeKeepa.instances == 1
+    assert [len(query) for query in batcher._client.queries] == [100, 50, 1]
+
+
+@pytest.mark.asyncio
+async def test_query_errors_reach_every_waiter(batcher):
+    """A failed batch raises in each caller"""
+
+    def failing(api_key):
+        raise RuntimeError('no tokens')
+
+    batcher.client_factory = failing
+
+    results = await asyncio.gather(batcher.get_product('A1'), batcher.get_product('A2'), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
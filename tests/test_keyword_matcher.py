@@ -0,0 +1,47 @@
+"""
+Tests for the category exclusion matcher
+"""
+
+import random
+
+from monitoring.category_keywords import CategoryKeywords
+
+
+def test_exclusions_match_like_substring_check():
+    """Exclusion reasons agree with the original substring check, in title order"""
+
+    title = 'LEGO Millennium Falcon - missing pieces, no box'
+
+    assert CategoryKeywords.exclusion_reasons(title, 'lego') == ['missing pieces', 'no box']
+    assert CategoryKeywords.should_exclude(title, 'lego')
+    assert not CategoryKeywords.should_exclude(title, 'books')
+    assert CategoryKeywords.should_exclude('Water Damaged textbook', 'Books')
+
+
+def test_get_keywords_does_not_mutate_class_lists():
+    """Repeated calls return the same keywords"""
+
+    first = CategoryKeywords.get_keywords('musical_instruments')
+    second = CategoryKeywords.get_keywords('musical_instruments')
+
+    assert first == second
+    assert 'fender' not in CategoryKeywords.MUSICAL_INSTRUMENTS['primary']
+
+
+def test_should_exclude_agrees_with_original_check():
+    """Precompiled exclusions give the same answers as the per-call term lookup"""
+
+    rng = random.Random(7)
+    words = [term for data in CategoryKeywords.categories().values() for term in data.get('primary', [])]
+    excludes = [term for data in CategoryKeywords.categories().values() for term in data.get('exclude', [])]
+    titles = [' '.join(rng.sample(words, 4)) + ' ' + rng.choice(excludes + ['good condition'] * 4) for _ in range(500)]
+
+    def original(title, category):
+        title_lower = title.lower()
+        return any(term in title_lower for term in CategoryKeywords.get_exclude_terms(category))
+
+    checks = [(title, category) for title in titles for category in CategoryKeywords.categories()]
+    expected = [original(title, category) for title, category in checks]
+
+    assert [CategoryKeywords.should_exclude(title, category) for title, category in checks] == expected
+    assert any(expected) and not all(expected)
@@ -0,0 +1,67 @@
+"""
+Tests for the orchestrator's category scan cycles
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+for module in ('twilio', 'sendgrid', 'stripe'):
+    pytest.importorskip(module)
+
+from main import ArbitrageSystem
+from monitoring.scan_scheduler import CategoryScheduler
+
+
+CONFIG = {'categories': {'books': {'enabled': True, 'priority': 1, 'scan_interval_minutes': 1}}}
+
+
+def system(**attributes):
+    """An ArbitrageSystem with only the parts a scan cycle touches"""
+
+    arbitrage_system = ArbitrageSystem.__new__(ArbitrageSystem)
+    arbitrage_system.config = CONFIG
+    arbitrage_system.scheduler = CategoryScheduler(CONFIG, now=0)
+    arbitrage_system.__dict__.update(attributes)
+    return arbitrage_system
+
+
+@pytest.mark.asyncio
+async def test_failed_dispatch_leaves_categories_due(monkeypatch):
+    """Categories whose shards could not be queued come due again"""
+
+    def broker_down(shards):
+        raise ConnectionError('broker unreachable')
+
+    monkeypatch.setattr('main.dispatch_scan_shards', broker_down)
+    arbitrage_system = system(market_scanner=SimpleNamespace(shards=lambda due: [{'category': name} for name in due]))
+
+    due = arbitrage_system.scheduler.due_categories(now=0)
+    with pytest.raises(ConnectionError):
+        await arbitrage_system.dispatch_due_categories(due)
+
+    assert arbitrage_system.scheduler.in_flight == {}
+    assert arbitrage_system.scheduler.due_categories(now=1) == ['books']
+
+
+@pytest.mark.asyncio
+async def test_failed_stream_cycle_leaves_unfinished_categories_due():
+    """An error mid-stream defers the categories whose scans did not finish"""
+
+    async def stream_categories(categories, on_category_done):
+        yield {'title': 'Calculus 978-0134154367', 'category': 'books'}
+        await asyncio.sleep(10)
+
+    def reject(opp_data, processing):
+        raise ValueError('bad listing')
+
+    arbitrage_system = system(market_scanner=SimpleNamespace(stream_categories=stream_categories))
+    arbitrage_system._accept_listing = reject
+
+    due = arbitrage_system.scheduler.due_categories(now=0)
+    with pytest.raises(ValueError):
+        await arbitrage_system.stream_due_categories(due)
+
+    assert arbitrage_system.scheduler.in_flight == {}
+    assert arbitrage_system.scheduler.due_categories(now=1) == ['books']
@@ -0,0 +1,59 @@
+"""
+Tests for the parse worker pool
+"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from monitoring.html_parsers import PARSER_BACKENDS
+from monitoring.parse_pool import ParsePool
+from utils.helpers import extract_identifier
+
+
+FIXTURE = Path(__file__).parent / 'fixtures' / 'craigslist_search.html'
+
+
+def test_extract_identifier():
+    """ISBNs are only looked for in books, UPCs everywhere"""
+
+    assert extract_identifier('Calculus textbook ISBN 978-0134154367', 'books') == '9780134154367'
+    assert extract_identifier('Calculus textbook ISBN 978-0134154367', 'lego') is None
+    assert extract_identifier('Sealed set upc 673419267335', 'lego') == '673419267335'
+    assert extract_identifier('Lego set', 'lego') is None
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_matches_inline_parser():
+    """Records parsed in worker processes match the inline parser, plus identifiers"""
+
+    markup = FIXTURE.read_bytes()
+    pool = ParsePool({'parse_pool': {'workers': 2}})
+
+    try:
+        await pool.warm_up()
+        pages = await asyncio.gather(*[
+            pool.parse_craigslist(markup, 'lego', limit=120) for _ in range(4)
+        ])
+    finally:
+        await pool.close()
+
+    expected = PARSER_BACKENDS['bs4']().parse_craigslist(markup, limit=120)
+
+    for records in pages:
+        assert [{k: v for k, v in r.items() if k != 'identifier'} for r in records] == expected
+        assert all('identifier' in record for record in records)
+
+    assert pool.get_stats()['pages'] == 4
+
+
+@pytest.mark.asyncio
+async def test_disabled_pool_parses_inline():
+    """With the pool disabled no worker processes are started"""
+
+    pool = ParsePool({'parse_pool': {'enabled': False}})
+    records = await pool.parse_craigslist(FIXTURE.read_bytes(), 'lego', limit=5, stop_at=None)
+
+    assert records
+    assert pool._executor is None
+    assert pool.get_stats()['workers'] == 0
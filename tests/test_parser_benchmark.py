@@ -0,0 +1,75 @@
+"""
+Parser backend correctness and throughput on a recorded Craigslist results page
+
+Run with `pytest tests/test_parser_benchmark.py -s` to see listings/sec per backend.
+"""
+
+import time
+from pathlib import Path
+
+import pytest
+from monitoring.html_parsers import PARSER_BACKENDS, available_backends, get_parser
+
+
+FIXTURE = Path(__file__).parent / 'fixtures' / 'craigslist_search.html'
+
+
+@pytest.fixture(scope='module')
+def page():
+    return FIXTURE.read_bytes()
+
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_backends_agree(page, backend):
+    """Every backend extracts the same records as BeautifulSoup"""
+
+    expected = PARSER_BACKENDS['bs4']().parse_craigslist(page, limit=120)
+    records = PARSER_BACKENDS[backend]().parse_craigslist(page, limit=120)
+
+    assert len(records) > 100
+    assert records == expected
+    # The first row on the page has no price and is skipped
+    assert records[0]['title'] == 'LEGO Star Wars Millennium Falcon 75192'
+    assert records[0]['hood'] == '(Somerville)'
+
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_parsing_stops_at_watermark(page, backend):
+    """Rows from the watermark onwards are not parsed"""
+
+    parser = PARSER_BACKENDS[backend]()
+    everything = parser.parse_craigslist(page, limit=120)
+
+    records = parser.parse_craigslist(page, limit=120, stop_at=everything[5]['listing_id'])
+
+    assert records == everything[:5]
+
+
+def test_get_parser_falls_back():
+    """Unknown or missing backends fall back to the fastest installed one"""
+
+    assert get_parser({'scanning': {'parser_backend': 'bs4'}}).name == 'bs4'
+    assert get_parser({'scanning': {'parser_backend': 'nope'}}).name == available_backends()[0]
+
+
+def test_parse_benchmark(page):
+    """Report listings/sec per backend on the recorded page"""
+
+    iterations = 20
+    report = {}
+
+    for backend in available_backends():
+        parser = PARSER_BACKENDS[backend]()
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            listings = len(parser.parse_craigslist(page, limit=120))
+        elapsed = time.perf_counter() - started
+
+        report[backend] = listings * iterations / elapsed
+
+    print()
+    for backend, rate in sorted(report.items(), key=lambda item: -item[1]):
+        print(f"   {backend:10s}: {rate:10,.0f} listings/sec")
+
+    assert all(rate > 0 for rate in report.values())
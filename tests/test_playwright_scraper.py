@@ -0,0 +1,139 @@
+"""
+Tests for the Playwright context pool and request blocking
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip('playwright')
+
+from monitoring.playwright_scraper import PlaywrightScraper
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self):
+        self.routes = []
+        self.closed = False
+
+    async def route(self, pattern, handler):
+        self.routes.append((pattern, handler))
+
+    async def new_page(self):
+        return FakePage()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+
+    async def new_context(self, **kwargs):
+        context = FakeContext()
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        pass
+
+
+class FakeRequest:
+    def __init__(self, url, resource_type):
+        self.url = url
+        self.resource_type = resource_type
+
+
+class FakeRoute:
+    def __init__(self, url, resource_type='document'):
+        self.request = FakeRequest(url, resource_type)
+        self.outcome = None
+
+    async def abort(self):
+        self.outcome = 'aborted'
+
+    async def continue_(self):
+        self.outcome = 'continued'
+
+
+@pytest.fixture
+def scraper(monkeypatch):
+    scraper = PlaywrightScraper(pool_size=2)
+    launches = []
+
+    async def initialize():
+        await asyncio.sleep(0.01)
+        launches.append(1)
+        scraper.browser = FakeBrowser()
+
+    monkeypatch.setattr(scraper, 'initialize', initialize)
+    scraper.launches = launches
+
+    return scraper
+
+
+@pytest.mark.asyncio
+async def test_parallel_first_leases_launch_one_browser(scraper):
+    """Concurrent leases on a fresh scraper share a single browser"""
+
+    async def lease():
+        async with scraper.lease_page():
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(lease() for _ in range(6)))
+
+    assert len(scraper.launches) == 1
+    # Pages go back to the pool: six leases need only pool_size contexts
+    assert scraper.get_stats()['contexts_created'] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_scrape_recycles_its_page(scraper, monkeypatch):
+    """A page whose scrape raised is replaced; the caller still gets an empty result"""
+
+    pages = []
+
+    async def broken(page, keyword, location, max_results):
+        pages.append(page)
+        raise TimeoutError('selector never appeared')
+
+    monkeypatch.setattr(scraper, '_scrape_facebook_page', broken)
+
+    assert await scraper.scrape_facebook_marketplace('lego', 'boston') == []
+    assert pages[0].closed
+    assert scraper.browser.contexts[0].closed
+
+    async with scraper.lease_page() as page:
+        assert page is not pages[0]
+
+
+@pytest.mark.asyncio
+async def test_block_unneeded_resources_and_trackers():
+    """Images, fonts, media and tracker hosts are aborted; documents and XHR pass"""
+
+    scraper = PlaywrightScraper()
+    routes = [
+        FakeRoute('https://offerup.com/search/?q=lego'),
+        FakeRoute('https://offerup.com/api/search', 'xhr'),
+        FakeRoute('https://images.offerup.com/1.jpg', 'image'),
+        FakeRoute('https://offerup.com/font.woff2', 'font'),
+        FakeRoute('https://www.google-analytics.com/collect', 'script')
+    ]
+
+    for route in routes:
+        await scraper._block_unneeded(route)
+
+    assert [route.outcome for route in routes] == ['continued', 'continued', 'aborted', 'aborted', 'aborted']
+    assert scraper.get_stats()['requests_blocked'] == 3
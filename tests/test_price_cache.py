@@ -0,0 +1,262 @@
+"""
+Tests for the two-tier price cache
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from infrastructure.http_pool import HTTPClientPool
+from infrastructure.price_cache import PriceCache
+from integrations.api_integrations import APIManager
+from monitoring.market_scanner import PriceValidator
+
+
+CONFIG = {
+    'price_cache': {
+        'ttl_seconds': {'default': 100, 'books': 1000},
+        'stale_seconds': 50,
+        'negative_ttl_seconds': 20,
+        'local_max_entries': 2
+    }
+}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class DictRedis:
+    """get/setex over a dict, shared between cache instances like a Redis server"""
+
+    def __init__(self):
+        self.data = {}
+        self.fail = False
+
+    def get(self, key):
+        if self.fail:
+            raise ConnectionError('redis down')
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        if self.fail:
+            raise ConnectionError('redis down')
+        self.data[key] = value
+
+
+class Lookup:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.mark.asyncio
+async def test_fresh_entries_skip_the_lookup(clock):
+    """Within the category TTL the cached price is returned without a call"""
+
+    cache = PriceCache(CONFIG, clock=clock)
+    lookup = Lookup({'price': 10})
+
+    assert await cache.get('keepa', 'A1', 'electronics', lookup) == {'price': 10}
+    clock.now += 99
+    assert await cache.get('keepa', 'A1', 'electronics', lookup) == {'price': 10}
+
+    assert lookup.calls == 1
+    assert cache.get_stats()['hit_rate'] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_refreshing(clock):
+    """Past the TTL the old price comes back at once and one refresh replaces it"""
+
+    cache = PriceCache(CONFIG, clock=clock)
+    lookup = Lookup({'price': 10}, {'price': 12})
+
+    await cache.get('keepa', 'A1', 'electronics', lookup)
+    clock.now += 120
+
+    stale = await asyncio.gather(*[cache.get('keepa', 'A1', 'electronics', lookup) for _ in range(3)])
+    assert stale == [{'price': 10}] * 3
+
+    await cache.close()
+
+    assert lookup.calls == 2
+    assert await cache.get('keepa', 'A1', 'electronics', lookup) == {'price': 12}
+    assert cache.get_stats()['refreshes'] == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_fetched_again(clock):
+    """Beyond the stale window the caller waits for a new lookup"""
+
+    cache = PriceCache(CONFIG, clock=clock)
+    lookup = Lookup({'price': 10}, {'price': 11})
+
+    await cache.get('keepa', 'A1', 'electronics', lookup)
+    clock.now += 151
+
+    assert await cache.get('keepa', 'A1', 'electronics', lookup) == {'price': 11}
+    assert cache.get_stats()['misses'] == 2
+
+
+@pytest.mark.asyncio
+async def test_missing_prices_are_negatively_cached(clock):
+    """None is remembered for the negative TTL; errors and negative=False are not"""
+
+    cache = PriceCache(CONFIG, clock=clock)
+
+    lookup = Lookup(None, {'price': 5})
+    assert await cache.get('bookscouter', '111', 'books', lookup) is None
+    assert await cache.get('bookscouter', '111', 'books', lookup) is None
+    assert lookup.calls == 1
+    assert cache.get_stats()['negative_hits'] == 1
+
+    clock.now += 21
+    assert await cache.get('bookscouter', '111', 'books', lookup) == {'price': 5}
+
+    failing = Lookup(RuntimeError('timeout'), {'price': 7})
+    with pytest.raises(RuntimeError):
+        await cache.get('bookscouter', '222', 'books', failing)
+    assert await cache.get('bookscouter', '222', 'books', failing) == {'price': 7}
+
+    unconfirmed = Lookup(None, {'price': 9})
+    assert await cache.get('reverb', 'fender', 'musical_instruments', unconfirmed, negative=False) is None
+    assert await cache.get('reverb', 'fender', 'musical_instruments', unconfirmed, negative=False) == {'price': 9}
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_is_shared_and_lru_is_bounded(clock):
+    """A second process finds the price in Redis; the local tier evicts the oldest key"""
+
+    redis = DictRedis()
+    first = PriceCache(CONFIG, redis_client=redis, clock=clock)
+    second = PriceCache(CONFIG, redis_client=redis, clock=clock)
+
+    for asin in ['A1', 'A2', 'A3']:
+        await first.get('keepa', asin, 'electronics', Lookup({'asin': asin}))
+
+    assert list(first._local) == ['pricedata:keepa:A2', 'pricedata:keepa:A3']
+
+    lookup = Lookup({'asin': 'never'})
+    assert await second.get('keepa', 'A1', 'electronics', lookup) == {'asin': 'A1'}
+    assert lookup.calls == 0
+    assert second.get_stats()['redis_hits'] == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_outage_falls_back_to_local(clock):
+    """Redis errors do not fail lookups"""
+
+    redis = DictRedis()
+    redis.fail = True
+    cache = PriceCache(CONFIG, redis_client=redis, clock=clock)
+    lookup = Lookup({'price': 10})
+
+    assert await cache.get('keepa', 'A1', 'electronics', lookup) == {'price': 10}
+    assert await cache.get('keepa', 'A1', 'electronics', lookup) == {'price': 10}
+    assert lookup.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_validator_reuses_cached_book_prices(monkeypatch):
+    """Repeat validations of the same ISBN hit BookScouter once"""
+
+    monkeypatch.setenv('BOOKSCOUTER_API_KEY', 'key')
+    validator = PriceValidator({})
+    calls = []
+
+    async def get_book_prices(isbn):
+        calls.append(isbn)
+        return {'isbn': isbn, 'highest_buyback': 40.0, 'source': 'bookscouter'}
+
+    monkeypatch.setattr(validator, 'get_book_prices', get_book_prices)
+
+    listing = {'title': 'Calculus 9780134438986', 'price': 5}
+    first = await validator.validate_opportunity(listing, 'books')
+    second = await validator.validate_opportunity(listing, 'books')
+
+    assert calls == ['9780134438986']
+    assert first == second
+
+
+@pytest.mark.asyncio
+async def test_validator_and_api_manager_cache_their_own_results(monkeypatch):
+    """Raw API results cached by APIManager are never served to the validator, and vice versa"""
+
+    monkeypatch.setenv('KEEPA_API_KEY', 'key')
+    monkeypatch.setenv('BOOKSCOUTER_API_KEY', 'key')
+    cache = PriceCache(CONFIG, redis_client=DictRedis())
+    validator = PriceValidator(CONFIG, price_cache=cache)
+    manager = APIManager(single_flight=validator.single_flight, price_cache=cache)
+
+    async def get_product(asin):
+        return {'asin': asin, 'csv': [], 'stats': {}}
+
+    async def get_prices(isbn):
+        return [{'vendor_name': 'Vendor', 'price': 31.0}]
+
+    async def get_amazon_price(asin):
+        return {'asin': asin, 'current_price': 40.0, 'source': 'keepa'}
+
+    async def get_book_prices(isbn):
+        return {'isbn': isbn, 'highest_buyback': 31.0, 'source': 'bookscouter'}
+
+    manager.keepa.get_product = get_product
+    manager.bookscouter.get_prices = get_prices
+
+    # APIManager fills the cache first; the validator must still get its own shape
+    assert 'csv' in await manager.get_price_data({'asin': 'B075SDMMMV'}, 'lego')
+    assert isinstance(await manager.get_price_data({'isbn': '9780134154367'}, 'books'), list)
+
+    keepa = await validator._lookup_price('keepa', 'B075SDMMMV', 'lego', get_amazon_price)
+    books = await validator._lookup_price('bookscouter', '9780134154367', 'books', get_book_prices)
+
+    assert keepa['current_price'] == 40.0
+    assert books['highest_buyback'] == 31.0
+
+    # And the other way round, now that both are cached
+    assert 'csv' in await manager.get_price_data({'asin': 'B075SDMMMV'}, 'lego')
+    assert isinstance(await manager.get_price_data({'isbn': '9780134154367'}, 'books'), list)
+
+
+@pytest.mark.asyncio
+async def test_validator_does_not_cache_throttled_or_unconfigured_lookups(monkeypatch):
+    """A BookScouter 429 raises instead of caching "no price"; without a key nothing is cached"""
+
+    responses = [httpx.Response(429), httpx.Response(200, json={'prices': [{'vendor_name': 'V', 'price': 12.0}]})]
+    pool = HTTPClientPool({}, transport=httpx.MockTransport(lambda request: responses.pop(0)))
+
+    monkeypatch.setenv('BOOKSCOUTER_API_KEY', 'key')
+    validator = PriceValidator(CONFIG, http_pool=pool, price_cache=PriceCache(CONFIG))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await validator._lookup_price('bookscouter', '9780134154367', 'books', validator.get_book_prices)
+
+    prices = await validator._lookup_price('bookscouter', '9780134154367', 'books', validator.get_book_prices)
+    assert prices['highest_buyback'] == 12.0
+
+    validator.keepa_key = None
+    assert await validator._lookup_price('keepa', 'B075SDMMMV', 'lego', validator.get_amazon_price) is None
+    validator.keepa_key = 'key'
+
+    async def get_amazon_price(asin):
+        return {'asin': asin, 'current_price': 40.0, 'source': 'keepa'}
+
+    keepa = await validator._lookup_price('keepa', 'B075SDMMMV', 'lego', get_amazon_price)
+    assert keepa['current_price'] == 40.0
@@ -0,0 +1,132 @@
+"""
+Tests for hedged, concurrent price resolution
+"""
+
+import asyncio
+
+import pytest
+from integrations.api_integrations import APIManager
+from integrations.price_resolver import PriceResolver, PriceSource
+
+
+def source(name, delay, result=None, error=None):
+    """A PriceSource whose lookup sleeps `delay` seconds then answers (or raises)"""
+
+    async def fetch():
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return result
+
+    return PriceSource(name=name, fetch=fetch, hedge=fetch)
+
+
+def resolver(**settings):
+    return PriceResolver({'price_resolver': settings})
+
+
+@pytest.mark.asyncio
+async def test_first_answer_wins_and_rest_are_cancelled():
+    """A slow vendor does not hold up a fast one"""
+
+    price_resolver = resolver(deadline_seconds=5)
+
+    started = asyncio.get_running_loop().time()
+    result = await price_resolver.resolve([
+        source('bricklink', 2.0, {'price': 90}),
+        source('keepa', 0.01, {'price': 100})
+    ])
+    elapsed = asyncio.get_running_loop().time() - started
+
+    assert result == {'price': 100}
+    assert elapsed < 1.0
+
+
+@pytest.mark.asyncio
+async def test_merge_waits_for_all_and_prefers_priority():
+    """Merge mode returns the highest-priority answer with every answer attached"""
+
+    price_resolver = resolver(mode='merge')
+
+    result = await price_resolver.resolve([
+        source('bricklink', 0.05, {'price': 90}),
+        source('keepa', 0.01, {'price': 100}),
+        source('reverb', 0.01, None)
+    ])
+
+    assert result['price'] == 90
+    assert result['source'] == 'bricklink'
+    assert result['sources'] == {'bricklink': {'price': 90}, 'keepa': {'price': 100}}
+
+
+@pytest.mark.asyncio
+async def test_timeouts_errors_and_deadline():
+    """Failing sources are skipped; nothing usable by the deadline gives None"""
+
+    price_resolver = resolver(deadline_seconds=0.5, source_timeout_seconds={'default': 0.05, 'bricklink': 1})
+
+    result = await price_resolver.resolve([
+        source('tcgplayer', 1.0, {'price': 5}),
+        source('keepa', 0.0, error=RuntimeError('503')),
+        source('bricklink', 0.1, {'price': 7})
+    ])
+    assert result == {'price': 7}
+
+    stats = price_resolver.get_stats()['sources']
+    assert stats['tcgplayer']['timeouts'] == 1
+    assert stats['keepa']['errors'] == 1
+
+    slow = resolver(deadline_seconds=0.05, source_timeout_seconds={'default': 1})
+    assert await slow.resolve([source('reverb', 0.5, {'price': 1})]) is None
+    assert slow.get_stats()['deadline_exceeded'] == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_attempt_is_hedged_after_p95():
+    """With latency history, a straggler gets a second attempt that can win"""
+
+    price_resolver = resolver(hedge_min_samples=5)
+    for _ in range(10):
+        price_resolver._record_latency('keepa', 0.01)
+
+    calls = []
+    delays = iter([1.0, 0.01])
+
+    async def fetch():
+        calls.append('keepa')
+        await asyncio.sleep(next(delays))
+        return {'price': 100}
+
+    result = await price_resolver.resolve([PriceSource('keepa', fetch, hedge=fetch)])
+
+    assert result == {'price': 100}
+    assert calls == ['keepa', 'keepa']
+
+    stats = price_resolver.get_stats()['sources']['keepa']
+    assert stats['hedges'] == 1
+    assert stats['hedge_wins'] == 1
+
+
+@pytest.mark.asyncio
+async def test_api_manager_fans_out_to_category_source_and_keepa():
+    """A LEGO set with an ASIN is priced by BrickLink and Keepa concurrently"""
+
+    manager = APIManager(resolver=resolver(mode='merge'))
+    calls = []
+
+    async def get_set_price(set_number):
+        calls.append('bricklink')
+        return {'avg_price': 80}
+
+    async def get_product(asin):
+        calls.append('keepa')
+        return {'asin': asin}
+
+    manager.bricklink.get_set_price = get_set_price
+    manager.keepa.get_product = get_product
+
+    result = await manager.get_price_data({'set_number': '75192', 'asin': 'B075SDMMMV'}, 'lego')
+
+    assert sorted(calls) == ['bricklink', 'keepa']
+    assert result['avg_price'] == 80
+    assert set(result['sources']) == {'bricklink', 'keepa'}
@@ -0,0 +1,62 @@
+"""
+Tests for per-marketplace rate limiting
+"""
+
+import asyncio
+import time
+
+import pytest
+from infrastructure.rate_limiter import RateLimiter, TokenBucket
+
+
+@pytest.mark.asyncio
+async def test_bucket_allows_burst_then_throttles():
+    """Burst tokens are free, the next one waits for a refill"""
+
+    bucket = TokenBucket(rate=20, burst=3)
+
+    started = time.monotonic()
+    for _ in range(3):
+        assert await bucket.acquire() == 0.0
+    assert time.monotonic() - started < 0.05
+
+    waited = await bucket.acquire()
+    assert waited > 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_caps_concurrency():
+    """No more than max_concurrency requests are in flight at once"""
+
+    limiter = RateLimiter({
+        'marketplaces': {
+            'craigslist': {
+                'rate_limit': {'requests_per_second': 1000, 'burst': 100, 'max_concurrency': 2}
+            }
+        }
+    })
+
+    in_flight = 0
+    peak = 0
+
+    async def query():
+        nonlocal in_flight, peak
+        async with limiter.limit('craigslist'):
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    await asyncio.gather(*(query() for _ in range(10)))
+
+    assert peak == 2
+    assert limiter.get_stats()['craigslist']['requests'] == 10
+
+
+def test_unconfigured_marketplace_uses_default():
+    """Marketplaces without a rate_limit block fall back to the default"""
+
+    limiter = RateLimiter({'marketplaces': {'nextdoor': {'enabled': True}}})
+
+    assert limiter.settings['nextdoor']['requests_per_second'] == 0.5
+    assert limiter.settings['nextdoor']['max_concurrency'] == 1
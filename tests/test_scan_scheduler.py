@@ -0,0 +1,54 @@
+"""
+Tests for the category scan scheduler
+"""
+
+import pytest
+from monitoring.scan_scheduler import CategoryScheduler
+
+
+@pytest.fixture
+def scheduler():
+    config = {
+        'categories': {
+            'books': {'enabled': True, 'priority': 1, 'scan_interval_minutes': 10},
+            'musical_instruments': {'enabled': True, 'priority': 4, 'scan_interval_minutes': 30},
+            'tools': {'enabled': False, 'priority': 10, 'scan_interval_minutes': 60}
+        }
+    }
+    return CategoryScheduler(config, now=0)
+
+
+def test_initial_cycle_in_priority_order(scheduler):
+    """Everything enabled is due at start, highest priority first"""
+
+    assert scheduler.due_categories(now=0) == ['books', 'musical_instruments']
+
+
+def test_categories_follow_own_interval(scheduler):
+    """Books refresh every 10 minutes without dragging instruments along"""
+
+    for name in scheduler.due_categories(now=0):
+        scheduler.mark_scanned(name, now=30)
+
+    assert scheduler.due_categories(now=599) == []
+    assert scheduler.due_categories(now=600) == ['books']
+    scheduler.mark_scanned('books', now=620)
+
+    assert scheduler.due_categories(now=1200) == ['books']
+    scheduler.mark_scanned('books', now=1210)
+
+    assert scheduler.due_categories(now=1800) == ['books', 'musical_instruments']
+
+
+def test_lag_and_defer(scheduler):
+    """Late starts are reported as lag and deferred categories stay due"""
+
+    scheduler.due_categories(now=45)
+    scheduler.defer('musical_instruments', now=50)
+    scheduler.mark_scanned('books', now=60)
+
+    report = scheduler.get_lag_report(now=100)
+
+    assert report['books']['last_lag_seconds'] == 45
+    assert report['musical_instruments']['overdue_seconds'] == 100
+    assert scheduler.due_categories(now=100) == ['musical_instruments']
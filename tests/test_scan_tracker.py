@@ -0,0 +1,175 @@
+"""
+Tests for background Tactical Arbitrage scan tracking
+"""
+
+import asyncio
+
+import pytest
+from integrations.scan_tracker import TacticalScanTracker, create_tactical_scan_tracker
+
+
+class FakeTacticalArbitrage:
+    """Scans whose results grow by `step` products per poll until `total`"""
+
+    def __init__(self, total=5, step=2, fail_polls=0):
+        self.total = total
+        self.step = step
+        self.fail_polls = fail_polls
+        self.produced = {}
+        self.requests = []
+
+    async def start_scan(self, scan_config):
+        scan_id = f"scan-{len(self.produced) + 1}"
+        self.produced[scan_id] = 0
+        return {'success': True, 'scan_id': scan_id, 'status': 'queued'}
+
+    async def get_results_page(self, scan_id, page, page_size):
+        self.requests.append((scan_id, page))
+
+        if self.fail_polls:
+            self.fail_polls -= 1
+            raise RuntimeError('502 Bad Gateway')
+
+        self.produced[scan_id] = min(self.total, self.produced[scan_id] + self.step)
+        products = [
+            {'id': f"{scan_id}-{n}", 'title': f'Product {n}', 'source_price': 10.0 + n, 'asin': f'B{n:09d}'}
+            for n in range(self.produced[scan_id])
+        ][(page - 1) * page_size:page * page_size]
+
+        status = 'completed' if self.produced[scan_id] >= self.total else 'running'
+        return {'status': status, 'products': products}
+
+
+def tracker(api, tmp_path, **settings):
+    config = {'tactical_arbitrage': {
+        'sqlite_path': str(tmp_path / 'scans.db'),
+        'page_size': 2,
+        'poll_initial_seconds': 0.001,
+        'poll_max_seconds': 0.01,
+        **settings
+    }}
+    return TacticalScanTracker(config, api)
+
+
+async def collect(scan_tracker, count):
+    listings = []
+    while len(listings) < count:
+        listings.extend(await scan_tracker.get_batch(1.0))
+    return listings
+
+
+@pytest.mark.asyncio
+async def test_results_stream_page_by_page(tmp_path):
+    """Every product of a growing scan is streamed exactly once, shaped as a listing"""
+
+    api = FakeTacticalArbitrage(total=5, step=2)
+    scan_tracker = tracker(api, tmp_path)
+
+    scan_id = await scan_tracker.submit({'source': 'walmart'}, 'lego', name='walmart-lego')
+    listings = await collect(scan_tracker, 5)
+    await asyncio.sleep(0.05)
+
+    assert [listing['listing_id'] for listing in listings] == [f'{scan_id}-{n}' for n in range(5)]
+    assert listings[0]['marketplace'] == 'tactical_arbitrage'
+    assert listings[0]['category'] == 'lego'
+    assert listings[0]['price'] == 10.0
+    assert listings[0]['asin'] == 'B000000000'
+
+    stats = scan_tracker.get_stats()
+    assert stats['completed'] == 1
+    assert stats['pages'] == 2
+    assert stats['tracking'] == 0
+
+    await scan_tracker.close()
+
+
+@pytest.mark.asyncio
+async def test_many_scans_tracked_at_once(tmp_path):
+    """Outstanding scans are polled concurrently, and failed polls back off and retry"""
+
+    api = FakeTacticalArbitrage(total=3, step=1, fail_polls=2)
+    scan_tracker = tracker(api, tmp_path)
+
+    for n in range(4):
+        await scan_tracker.submit({}, 'video_games', name=f'scan-{n}')
+
+    listings = await collect(scan_tracker, 12)
+    await asyncio.sleep(0.05)
+
+    assert len({listing['listing_id'] for listing in listings}) == 12
+    assert scan_tracker.get_stats()['errors'] == 2
+    assert scan_tracker.get_stats()['completed'] == 4
+
+    await scan_tracker.close()
+
+
+@pytest.mark.asyncio
+async def test_tracked_scans_resume_after_restart(tmp_path):
+    """A scan interrupted mid-way carries on from its saved page and offset"""
+
+    api = FakeTacticalArbitrage(total=6, step=2)
+    first = tracker(api, tmp_path, page_size=3, poll_initial_seconds=5, poll_max_seconds=5)
+
+    scan_id = await first.submit({}, 'lego')
+    before = await collect(first, 2)
+    await first.close()
+
+    second = tracker(api, tmp_path, page_size=3)
+    assert second.resume() == 1
+
+    after = await collect(second, 4)
+
+    assert [listing['listing_id'] for listing in before + after] == [f'{scan_id}-{n}' for n in range(6)]
+    # Two of page 1's products were sent before the stop; only the rest of it is sent after
+    assert api.requests == [(scan_id, 1), (scan_id, 1), (scan_id, 2), (scan_id, 3)]
+
+    await second.close()
+
+
+@pytest.mark.asyncio
+async def test_configured_scans_submitted_once_per_interval(tmp_path):
+    """A scheduled scan is not resubmitted while running or before its interval"""
+
+    api = FakeTacticalArbitrage(total=1, step=1)
+    scans = [{'name': 'clearance', 'category': 'lego', 'config': {'source': 'target'}}]
+    scan_tracker = tracker(api, tmp_path, scans=scans, submit_interval_minutes=60)
+
+    assert await scan_tracker.submit_due() == 1
+    assert await scan_tracker.submit_due() == 0
+
+    await collect(scan_tracker, 1)
+    await asyncio.sleep(0.05)
+    assert await scan_tracker.submit_due() == 0
+
+    await scan_tracker.close()
+
+    assert create_tactical_scan_tracker({}, api) is None
+
+
+@pytest.mark.asyncio
+async def test_failed_start_waits_for_the_interval(tmp_path):
+    """A scan that could not be started is not resubmitted on every pass"""
+
+    class Unconfigured(FakeTacticalArbitrage):
+        async def start_scan(self, scan_config):
+            self.requests.append('start')
+            return {'success': False, 'error': 'API key not configured'}
+
+    now = [1000.0]
+    api = Unconfigured()
+    scans = [{'name': 'clearance', 'category': 'lego'}]
+    scan_tracker = TacticalScanTracker({'tactical_arbitrage': {
+        'sqlite_path': str(tmp_path / 'scans.db'), 'scans': scans, 'submit_interval_minutes': 60
+    }}, api, clock=lambda: now[0])
+
+    assert await scan_tracker.submit_due() == 0
+    assert await scan_tracker.submit_due() == 0
+    assert api.requests == ['start']
+
+    now[0] += 3600
+    assert await scan_tracker.submit_due() == 0
+    assert api.requests == ['start', 'start']
+    assert scan_tracker.get_stats()['start_failures'] == 2
+    assert scan_tracker.resume() == 0
+
+    await scan_tracker.close()
@@ -0,0 +1,107 @@
+"""
+Tests for the batched MongoDB Scrapy pipeline
+"""
+
+import pytest
+
+pytest.importorskip('scrapy')
+
+from twisted.internet import defer, task
+
+from monitoring import scrapy_pipelines
+from monitoring.scrapy_pipelines import MongoBatchPipeline
+
+
+class FakeMongo:
+    """Records insert_batch calls; optionally fails some documents"""
+
+    def __init__(self, failures: int = 0):
+        self.batches = []
+        self.failures = failures
+
+    def insert_batch(self, collection, documents):
+        self.batches.append((collection, len(documents)))
+        return len(documents) - self.failures
+
+
+def item(n):
+    return {'marketplace': 'craigslist', 'listing_id': str(n), 'title': f'Lego {n}', 'price': 20.0, 'category': 'lego'}
+
+
+def make_pipeline(mongo, **kwargs):
+    clock = task.Clock()
+    pipeline = MongoBatchPipeline(mongo=mongo, clock=clock, **kwargs)
+    # Run writes inline; tests control completion through the returned deferreds
+    pipeline._run_in_thread = lambda func, *args: defer.maybeDeferred(func, *args)
+    pipeline.open_spider(None)
+    return pipeline, clock
+
+
+def test_flushes_by_size_and_time():
+    """Full batches flush immediately, partial batches on the timer"""
+
+    mongo = FakeMongo()
+    pipeline, clock = make_pipeline(mongo, batch_size=3, flush_interval=2.0)
+
+    for n in range(4):
+        pipeline.process_item(item(n), None)
+
+    assert mongo.batches == [('raw_listings', 3), ('price_scrapes', 3)]
+
+    clock.advance(2.0)
+
+    assert mongo.batches[2:] == [('raw_listings', 1), ('price_scrapes', 1)]
+
+    stats = pipeline.get_stats()
+    assert stats['items'] == 4 and stats['flushes'] == 2 and stats['documents_written'] == 8
+
+
+def test_backpressure_holds_items_while_writes_are_pending():
+    """Items wait once max_pending_flushes writes are in flight"""
+
+    writes = []
+    pipeline, _ = make_pipeline(FakeMongo(), batch_size=1, max_pending_flushes=1)
+    pipeline._run_in_thread = lambda func, *args: writes.append(defer.Deferred()) or writes[-1]
+
+    result = pipeline.process_item(item(1), None)
+
+    assert isinstance(result, defer.Deferred) and not result.called
+    assert pipeline.get_stats()['pending_flushes'] == 1
+
+    writes[0].callback(None)
+
+    assert result.called
+    assert pipeline.get_stats()['pending_flushes'] == 0
+
+
+def test_close_flushes_remaining_items_and_counts_errors():
+    """Closing the spider writes what is buffered and records partial failures"""
+
+    mongo = FakeMongo(failures=1)
+    pipeline, _ = make_pipeline(mongo, batch_size=100)
+
+    pipeline.process_item(item(1), None)
+    pipeline.process_item(item(2), None)
+    pipeline.close_spider(None)
+
+    stats = pipeline.get_stats()
+    assert mongo.batches == [('raw_listings', 2), ('price_scrapes', 2)]
+    assert stats['documents_written'] == 2 and stats['write_errors'] == 2
+    assert stats['buffered'] == 0
+
+
+def test_crawls_share_one_mongo_connection(monkeypatch):
+    """Pipelines opened without a manager reuse the process-wide one"""
+
+    created = []
+    monkeypatch.setattr(scrapy_pipelines, '_shared_mongo', None)
+    monkeypatch.setattr(scrapy_pipelines, 'MongoDBManager', lambda: created.append(FakeMongo()) or created[-1])
+    monkeypatch.setattr(MongoBatchPipeline, '_run_in_thread', lambda self, func, *args: defer.maybeDeferred(func, *args))
+
+    pipelines = [MongoBatchPipeline(clock=task.Clock()) for _ in range(3)]
+    for pipeline in pipelines:
+        pipeline.open_spider(None)
+        pipeline.close_spider(None)
+
+    assert len(created) == 1
+    assert all(pipeline.mongo is created[0] for pipeline in pipelines)
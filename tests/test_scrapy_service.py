@@ -0,0 +1,71 @@
+"""
+Tests for the persistent Scrapy crawl worker
+"""
+
+import threading
+from functools import partial
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('scrapy')
+
+from monitoring.scrapy_spider import ScrapyCrawlService
+
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server(tmp_path_factory):
+    # Paths contain craigslist.org so the spider routes them to the Craigslist parser
+    page = (FIXTURES / 'craigslist_search.html').read_bytes()
+    root = tmp_path_factory.mktemp('site')
+    (root / 'craigslist.org').mkdir()
+    for name in ('boston', 'worcester'):
+        (root / 'craigslist.org' / f'{name}.html').write_bytes(page)
+
+    httpd = HTTPServer(('127.0.0.1', 0), partial(QuietHandler, directory=str(root)))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    yield f'http://127.0.0.1:{httpd.server_port}/craigslist.org'
+
+    httpd.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_worker_streams_items_across_batches(server):
+    """One worker process serves several batches, streaming items back"""
+
+    service = ScrapyCrawlService({
+        'scrapy': {
+            'concurrent_requests': 4,
+            'download_delay': 0,
+            'log_level': 'ERROR',
+            'settings': {'ROBOTSTXT_OBEY': False, 'HTTPCACHE_ENABLED': False, 'AUTOTHROTTLE_ENABLED': False}
+        }
+    })
+
+    try:
+        first = [item async for item in service.crawl([f'{server}/boston.html'], 'lego')]
+        pid = service._process.pid
+
+        second = [item async for item in service.crawl(
+            [f'{server}/boston.html', f'{server}/worcester.html'], 'lego'
+        )]
+    finally:
+        await service.close()
+
+    assert len(first) > 100
+    assert len(second) == 2 * len(first)
+    assert first[0]['marketplace'] == 'craigslist' and first[0]['category'] == 'lego'
+
+    stats = service.get_stats()
+    assert stats['worker_starts'] == 1 and stats['jobs_completed'] == 2
+    assert pid is not None and not service.running
@@ -0,0 +1,146 @@
+"""
+Tests for single-flight coalescing of price lookups
+"""
+
+import asyncio
+
+import pytest
+from infrastructure.single_flight import SingleFlight
+from integrations.api_integrations import APIManager
+from monitoring.market_scanner import PriceValidator
+
+
+class SlowLookup:
+    """Counts calls; each call waits until released"""
+
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.result = result
+        self.error = error
+        self.release = asyncio.Event()
+
+    async def __call__(self, identifier):
+        self.calls += 1
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return {'identifier': identifier, **(self.result or {})}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    """Callers for the same key get one execution; other keys run separately"""
+
+    flight = SingleFlight()
+    lookup = SlowLookup(result={'price': 12.5})
+
+    calls = [flight.do(('bookscouter', isbn), lookup, isbn) for isbn in ['111', '111', '111', '222']]
+    pending = asyncio.gather(*calls)
+    await asyncio.sleep(0)
+    lookup.release.set()
+    results = await pending
+
+    assert lookup.calls == 2
+    assert [result['identifier'] for result in results] == ['111', '111', '111', '222']
+
+    stats = flight.get_stats()['bookscouter']
+    assert stats['calls'] == 4
+    assert stats['executions'] == 2
+    assert stats['coalesced'] == 2
+    assert stats['coalesce_rate'] == 0.5
+    assert stats['in_flight'] == 0
+
+
+@pytest.mark.asyncio
+async def test_finished_calls_are_not_cached():
+    """A lookup after the first completes issues a fresh call"""
+
+    flight = SingleFlight()
+    lookup = SlowLookup()
+    lookup.release.set()
+
+    await flight.do(('keepa', 'A1'), lookup, 'A1')
+    await flight.do(('keepa', 'A1'), lookup, 'A1')
+
+    assert lookup.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller():
+    """A failed call raises in each waiting caller and is counted once"""
+
+    flight = SingleFlight()
+    lookup = SlowLookup(error=RuntimeError('rate limited'))
+
+    pending = asyncio.gather(*[flight.do(('keepa', 'A1'), lookup, 'A1') for _ in range(3)], return_exceptions=True)
+    await asyncio.sleep(0)
+    lookup.release.set()
+    results = await pending
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.get_stats()['keepa']['errors'] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_others():
+    """Cancelling one waiter leaves the shared call running for the rest"""
+
+    flight = SingleFlight()
+    lookup = SlowLookup(result={'price': 3.0})
+
+    first = asyncio.create_task(flight.do(('keepa', 'A1'), lookup, 'A1'))
+    second = asyncio.create_task(flight.do(('keepa', 'A1'), lookup, 'A1'))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    lookup.release.set()
+
+    assert (await second)['price'] == 3.0
+    assert first.cancelled()
+    assert lookup.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_api_manager_coalesces_price_data():
+    """Concurrent get_price_data calls for one set number hit BrickLink once"""
+
+    manager = APIManager()
+    lookup = SlowLookup(result={'avg_price': 80})
+    manager.bricklink.get_set_price = lookup
+
+    pending = asyncio.gather(*[manager.get_price_data({'set_number': '75192'}, 'lego') for _ in range(5)])
+    await asyncio.sleep(0)
+    lookup.release.set()
+    results = await pending
+
+    assert lookup.calls == 1
+    assert all(result['avg_price'] == 80 for result in results)
+    assert manager.single_flight.get_stats()['api:bricklink']['coalesced'] == 4
+
+
+@pytest.mark.asyncio
+async def test_validator_and_api_manager_keep_their_own_results(monkeypatch):
+    """Overlapping lookups for one ASIN never hand raw Keepa products to the validator"""
+
+    monkeypatch.setenv('KEEPA_API_KEY', 'key')
+    validator = PriceValidator({})
+    manager = APIManager(single_flight=validator.single_flight)
+
+    normalized = SlowLookup(result={'current_price': 40.0, 'source': 'keepa'})
+    raw = SlowLookup(result={'csv': [], 'stats': {}})
+    validator.get_amazon_price = normalized
+    manager.keepa.get_product = raw
+
+    pending = asyncio.gather(
+        validator._lookup_price('keepa', 'B075SDMMMV', 'lego', validator.get_amazon_price),
+        manager.get_price_data({'asin': 'B075SDMMMV'}, 'lego')
+    )
+    await asyncio.sleep(0)
+    normalized.release.set()
+    raw.release.set()
+    validator_result, manager_result = await pending
+
+    assert validator_result['current_price'] == 40.0
+    assert 'csv' in manager_result
+    assert normalized.calls == raw.calls == 1
@@ -0,0 +1,81 @@
+"""
+Tests for streaming scan results out of MarketScanner
+"""
+
+import asyncio
+
+import pytest
+from monitoring.market_scanner import MarketScanner, MarketplaceScanner
+
+
+class DelayedScanner(MarketplaceScanner):
+    """Each keyword query returns one listing after `delays[keyword]` seconds"""
+
+    marketplace = 'craigslist'
+
+    def __init__(self, config, delays):
+        super().__init__(config)
+        self.delays = delays
+
+    async def scan(self, category, keywords):
+        return await self._gather_queries([self._scan_query(category, keyword) for keyword in keywords])
+
+    async def _scan_query(self, category, keyword):
+        await asyncio.sleep(self.delays.get(keyword, 0))
+        return [{'title': keyword, 'price': self.delays.get(keyword, 0) * 100, 'category': category}]
+
+
+@pytest.fixture
+def market_scanner(monkeypatch):
+    config = {'marketplaces': {}, 'incremental_scanning': {'enabled': False}, 'parse_pool': {'enabled': False}}
+    scanner = MarketScanner(config)
+
+    scanner.scanners = {'fake': DelayedScanner(config, {'fast': 0, 'slow': 0.5})}
+    monkeypatch.setattr(scanner, '_get_category_keywords', lambda category: ['slow', 'fast'])
+
+    return scanner
+
+
+@pytest.mark.asyncio
+async def test_listings_stream_before_slow_queries_finish(market_scanner):
+    """The fast query's listing is yielded before the slow query returns"""
+
+    done = []
+    stream = market_scanner.stream_categories({'lego': {'max_purchase_price': 500}}, lambda name, error: done.append(name))
+
+    started = asyncio.get_running_loop().time()
+    first = await stream.__anext__()
+
+    assert first['title'] == 'fast'
+    assert asyncio.get_running_loop().time() - started < 0.25
+    assert done == []
+
+    rest = [listing async for listing in stream]
+
+    assert [listing['title'] for listing in rest] == ['slow']
+    assert done == ['lego']
+
+
+@pytest.mark.asyncio
+async def test_streamed_listings_are_price_filtered(market_scanner):
+    """Listings above the category's max price are not streamed"""
+
+    listings = [
+        listing async for listing in market_scanner.stream_categories({'lego': {'max_purchase_price': 10}})
+    ]
+
+    assert [listing['title'] for listing in listings] == ['fast']
+
+
+@pytest.mark.asyncio
+async def test_closing_stream_cancels_scans(market_scanner):
+    """Closing the stream early cancels running scans without reporting them done"""
+
+    done = []
+    stream = market_scanner.stream_categories({'lego': {}}, lambda name, error: done.append(name))
+
+    await stream.__anext__()
+    await stream.aclose()
+    await asyncio.sleep(0.6)
+
+    assert done == []
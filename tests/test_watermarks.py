@@ -0,0 +1,105 @@
+"""
+Tests for incremental scanning watermarks
+"""
+
+import httpx
+import pytest
+from infrastructure.http_pool import HTTPClientPool
+from monitoring.market_scanner import CraigslistScanner
+from monitoring.watermarks import RedisWatermarkStore, SQLiteWatermarkStore
+
+
+def craigslist_page(post_ids, price=20):
+    rows = ''.join(
+        f'<li class="result-row" data-pid="{pid}">'
+        f'<a class="result-title" href="https://boston.craigslist.org/{pid}.html">Lego set {pid}</a>'
+        f'<span class="result-price">${price}</span></li>'
+        for pid in post_ids
+    )
+    return f'<ul class="rows">{rows}</ul>'
+
+
+@pytest.fixture
+def store():
+    store = SQLiteWatermarkStore(':memory:')
+    yield store
+    store.close()
+
+
+def test_filter_new_passes_unseen_and_repriced(store):
+    """Seen listings at the same price are dropped, price changes pass through"""
+
+    listings = [{'listing_id': '1', 'price': 20}, {'listing_id': '2', 'price': 30}]
+
+    assert len(store.filter_new('craigslist', listings)) == 2
+    assert store.filter_new('craigslist', listings) == []
+
+    repriced = store.filter_new('craigslist', [{'listing_id': '2', 'price': 25}])
+
+    assert len(repriced) == 1
+    assert repriced[0]['previous_price'] == 30
+
+
+@pytest.mark.asyncio
+async def test_craigslist_stops_at_watermark(store):
+    """Second cycle only parses posts newer than the previous newest post"""
+
+    pages = [craigslist_page(['103', '102', '101']), craigslist_page(['105', '104', '103', '102', '101'])]
+
+    def handler(request):
+        return httpx.Response(200, text=pages.pop(0))
+
+    config = {
+        'craigslist_locations': ['boston'],
+        'marketplaces': {'craigslist': {'rate_limit': {'requests_per_second': 100, 'burst': 10}}}
+    }
+    pool = HTTPClientPool(config, transport=httpx.MockTransport(handler))
+    scanner = CraigslistScanner(config, pool, watermarks=store)
+
+    first = await scanner.scan('lego', ['lego set'])
+    second = await scanner.scan('lego', ['lego set'])
+
+    assert [item['listing_id'] for item in first] == ['103', '102', '101']
+    assert [item['listing_id'] for item in second] == ['105', '104']
+    assert store.get_watermark('craigslist', 'lego set', 'boston') == '105'
+
+    await pool.close()
+
+
+class ExpiringRedis:
+    """mget/set-with-ex over a dict with a controllable clock"""
+
+    def __init__(self):
+        self.data = {}
+        self.now = 0.0
+
+    def mget(self, keys):
+        entries = [self.data.get(key, (None, 0)) for key in keys]
+        return [value if expires > self.now else None for value, expires in entries]
+
+    def set(self, key, value, ex=None):
+        self.data[key] = (str(value), self.now + ex)
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+
+def test_redis_seen_listings_expire_individually():
+    """A listing not seen for retention_days is forgotten even while others keep being written"""
+
+    redis_client = ExpiringRedis()
+    store = RedisWatermarkStore(retention_days=1, redis_client=redis_client)
+
+    listing = {'listing_id': 'old', 'price': 20}
+    assert store.filter_new('craigslist', [listing]) == [listing]
+
+    # Other listings keep arriving; they must not keep 'old' alive
+    for hour in range(1, 30):
+        redis_client.now = hour * 3600
+        store.filter_new('craigslist', [{'listing_id': f'new-{hour}', 'price': 5}])
+
+    assert store.filter_new('craigslist', [listing]) == [listing]
+    assert store.filter_new('craigslist', [listing]) == []
@@ -0,0 +1,179 @@
+"""
+Fee Schedules and Batch Profitability
+One source of truth for marketplace fees, vectorized with NumPy for screening whole scan cycles
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+
+@dataclass(frozen=True)
+class FeeSchedule:
+    """Fees charged by one marketplace for one category"""
+    referral_rate: float = 0.0
+    fixed_fee: float = 0.0
+    payment_rate: float = 0.0
+    payment_fixed: float = 0.0
+    # Fulfillment fee by sale price tier: fees[i] applies below breaks[i], the last one above
+    fulfillment_breaks: Tuple[float, ...] = ()
+    fulfillment_fees: Tuple[float, ...] = (0.0,)
+
+    def fees(self, prices: np.ndarray) -> np.ndarray:
+        """Total fees on each sale price, rounded to cents"""
+
+        tiers = np.searchsorted(self.fulfillment_breaks, prices, side='right')
+        fulfillment = np.asarray(self.fulfillment_fees, dtype=float)[tiers]
+
+        fees = prices * (self.referral_rate + self.payment_rate) + self.fixed_fee + self.payment_fixed + fulfillment
+
+        return np.round(fees, 2)
+
+
+# FBA fulfillment estimate by sale price: < $20, < $50, $50+
+FBA_TIERS = {'fulfillment_breaks': (20.0, 50.0), 'fulfillment_fees': (3.00, 4.50, 6.00)}
+
+# marketplace -> category -> schedule; 'default' covers categories without their own row
+DEFAULT_SCHEDULES: Dict[str, Dict[str, FeeSchedule]] = {
+    'amazon': {
+        'books': FeeSchedule(referral_rate=0.15, fixed_fee=1.80, **FBA_TIERS),
+        'default': FeeSchedule(referral_rate=0.15, **FBA_TIERS)
+    },
+    'ebay': {
+        # 12.9% final value fee plus 2.9% + $0.30 payment processing
+        'default': FeeSchedule(referral_rate=0.129, payment_rate=0.029, payment_fixed=0.30)
+    }
+}
+
+NO_FEES = FeeSchedule()
+
+
+class FeeEngine:
+    """
+    Fee and profitability calculator
+
+    `evaluate` takes arrays of source prices, target (resale) prices and
+    shipping estimates and returns fees, profit, margin, ROI and
+    viability for every candidate at once. Categories can be a single
+    name or one per candidate; each distinct schedule is applied to its
+    slice of the arrays. The scalar helpers run through the same code.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or {}
+        fee_config = config.get('fees', {})
+
+        self.min_margin = fee_config.get('min_margin', 0.20)
+        # Categories may set a stricter or looser margin than the default
+        self.category_margins = {
+            name: category['min_margin']
+            for name, category in config.get('categories', {}).items()
+            if 'min_margin' in category
+        }
+        self.min_profit = fee_config.get('min_profit', 10.0)
+        self.default_shipping = fee_config.get('default_shipping', 5.00)
+
+        self.schedules = {marketplace: dict(rows) for marketplace, rows in DEFAULT_SCHEDULES.items()}
+
+        for marketplace, rows in fee_config.get('schedules', {}).items():
+            for category, fields in rows.items():
+                fields = dict(fields)
+                for tier_field in ('fulfillment_breaks', 'fulfillment_fees'):
+                    if tier_field in fields:
+                        fields[tier_field] = tuple(fields[tier_field])
+                self.schedules.setdefault(marketplace, {})[category] = FeeSchedule(**fields)
+
+    def schedule(self, marketplace: str, category: str) -> FeeSchedule:
+        rows = self.schedules.get(marketplace)
+        if not rows:
+            return NO_FEES
+
+        return rows.get(category) or rows.get('default', NO_FEES)
+
+    def margin_floor(self, category: Union[str, Sequence[str]]) -> Union[float, np.ndarray]:
+        """Minimum margin for a category, or for each candidate's category"""
+
+        if isinstance(category, str):
+            return self.category_margins.get(category, self.min_margin)
+
+        return np.array([self.category_margins.get(str(name), self.min_margin) for name in category])
+
+    def fees(self,
+             prices: ArrayLike,
+             marketplace: str = 'amazon',
+             category: Union[str, Sequence[str]] = 'default') -> np.ndarray:
+        """Fees on each sale price"""
+
+        prices = np.atleast_1d(np.asarray(prices, dtype=float))
+
+        if isinstance(category, str):
+            return self.schedule(marketplace, category).fees(prices)
+
+        categories = np.asarray(category)
+        fees = np.empty_like(prices)
+
+        for name in np.unique(categories):
+            mask = categories == name
+            fees[mask] = self.schedule(marketplace, str(name)).fees(prices[mask])
+
+        return fees
+
+    def evaluate(self,
+                 source_prices: ArrayLike,
+                 target_prices: ArrayLike,
+                 shipping: Optional[ArrayLike] = None,
+                 marketplace: str = 'amazon',
+                 category: Union[str, Sequence[str]] = 'default',
+                 min_margin: Optional[float] = None,
+                 min_profit: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """Fees, profit, margin, ROI and viability for each candidate"""
+
+        source = np.atleast_1d(np.asarray(source_prices, dtype=float))
+        target = np.atleast_1d(np.asarray(target_prices, dtype=float))
+        shipping = np.broadcast_to(
+            np.asarray(self.default_shipping if shipping is None else shipping, dtype=float), target.shape
+        )
+
+        fees = self.fees(target, marketplace, category)
+        total_cost = source + fees + shipping
+        profit = target - total_cost
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            margin = np.where(target > 0, profit / target, 0.0)
+            roi = np.where(source > 0, profit / source, 0.0)
+
+        min_margin = self.margin_floor(category) if min_margin is None else min_margin
+        min_profit = self.min_profit if min_profit is None else min_profit
+
+        return {
+            'fees': fees,
+            'shipping': shipping,
+            'total_cost': total_cost,
+            'profit': profit,
+            'margin': margin,
+            'roi': roi,
+            'viable': (margin >= min_margin) & (profit >= min_profit)
+        }
+
+    def evaluate_one(self,
+                     source_price: float,
+                     target_price: float,
+                     shipping: Optional[float] = None,
+                     marketplace: str = 'amazon',
+                     category: str = 'default') -> Dict:
+        """`evaluate` for a single candidate, as plain floats"""
+
+        result = self.evaluate(source_price, target_price, shipping, marketplace, category)
+
+        return {
+            key: bool(values[0]) if key == 'viable' else float(values[0])
+            for key, values in result.items()
+        }
+
+
+# Engine with the built-in schedules, used by the helper functions
+DEFAULT_FEE_ENGINE = FeeEngine()
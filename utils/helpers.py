@@ -6,64 +6,15 @@ import re
 from typing import Optional
 from datetime import datetime, timedelta
 
-
-def extract_isbn(text: str) -> Optional[str]:
-    """Extract ISBN from text"""
-    
-    # ISBN-13 pattern
-    isbn13_pattern = r'97[89][-\s]?(?:\d[-\s]?){9}\d'
-    match = re.search(isbn13_pattern, text)
-    if match:
-        return re.sub(r'[-\s]', '', match.group())
-    
-    # ISBN-10 pattern
-    isbn10_pattern = r'(?:\d[-\s]?){9}[\dXx]'
-    match = re.search(isbn10_pattern, text)
-    if match:
-        return re.sub(r'[-\s]', '', match.group())
-    
-    return None
-
-
-def extract_upc(text: str) -> Optional[str]:
-    """Extract UPC from text"""
-    
-    upc_pattern = r'\b\d{12}\b'
-    match = re.search(upc_pattern, text)
-    if match:
-        return match.group()
-    
-    return None
+from utils.fees import DEFAULT_FEE_ENGINE
+# Identifier extraction lives in utils.identifiers; re-exported for existing callers
+from utils.identifiers import extract_identifier, extract_isbn, extract_upc
 
 
 def calculate_fees(price: float, marketplace: str, category: str) -> float:
     """Calculate marketplace fees"""
     
-    fees = 0.0
-    
-    if marketplace == 'amazon':
-        # Amazon referral fees
-        if category == 'books':
-            fees = 1.80 + (price * 0.15)  # $1.80 + 15%
-        else:
-            fees = price * 0.15  # 15% referral fee
-        
-        # FBA fulfillment fees (estimated)
-        if price < 20:
-            fees += 3.00
-        elif price < 50:
-            fees += 4.50
-        else:
-            fees += 6.00
-            
-    elif marketplace == 'ebay':
-        # eBay fees: 12.9% final value fee
-        fees = price * 0.129
-        
-        # PayPal fees: 2.9% + $0.30
-        fees += (price * 0.029) + 0.30
-    
-    return round(fees, 2)
+    return float(DEFAULT_FEE_ENGINE.fees(price, marketplace, category)[0])
 
 
 def calculate_roi(profit: float, cost: float) -> float:
@@ -104,7 +55,7 @@ def is_profitable(source_price: float,
     profit = target_price - total_cost
     margin = profit / target_price if target_price > 0 else 0
     
-    return margin >= min_margin and profit >= 10  # Min $10 profit
+    return margin >= min_margin and profit >= DEFAULT_FEE_ENGINE.min_profit
 
 
 def sanitize_filename(filename: str) -> str:
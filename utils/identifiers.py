@@ -0,0 +1,171 @@
+"""
+Product Identifier Extraction
+ISBN and UPC extraction with check-digit validation, ISBN-10 to ISBN-13 normalization, and a batch API
+"""
+
+import bisect
+import re
+from typing import Iterable, List, Optional, Sequence, Union
+
+
+# Compiled once at import. Candidates must not touch other digits, so part
+# of a longer number is never read as an identifier. ISBNs (10 or 13
+# digits) may carry hyphen or single-space separators. Both patterns open
+# with a plain digit so the regex engine can skip ahead to the next digit;
+# the lookbehind after it then rejects starts inside a longer run.
+ISBN_PATTERN = re.compile(r'\d(?<!\d\d)(?:[- ]?\d){8}(?:(?:[- ]?\d){3})?[- ]?[\dXx](?!\d)')
+UPC_PATTERN = re.compile(r'\d(?<!\d\d)\d{11}(?!\d)')
+SEPARATORS = str.maketrans('', '', '- ')
+ISBN10_WEIGHTS = range(10, 1, -1)
+# Check digits are computed on ASCII codes; every digit carries this offset
+ZERO = ord('0')
+
+# Texts are joined with this for batch scans; it is not a separator either pattern accepts
+BATCH_JOIN = '\n'
+
+
+def isbn10_check_digit(digits: str) -> str:
+    """Check character for the first 9 digits of an ISBN-10"""
+
+    codes = digits[:9].encode()
+    check = -(sum(map(int.__mul__, ISBN10_WEIGHTS, codes)) - ZERO * 54) % 11
+
+    return 'X' if check == 10 else str(check)
+
+
+def ean13_check_digit(digits: str) -> str:
+    """Check digit for the first 12 digits of an EAN-13 / ISBN-13"""
+
+    codes = digits[:12].encode()
+    total = sum(codes[0::2]) + 3 * sum(codes[1::2]) - ZERO * 24
+
+    return str(-total % 10)
+
+
+def upc_check_digit(digits: str) -> str:
+    """Check digit for the first 11 digits of a UPC-A"""
+
+    codes = digits[:11].encode()
+    total = 3 * sum(codes[0::2]) + sum(codes[1::2]) - ZERO * 23
+
+    return str(-total % 10)
+
+
+def is_valid_isbn10(isbn: str) -> bool:
+    return len(isbn) == 10 and isbn[:9].isdigit() and isbn10_check_digit(isbn) == isbn[9].upper()
+
+
+def is_valid_isbn13(isbn: str) -> bool:
+    return len(isbn) == 13 and isbn.isdigit() and isbn[:3] in ('978', '979') and ean13_check_digit(isbn) == isbn[12]
+
+
+def is_valid_upc(upc: str) -> bool:
+    return len(upc) == 12 and upc.isdigit() and upc_check_digit(upc) == upc[11]
+
+
+def isbn10_to_13(isbn10: str) -> str:
+    """ISBN-13 (978 prefix) for a valid ISBN-10"""
+
+    body = '978' + isbn10[:9]
+
+    return body + ean13_check_digit(body)
+
+
+def normalize_isbn(raw: str) -> Optional[str]:
+    """Valid ISBN-10 or ISBN-13 (with or without separators) as ISBN-13, else None"""
+
+    isbn = raw.translate(SEPARATORS)
+
+    if len(isbn) == 13:
+        return isbn if is_valid_isbn13(isbn) else None
+
+    if len(isbn) == 10 and is_valid_isbn10(isbn):
+        return isbn10_to_13(isbn)
+
+    return None
+
+
+def extract_isbn(text: str) -> Optional[str]:
+    """First ISBN in text with a valid check digit, as ISBN-13"""
+
+    for match in ISBN_PATTERN.finditer(text):
+        isbn = normalize_isbn(match.group())
+        if isbn:
+            return isbn
+
+    return None
+
+
+def extract_upc(text: str) -> Optional[str]:
+    """First UPC-A in text with a valid check digit"""
+
+    for match in UPC_PATTERN.finditer(text):
+        if is_valid_upc(match.group()):
+            return match.group()
+
+    return None
+
+
+def extract_identifier(text: str, category: str) -> Optional[str]:
+    """Lookup identifier for a listing: ISBN-13 for books, else UPC"""
+
+    if category == 'books':
+        isbn = extract_isbn(text)
+        if isbn:
+            return isbn
+
+    return extract_upc(text)
+
+
+def identifier_type(identifier: str, category: str) -> str:
+    """Catalog field a lookup identifier belongs to; LEGO listings may carry a set number instead of a UPC"""
+
+    if category == 'books':
+        return 'isbn'
+    if category == 'lego' and not is_valid_upc(identifier):
+        return 'set_number'
+
+    return 'upc'
+
+
+def _scan(pattern, texts: Sequence[str], indices: List[int]):
+    """(text index, match) for every match of `pattern` in the selected texts, in one regex pass"""
+
+    # Start offset of each selected text in the joined block
+    starts = []
+    offset = 0
+    for index in indices:
+        starts.append(offset)
+        offset += len(texts[index]) + len(BATCH_JOIN)
+
+    block = BATCH_JOIN.join([texts[index] for index in indices])
+
+    for match in pattern.finditer(block):
+        yield indices[bisect.bisect_right(starts, match.start()) - 1], match
+
+
+def extract_identifiers(texts: Sequence[str], categories: Union[str, Iterable[str]]) -> List[Optional[str]]:
+    """
+    `extract_identifier` for many texts at once
+
+    Each pattern makes one pass over the joined texts that still need it:
+    ISBNs over the books, then UPCs over whatever is unresolved. Pass one
+    category for all texts or one per text.
+    """
+
+    if isinstance(categories, str):
+        categories = [categories] * len(texts)
+
+    results: List[Optional[str]] = [None] * len(texts)
+
+    books = [index for index, category in enumerate(categories) if category == 'books']
+    for index, match in _scan(ISBN_PATTERN, texts, books):
+        if results[index] is None:
+            results[index] = normalize_isbn(match.group())
+
+    unresolved = [index for index, result in enumerate(results) if result is None]
+    for index, match in _scan(UPC_PATTERN, texts, unresolved):
+        if results[index] is None and is_valid_upc(match.group()):
+            results[index] = match.group()
+
+    return results